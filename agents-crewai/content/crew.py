@@ -6,12 +6,15 @@ from dotenv import load_dotenv
 
 from agents import create_editor_agent, create_writer_agent
 from shared import logger
+from shared.ratelimit import crewai_llm_kwargs
 
 load_dotenv()
 
 
-def create_crew(topic: str):
-    llm = LLM(model="gpt-4o-mini", temperature=0.7)
+def create_crew(topic: str = "{topic}", llm=None):
+    """Build the writer/editor crew. With the default ``topic`` it is a reusable template: pass the topic
+    with ``crew.kickoff(inputs={"topic": ...})``."""
+    llm = llm or LLM(model="gpt-4o-mini", temperature=0.7, **crewai_llm_kwargs())
     writer = create_writer_agent(llm)
     editor = create_editor_agent(llm)
 
@@ -31,10 +34,10 @@ def create_crew(topic: str):
 
 
 def main(topic: str = "The Future of AI Agents"):
-    logger.info(f"Content Crew - Topic: {topic}")
+    logger.info("Content Crew - Topic: %s", topic)
     crew = create_crew(topic)
     result = crew.kickoff()
-    logger.info(f"Result: {result}")
+    logger.info("Result: %s", result)
     return result
 
 
@@ -7,16 +7,23 @@ The crew consists of:
 2. Escalation Specialist - Handles complex issues, searches policies
 
 Workflow:
-    User Query → Support Agent → Escalation Specialist → Final Resolution
+    User Query → Support Agent → [router] → Escalation Specialist → Final Resolution
+                                         ↘ Final Resolution (resolved by the support agent)
+
+The router (``routing.py``) skips the escalation stage for questions the support agent answered
+that need no policy review. Set ``SUPPORT_ROUTING=off`` to always escalate.
 
 Usage:
     cd agents-crewai/research
     PYTHONPATH=../.. uv run python crew.py "My device won't turn on and I want a refund"
 """
 
+import os
 import sys
+import time
 
-from crewai import Crew, Process, Task
+from crewai import Crew, LLM, Process, Task
+from crewai.tasks.conditional_task import ConditionalTask
 from dotenv import load_dotenv
 
 from agents import create_escalation_specialist, create_support_agent
@@ -26,24 +33,33 @@ from prompts import (
     SUPPORT_TASK_DESCRIPTION,
     SUPPORT_TASK_EXPECTED_OUTPUT,
 )
+from routing import get_routing_stats, route
 from shared import logger
+from shared.ratelimit import crewai_llm_kwargs
 
 load_dotenv()
 
 
-def create_customer_support_crew(query: str) -> Crew:
+def create_customer_support_crew(query: str = "{query}", llm=None, routing: bool | None = None) -> Crew:
     """
     Create a Customer Support Crew to handle a customer inquiry.
 
+    With the default ``query`` the crew is a reusable template: pass the question with
+    ``crew.kickoff(inputs={"query": ...})``.
+
     Args:
         query: The customer's question or issue
+        llm: The language model for both agents (default: gpt-4o-mini)
+        routing: Skip the escalation stage when the support agent resolved the issue
+            (default: on unless ``SUPPORT_ROUTING=off``)
 
     Returns:
         Configured Crew ready to process the inquiry
     """
     # Create agents
-    support_agent = create_support_agent()
-    escalation_specialist = create_escalation_specialist()
+    llm = llm or LLM(model="gpt-4o-mini", **crewai_llm_kwargs())
+    support_agent = create_support_agent(llm)
+    escalation_specialist = create_escalation_specialist(llm)
 
     # Create tasks
     support_task = Task(
@@ -52,7 +68,7 @@ def create_customer_support_crew(query: str) -> Crew:
         agent=support_agent,
     )
 
-    escalation_task = Task(
+    escalation_kwargs = dict(
         description=ESCALATION_TASK_DESCRIPTION.format(
             query=query, support_response="{support_task.output}"
         ),
@@ -60,12 +76,42 @@ def create_customer_support_crew(query: str) -> Crew:
         agent=escalation_specialist,
         context=[support_task],  # This task depends on support_task
     )
+    if routing is None:
+        routing = os.getenv("SUPPORT_ROUTING", "rules") != "off"
+    before_kickoff = []
+    if routing:
+        stats = get_routing_stats()
+        state = {"query": query, "escalation_started": 0.0}
+
+        def remember_query(inputs):
+            if inputs and "query" in inputs:
+                state["query"] = inputs["query"]
+            return inputs
+
+        def should_escalate(support_output) -> bool:
+            decision = route(state["query"], support_output.raw)
+            stats.record(decision)
+            state["escalation_started"] = time.perf_counter()
+            return decision.escalate
+
+        def escalation_finished(_output) -> None:
+            stats.record_escalation(time.perf_counter() - state["escalation_started"])
+
+        before_kickoff.append(remember_query)
+
+        # When skipped, the crew's result is the support agent's response
+        escalation_task = ConditionalTask(
+            condition=should_escalate, callback=escalation_finished, **escalation_kwargs
+        )
+    else:
+        escalation_task = Task(**escalation_kwargs)
 
     # Create and return the crew
     crew = Crew(
         agents=[support_agent, escalation_specialist],
         tasks=[support_task, escalation_task],
         process=Process.sequential,  # Tasks run in order
+        before_kickoff_callbacks=before_kickoff,
         verbose=True,
     )
 
@@ -100,7 +146,7 @@ def main():
     logger.info("=" * 60)
     logger.info("TechGadgets Inc. Customer Support")
     logger.info("=" * 60)
-    logger.info(f"Customer Query: {query}")
+    logger.info("Customer Query: %s", query)
     logger.info("=" * 60)
 
     result = run_support_query(query)
@@ -109,6 +155,7 @@ def main():
     logger.info("FINAL RESOLUTION")
     logger.info("=" * 60)
     logger.info(result)
+    logger.info("Routing: %s", get_routing_stats().snapshot())
 
 
 if __name__ == "__main__":
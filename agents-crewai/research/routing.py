@@ -0,0 +1,98 @@
+"""
+Early-exit routing for the Customer Support Crew.
+
+Decides after the support task whether the escalation specialist needs to run. A query is
+escalated when it touches a policy in ``SUPPORT_KB["policies"]`` (refunds, warranty claims,
+escalations, price matching, data privacy), or when the support agent's answer hands off to a
+specialist. Everything else (shipping times, payment methods, troubleshooting steps) ends with the
+support agent's response.
+
+``get_routing_stats()`` counts how often each path is taken in this process and estimates the
+latency saved, from the measured duration of the escalation stage on the runs that needed it.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+from opentelemetry import trace
+
+# Query terms per policy document (by title) that call for policy review
+POLICY_TERMS = {
+    "Refund Process": ("refund", "money back", "reimburse", "chargeback"),
+    "Warranty Claims": ("warranty", "rma", "defective", "faulty", "broken", "repair", "replace"),
+    "Escalation Procedure": ("escalat", "supervisor", "manager", "complaint", "unresolved"),
+    "Price Match Guarantee": ("price match", "cheaper", "lower price"),
+    "Data Privacy Policy": ("privacy", "personal data", "personal information", "delete my data", "delete my account"),
+}
+
+# Phrases in the support agent's answer that hand the case to the escalation specialist
+HANDOFF_PATTERN = re.compile(
+    r"escalat|specialist|policy review|unable to resolve|cannot be resolved|can't be resolved", re.IGNORECASE
+)
+
+
+@dataclass
+class RouteDecision:
+    escalate: bool
+    reason: str
+
+
+def route(query: str, support_response: str) -> RouteDecision:
+    """Decide whether the escalation specialist should handle the case after the support agent."""
+    text = query.lower()
+    for policy, terms in POLICY_TERMS.items():
+        term = next((t for t in terms if t in text), None)
+        if term:
+            return RouteDecision(True, f"policy:{policy} ({term})")
+    handoff = HANDOFF_PATTERN.search(support_response or "")
+    if handoff:
+        return RouteDecision(True, f"handoff:{handoff.group(0).lower()}")
+    return RouteDecision(False, "resolved")
+
+
+class RoutingStats:
+    """Thread-safe path counts and escalation-stage timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.resolved = 0
+        self.escalated = 0
+        self.escalation_seconds = 0.0
+        self.escalations_timed = 0
+
+    def record(self, decision: RouteDecision) -> None:
+        with self._lock:
+            if decision.escalate:
+                self.escalated += 1
+            else:
+                self.resolved += 1
+        span = trace.get_current_span()
+        span.set_attribute("support.route", "escalated" if decision.escalate else "resolved")
+        span.set_attribute("support.route.reason", decision.reason)
+
+    def record_escalation(self, seconds: float) -> None:
+        with self._lock:
+            self.escalation_seconds += seconds
+            self.escalations_timed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.resolved + self.escalated
+            mean = self.escalation_seconds / self.escalations_timed if self.escalations_timed else None
+            return {
+                "resolved": self.resolved,
+                "escalated": self.escalated,
+                "escalation_rate": self.escalated / total if total else None,
+                "escalation_stage_mean_s": mean,
+                # Each early exit saves roughly one escalation stage
+                "latency_saved_s": self.resolved * mean if mean is not None else None,
+            }
+
+
+_stats = RoutingStats()
+
+
+def get_routing_stats() -> RoutingStats:
+    """Process-wide routing statistics."""
+    return _stats
@@ -10,6 +10,8 @@ import json
 from crewai.tools import tool
 from opentelemetry import trace
 
+from shared.context import Passage, get_context_assembler
+
 # Get the tracer for creating retrieval spans
 tracer = trace.get_tracer("customer-support-kb")
 
@@ -162,7 +164,7 @@ def _search_documents(
         documents: List of documents to search
 
     Returns:
-        List of matching documents
+        List of matching documents, deduplicated and trimmed to the context token budget
     """
     with tracer.start_as_current_span(f"{doc_type}_retrieval") as span:
         # Set retrieval span attributes
@@ -189,25 +191,30 @@ def _search_documents(
         results.sort(key=lambda x: x["_score"], reverse=True)
         top_results = results[:3]  # Return top 3 matches
 
-        # Remove internal score from results
-        for r in top_results:
-            del r["_score"]
+        # Drop near-duplicates and pack the hits into the context token budget
+        context = get_context_assembler().assemble(
+            [Passage(r["id"], r["content"], score=r["_score"], title=r["title"], metadata=r) for r in top_results]
+        )
+        context.record_on_span(span)
 
-        # Set retrieval metadata
-        span.set_attribute("retrieval.num_results", len(top_results))
+        # Set retrieval metadata from what the tool returns (after dedupe and trimming)
+        returned = [{**p.metadata, "content": p.content} for p in context.passages]
+        for r in returned:
+            r.pop("_score", None)
+        span.set_attribute("retrieval.num_results", len(returned))
 
         # Record the output as a list of documents (required for RETRIEVER spans)
         # The processor expects content to be a list of dicts for retriever output
         documents_list = [
             {"content": r["content"], "metadata": {"title": r["title"], "id": r["id"]}}
-            for r in top_results
+            for r in returned
         ]
         span.set_attribute(
             "gen_ai.output.messages",
             json.dumps([{"role": "assistant", "content": documents_list}]),
         )
 
-        return top_results
+        return returned
 
 
 @tool
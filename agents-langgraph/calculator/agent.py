@@ -1,26 +1,28 @@
 """Calculator Agent - Two-level graph: outer workflow wraps inner agent."""
 import sys
-from typing import Annotated
+import uuid
+from typing import Annotated, Iterator
 
 from dotenv import load_dotenv
 
-load_dotenv()  # must be before setup_telemetry so env vars are available
+load_dotenv()  # must be before the imports below so env vars are available
 
 from langchain.agents import create_agent
 from langchain_core.messages import AnyMessage, HumanMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
 
 from prompt import CALCULATOR_AGENT_SYSTEM_PROMPT
 from shared import logger
-from shared.telemetry import setup_telemetry
+from shared.checkpoint import get_checkpointer, session_config
+from shared.history import bounded_add_messages
+from shared.llm_cache import get_llm_cache
+from shared.ratelimit import openai_client_kwargs
+from shared.streaming import StreamEvent, render_stream, stream_graph
 from tools import calculate, convert_units
 
-setup_telemetry()
-
 
 @tool
 def calc_tool(expression: str) -> str:
@@ -40,45 +42,66 @@ def convert_tool(value: float, from_unit: str, to_unit: str) -> str:
     return f"Error: {result['error']}"
 
 
-def create_calculator_agent():
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+def create_calculator_agent(llm=None):
+    llm = llm or ChatOpenAI(model="gpt-4o-mini", temperature=0, cache=get_llm_cache(), **openai_client_kwargs())
     return create_agent(llm, [calc_tool, convert_tool], system_prompt=CALCULATOR_AGENT_SYSTEM_PROMPT, name="calculator")
 
 
 class WorkflowState(TypedDict):
-    messages: Annotated[list[AnyMessage], add_messages]
+    # History is kept under AGENT_HISTORY_MAX_TOKENS so long sessions don't resend everything
+    messages: Annotated[list[AnyMessage], bounded_add_messages()]
 
 
-def create_workflow():
+def create_workflow(llm=None, checkpointer=None):
     """Create outer workflow graph that wraps the calculator agent as a subgraph."""
-    agent = create_calculator_agent()
+    agent = create_calculator_agent(llm)
 
     def run_agent(state: WorkflowState) -> WorkflowState:
         result = agent.invoke(
             {"messages": state["messages"]},
             config={"tags": ["agent:calculator"]},
         )
-        return {"messages": result["messages"]}
+        # Only the messages produced this turn; the reducer merges them into the bounded history
+        return {"messages": result["messages"][len(state["messages"]):]}
 
     workflow = StateGraph(WorkflowState)
     workflow.add_node("calculator_agent", run_agent)
     workflow.add_edge(START, "calculator_agent")
     workflow.add_edge("calculator_agent", END)
-    return workflow.compile()
-
-
-def main(query: str = "Convert 100 km to mi"):
-    logger.info(f"Calculator Agent - Query: {query}")
-    workflow = create_workflow()
-    result = workflow.invoke(
-        {"messages": [HumanMessage(content=query)]},
-        config={"metadata": {"session.id": "session-collector-1"}},
-    )
-    response = result["messages"][-1].content
-    logger.info(f"Response: {response}")
+    # With a checkpointer, each session.id resumes its stored (bounded) history
+    return workflow.compile(checkpointer=checkpointer or get_checkpointer())
+
+
+DEFAULT_SESSION_ID = "session-collector-1"
+
+
+def run_config(session_id: str | None = None) -> dict:
+    """Traces default to a shared ``session.id``, but only an explicit session resumes its thread;
+    otherwise each run gets a fresh one."""
+    if session_id:
+        return session_config(session_id)
+    return session_config(DEFAULT_SESSION_ID, thread_id=uuid.uuid4().hex)
+
+
+def stream_query(query: str, session_id: str | None = None) -> Iterator[StreamEvent]:
+    """Yield answer tokens and tool progress as they happen, ending with a ``final`` event."""
+    inputs = {"messages": [HumanMessage(content=query)]}
+    return stream_graph(create_workflow(), inputs, config=run_config(session_id))
+
+
+def main(query: str = "Convert 100 km to mi", stream: bool = False, session_id: str | None = None):
+    logger.info("Calculator Agent - Query: %s", query)
+    if stream:
+        response = render_stream(stream_query(query, session_id))
+    else:
+        workflow = create_workflow()
+        result = workflow.invoke({"messages": [HumanMessage(content=query)]}, config=run_config(session_id))
+        response = result["messages"][-1].content
+    logger.info("Response: %s", response)
     return response
 
 
 if __name__ == "__main__":
-    query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "Convert 100 km to mi"
-    main(query)
+    args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+    query = " ".join(args) if args else "Convert 100 km to mi"
+    main(query, stream="--stream" in sys.argv[1:])
@@ -1,5 +1,7 @@
 """RAG Agent - Q&A over documents with vector search."""
+import os
 import sys
+from typing import Iterator
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
@@ -8,36 +10,67 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from prompt import RAG_AGENT_SYSTEM_PROMPT, SAMPLE_DOCUMENTS
 from shared import logger
-from tools import create_knowledge_base, search_documents
+from shared.checkpoint import get_checkpointer, session_config
+from shared.llm_cache import get_llm_cache
+from shared.ratelimit import openai_client_kwargs
+from shared.streaming import StreamEvent, render_stream, stream_graph
+from tools import create_knowledge_base, load_knowledge_base, search_documents
 
 load_dotenv()
 
-# Knowledge base setup
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-_, retriever = create_knowledge_base(SAMPLE_DOCUMENTS, embeddings)
+_retriever = None
+
+
+def get_retriever(embeddings=None):
+    """Build the knowledge base on first use rather than at import time.
+
+    Uses the index saved by ``ingest.py`` when ``RAG_INDEX_PATH`` is set, else the sample documents.
+    """
+    global _retriever
+    if _retriever is None:
+        embeddings = embeddings or OpenAIEmbeddings(model="text-embedding-3-small", **openai_client_kwargs())
+        if os.getenv("RAG_INDEX_PATH"):
+            _, _retriever = load_knowledge_base(os.environ["RAG_INDEX_PATH"], embeddings)
+        else:
+            _, _retriever = create_knowledge_base(SAMPLE_DOCUMENTS, embeddings)
+    return _retriever
 
 
 @tool
 def retrieve_documents(query: str) -> str:
     """Search the knowledge base for relevant documents about RAG, embeddings, and vector search."""
-    _, formatted_result = search_documents(query, retriever)
+    _, formatted_result = search_documents(query, get_retriever())
     return formatted_result
 
 
-def create_rag_agent():
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    return create_agent(llm, [retrieve_documents], system_prompt=RAG_AGENT_SYSTEM_PROMPT)
+def create_rag_agent(llm=None, checkpointer=None):
+    llm = llm or ChatOpenAI(model="gpt-4o-mini", temperature=0, cache=get_llm_cache(), **openai_client_kwargs())
+    return create_agent(
+        llm,
+        [retrieve_documents],
+        system_prompt=RAG_AGENT_SYSTEM_PROMPT,
+        checkpointer=checkpointer or get_checkpointer(),
+    )
+
+
+def stream_query(query: str, session_id: str | None = None) -> Iterator[StreamEvent]:
+    """Yield answer tokens and tool progress as they happen, ending with a ``final`` event."""
+    return stream_graph(create_rag_agent(), {"messages": [("user", query)]}, config=session_config(session_id))
 
 
-def main(query: str = "What is RAG and how does it work?"):
-    logger.info(f"RAG Agent - Query: {query}")
-    agent = create_rag_agent()
-    result = agent.invoke({"messages": [("user", query)]})
-    response = result["messages"][-1].content
-    logger.info(f"Response: {response}")
+def main(query: str = "What is RAG and how does it work?", stream: bool = False, session_id: str | None = None):
+    logger.info("RAG Agent - Query: %s", query)
+    if stream:
+        response = render_stream(stream_query(query, session_id))
+    else:
+        agent = create_rag_agent()
+        result = agent.invoke({"messages": [("user", query)]}, config=session_config(session_id))
+        response = result["messages"][-1].content
+    logger.info("Response: %s", response)
     return response
 
 
 if __name__ == "__main__":
-    query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "What is RAG and how does it work?"
-    main(query)
+    args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+    query = " ".join(args) if args else "What is RAG and how does it work?"
+    main(query, stream="--stream" in sys.argv[1:])
@@ -0,0 +1,288 @@
+"""Streaming ingestion of large corpora into the RAG knowledge base.
+
+Documents are read lazily from JSONL files (``id``/``title``/``content`` per line, like
+``SAMPLE_DOCUMENTS``) or directories of text files, split into overlapping chunks, embedded in
+batches on a bounded thread pool and added to the FAISS index batch by batch. At most
+``concurrency + 1`` batches are held in memory at once, so pipeline memory stays flat regardless
+of corpus size; only the index itself (vectors plus chunk texts) grows with the corpus.
+
+Usage:
+    python agents-langgraph/rag/ingest.py corpus.jsonl docs/ --output .cache/rag_index
+    python agents-langgraph/rag/ingest.py corpus.jsonl --chunk-size 800 --overlap 100 --batch-size 512 --concurrency 8
+    python agents-langgraph/rag/ingest.py corpus.jsonl --index-type auto --expected-chunks 5000000
+
+Point the RAG agent at the saved index with ``RAG_INDEX_PATH=.cache/rag_index``.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator
+
+import numpy as np
+from dotenv import load_dotenv
+
+from shared import logger
+from shared.ratelimit import openai_client_kwargs
+from tools import INDEX_TYPES, empty_vector_store, load_knowledge_base, make_index, resolve_index_type, train_index
+
+TEXT_SUFFIXES = (".txt", ".md", ".rst", ".html")
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    chunks: int = 0
+    skipped: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        elapsed = self.elapsed or 1e-9
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return (
+            f"{self.documents} docs, {self.chunks} chunks in {self.elapsed:.1f}s "
+            f"({self.documents / elapsed:.1f} docs/s, {self.chunks / elapsed:.1f} chunks/s, "
+            f"peak RSS {peak_rss_mb:.0f} MB)"
+            + (f", {self.skipped} chunks already indexed" if self.skipped else "")
+        )
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    with open(path) as f:
+        for i, line in enumerate(f):
+            if line.strip():
+                doc = json.loads(line)
+                doc.setdefault("id", f"{os.path.basename(path)}:{i}")
+                doc.setdefault("title", str(doc["id"]))
+                yield doc
+
+
+def iter_directory(path: str) -> Iterator[dict]:
+    """Yield one document per text file (and every line of ``.jsonl`` files) under ``path``."""
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            if name.endswith(".jsonl"):
+                yield from iter_jsonl(file_path)
+            elif name.endswith(TEXT_SUFFIXES):
+                with open(file_path, errors="replace") as f:
+                    content = f.read()
+                yield {"id": os.path.relpath(file_path, path), "title": os.path.splitext(name)[0], "content": content}
+
+
+def iter_sources(paths: list[str]) -> Iterator[dict]:
+    for path in paths:
+        yield from iter_directory(path) if os.path.isdir(path) else iter_jsonl(path)
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> Iterator[str]:
+    """Split ``text`` into chunks of at most ``chunk_size`` characters, consecutive chunks sharing
+    about ``overlap`` characters. Boundaries are moved to whitespace where possible."""
+    text = " ".join(text.split())
+    if len(text) <= chunk_size:
+        if text:
+            yield text
+        return
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + overlap + 1, end)
+            if space != -1:
+                end = space
+        yield text[start:end]
+        if end >= len(text):
+            return
+        next_start = max(end - overlap, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 and text[next_start - 1] != " " else next_start
+
+
+def iter_chunks(documents: Iterable[dict], chunk_size: int, overlap: int, stats: IngestStats) -> Iterator[tuple]:
+    """Yield ``(chunk_id, text, metadata)``; chunk metadata keeps the source document id and title."""
+    for doc in documents:
+        stats.documents += 1
+        for i, text in enumerate(chunk_text(doc["content"], chunk_size, overlap)):
+            yield f"{doc['id']}#{i}", text, {"id": doc["id"], "title": doc.get("title", ""), "chunk": i}
+
+
+def _embed(embeddings, batch: list[tuple]) -> tuple[list[tuple], list[list[float]]]:
+    return batch, embeddings.embed_documents([text for _, text, _ in batch])
+
+
+def ingest(
+    documents: Iterable[dict],
+    embeddings,
+    vector_store=None,
+    chunk_size: int = 1000,
+    overlap: int = 200,
+    batch_size: int = 256,
+    concurrency: int = 4,
+    report_every: int = 10_000,
+    index_type: str | None = None,
+    expected_chunks: int | None = None,
+    train_size: int = 50_000,
+    stats: IngestStats | None = None,
+):
+    """Chunk, embed and index ``documents`` incrementally; returns ``(vector_store, stats)``.
+
+    Batches are embedded concurrently but added to the index in order, so chunk ids are assigned
+    deterministically. ``vector_store`` extends an existing FAISS store; otherwise a new index of
+    ``index_type`` is created (``auto`` sizes it by ``expected_chunks``, flat when unknown). IVF
+    indexes are trained on the first ``train_size`` chunks, which are held back until then.
+
+    Chunk ids are ``<document id>#<chunk number>``. Chunks whose id is already in ``vector_store``
+    (or was seen earlier in this run) are skipped before embedding, so re-ingesting a document
+    does not change the index; to replace changed documents, rebuild the index.
+    """
+    stats = stats or IngestStats()
+    known = set(vector_store.index_to_docstore_id.values()) if vector_store is not None else set()
+
+    def new_chunks():
+        for chunk in iter_chunks(documents, chunk_size, overlap, stats):
+            if chunk[0] in known:
+                stats.skipped += 1
+                continue
+            known.add(chunk[0])
+            yield chunk
+
+    chunks = new_chunks()
+    kind = resolve_index_type(index_type, expected_chunks or 0)
+    # Chunks held back for IVF training: (batch, first row of its vectors in ``sample``)
+    held = []
+    sample = None
+    held_rows = 0
+    reported = 0
+
+    def add(batch, vectors):
+        nonlocal reported
+        ids = [chunk_id for chunk_id, _, _ in batch]
+        pairs = [(text, vector) for (_, text, _), vector in zip(batch, vectors)]
+        vector_store.add_embeddings(pairs, metadatas=[metadata for _, _, metadata in batch], ids=ids)
+        stats.chunks += len(batch)
+        stats.batches += 1
+        if stats.documents - reported >= report_every:
+            reported = stats.documents
+            logger.info("Ingested %s", stats.summary())
+
+    def create_store(training: np.ndarray):
+        nonlocal vector_store
+        index = make_index(kind, training.shape[1], expected_chunks or len(training), n_train=len(training))
+        train_index(index, training)
+        vector_store = empty_vector_store(embeddings, index)
+
+    def release_held():
+        nonlocal sample
+        training = sample[:held_rows]
+        create_store(training)
+        for batch, start in held:
+            add(batch, training[start : start + len(batch)])
+        held.clear()
+        sample = None
+
+    def receive(batch, vectors):
+        nonlocal sample, held_rows
+        if vector_store is None and kind not in ("ivf", "ivfpq"):
+            create_store(np.asarray(vectors, dtype=np.float32))
+        if vector_store is not None:
+            add(batch, vectors)
+            return
+        if sample is None:
+            # float32 rows instead of lists of Python floats: ~8x less memory for the training sample
+            sample = np.empty((train_size + batch_size, len(vectors[0])), dtype=np.float32)
+        sample[held_rows : held_rows + len(batch)] = vectors
+        held.append((batch, held_rows))
+        held_rows += len(batch)
+        if held_rows >= train_size:
+            release_held()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed") as executor:
+        in_flight = deque()
+        while batch := list(islice(chunks, batch_size)):
+            if len(in_flight) >= concurrency:
+                receive(*in_flight.popleft().result())
+            in_flight.append(executor.submit(_embed, embeddings, batch))
+        while in_flight:
+            receive(*in_flight.popleft().result())
+    if held:
+        # Corpus smaller than train_size: train on everything
+        release_held()
+    return vector_store, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream documents into the RAG FAISS knowledge base")
+    parser.add_argument("sources", nargs="+", help="JSONL files and/or directories of text files")
+    parser.add_argument("--output", default=".cache/rag_index", help="Directory to save the index to")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Maximum characters per chunk (default: 1000)")
+    parser.add_argument("--overlap", type=int, default=200, help="Characters shared by adjacent chunks (default: 200)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks per embedding request (default: 256)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Embedding requests in flight (default: 4)")
+    parser.add_argument("--report-every", type=int, default=10_000, help="Documents between progress reports")
+    parser.add_argument(
+        "--index-type",
+        choices=INDEX_TYPES,
+        help="FAISS index type (default: RAG_INDEX_TYPE or auto, which sizes by --expected-chunks)",
+    )
+    parser.add_argument(
+        "--expected-chunks",
+        type=int,
+        help="Approximate corpus size in chunks, used to pick the auto index type and size IVF lists",
+    )
+    parser.add_argument(
+        "--train-size",
+        type=int,
+        default=50_000,
+        help="Chunks sampled to train IVF indexes (default: 50000)",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Add to the index already saved in --output; chunks already in it are skipped",
+    )
+    args = parser.parse_args()
+    if args.overlap >= args.chunk_size:
+        parser.error("--overlap must be smaller than --chunk-size")
+
+    load_dotenv()
+    from langchain_openai import OpenAIEmbeddings
+
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-small", **openai_client_kwargs())
+    vector_store = None
+    if args.append and os.path.exists(args.output):
+        vector_store, _ = load_knowledge_base(args.output, embeddings)
+
+    vector_store, stats = ingest(
+        iter_sources(args.sources),
+        embeddings,
+        vector_store,
+        chunk_size=args.chunk_size,
+        overlap=args.overlap,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        report_every=args.report_every,
+        index_type=args.index_type,
+        expected_chunks=args.expected_chunks,
+        train_size=args.train_size,
+    )
+    if vector_store is None:
+        logger.error("No documents found in the given sources")
+        sys.exit(1)
+    vector_store.save_local(args.output)
+    logger.info("Done: %s; index saved to %s", stats.summary(), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,112 @@
 """RAG tools with instrumented retrieval."""
 import json
+import math
+import os
 
 from langchain_core.documents import Document
 from opentelemetry import trace
 
+from shared import logger
+from shared.context import Passage, get_context_assembler
 
-def create_knowledge_base(documents: list[dict], embeddings) -> tuple:
+
+INDEX_TYPES = ("auto", "flat", "ivf", "hnsw", "ivfpq")
+# Each 8-bit PQ codebook has 256 centroids, so IVF-PQ training needs at least that many vectors
+PQ_MIN_TRAIN = 256
+
+
+def resolve_index_type(index_type: str | None, n_vectors: int) -> str:
+    """Pick the FAISS index type; ``auto`` (the default, or ``RAG_INDEX_TYPE``) goes by corpus size.
+
+    Exact (flat) search up to 50k vectors, HNSW up to 2M, IVF-PQ (compressed) beyond that.
+    """
+    index_type = index_type or os.getenv("RAG_INDEX_TYPE", "auto")
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Available: {', '.join(INDEX_TYPES)}")
+    if index_type != "auto":
+        return index_type
+    if n_vectors < 50_000:
+        return "flat"
+    return "hnsw" if n_vectors < 2_000_000 else "ivfpq"
+
+
+def make_index(
+    index_type: str,
+    dimension: int,
+    n_vectors: int,
+    n_train: int | None = None,
+    nprobe: int | None = None,
+    ef_search: int = 64,
+):
+    """Build an empty (untrained) L2 index; ``n_vectors`` and ``n_train`` size the IVF coarse quantizer.
+
+    Search parameters (``nprobe``, ``efSearch``) are stored in the index, so they persist with
+    ``save_local``. IVF-PQ falls back to flat when there are fewer than ``PQ_MIN_TRAIN`` training
+    vectors; a corpus that small gains nothing from compression.
+    """
+    import faiss
+
+    if index_type == "ivfpq" and (n_train or n_vectors) < PQ_MIN_TRAIN:
+        logger.warning(
+            "IVF-PQ needs at least %d training vectors, got %d; using a flat index", PQ_MIN_TRAIN, n_train or n_vectors
+        )
+        index_type = "flat"
+
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dimension)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, 32)
+        index.hnsw.efConstruction = 80
+        index.hnsw.efSearch = ef_search
+        return index
+    # ~4 * sqrt(n) lists, keeping at least 39 training points per list
+    nlist = max(1, min(int(4 * math.sqrt(n_vectors)), (n_train or n_vectors) // 39))
+    quantizer = faiss.IndexFlatL2(dimension)
+    if index_type == "ivf":
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    else:
+        # 8-bit codes over sub-vectors of ~16 dimensions: 1536-d float vectors shrink from 6 KB to 96 B
+        sub_dimension = next(d for d in (16, 8, 4, 2, 1) if dimension % d == 0)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, dimension // sub_dimension, 8)
+    index.nprobe = nprobe or min(nlist, 16)
+    return index
+
+
+def train_index(index, vectors) -> None:
+    """Train IVF indexes on a sample of the vectors (a no-op for flat and HNSW)."""
+    import numpy as np
+
+    if not index.is_trained:
+        index.train(np.asarray(vectors, dtype=np.float32))
+
+
+def empty_vector_store(embeddings, index):
+    """Wrap a (trained) FAISS index in a LangChain vector store with an in-memory docstore."""
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    return FAISS(embedding_function=embeddings, index=index, docstore=InMemoryDocstore(), index_to_docstore_id={})
+
+
+def create_knowledge_base(documents: list[dict], embeddings, index_type: str | None = None) -> tuple:
     """Create an in-memory vector store from documents."""
+    texts = [doc["content"] for doc in documents]
+    metadatas = [{"id": doc["id"], "title": doc["title"]} for doc in documents]
+    vectors = embeddings.embed_documents(texts)
+    index = make_index(resolve_index_type(index_type, len(vectors)), len(vectors[0]), len(vectors))
+    train_index(index, vectors)
+    vector_store = empty_vector_store(embeddings, index)
+    vector_store.add_embeddings(zip(texts, vectors), metadatas=metadatas)
+    retriever = vector_store.as_retriever(search_kwargs={"k": 3})
+    return vector_store, retriever
+
+
+def load_knowledge_base(path: str, embeddings) -> tuple:
+    """Load a vector store saved by ``ingest.py``."""
     from langchain_community.vectorstores import FAISS
 
-    docs = [
-        Document(page_content=doc["content"], metadata={"id": doc["id"], "title": doc["title"]})
-        for doc in documents
-    ]
-    vector_store = FAISS.from_documents(docs, embeddings)
+    # The index is produced locally by ingest.py, so its pickled docstore is trusted
+    vector_store = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
     retriever = vector_store.as_retriever(search_kwargs={"k": 3})
     return vector_store, retriever
 
@@ -56,8 +149,23 @@ def search_documents(query: str, retriever) -> tuple[list[Document], str]:
             span.set_attribute("gen_ai.output.messages", json.dumps(output_messages))
             return [], "No relevant documents found."
 
-        # Format retrieved documents with 'content' field (required for RETRIEVER spans)
-        # and metadata containing id/title
+        # Dedupe and pack the hits into the context token budget. Passages carry no score, so the
+        # assembler's (stable) sort keeps the retriever's rank order
+        passages = [
+            Passage(
+                str(doc.metadata.get("id", i)),
+                doc.page_content,
+                title=doc.metadata.get("title", ""),
+                metadata=doc.metadata,
+            )
+            for i, doc in enumerate(docs)
+        ]
+        context = get_context_assembler().assemble(passages)
+        context.record_on_span(span)
+        packed = [Document(page_content=p.content, metadata=p.metadata) for p in context.passages]
+
+        # Output is what the agent receives: the packed passages, with 'content' (required for
+        # RETRIEVER spans) and metadata containing id/title
         documents_list = [
             {
                 "content": doc.page_content,
@@ -66,12 +174,13 @@ def search_documents(query: str, retriever) -> tuple[list[Document], str]:
                     "title": doc.metadata.get("title", ""),
                 },
             }
-            for doc in docs
+            for doc in packed
         ]
+        span.set_attribute("retrieval.num_results", len(documents_list))
 
         # Set output as gen_ai.output.messages with documents as content list
         output_messages = [{"role": "assistant", "content": documents_list}]
         span.set_attribute("gen_ai.output.messages", json.dumps(output_messages))
 
         # Return both raw docs and formatted string
-        return docs, format_docs(docs)
+        return docs, format_docs(packed)
@@ -1,6 +1,7 @@
 """Weather Agent - Answers weather questions using tools."""
 
 import sys
+from typing import Iterator
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
@@ -10,6 +11,10 @@ from prompt import WEATHER_AGENT_SYSTEM_PROMPT
 from tools import get_current_weather, get_forecast
 
 from shared import logger
+from shared.checkpoint import get_checkpointer, session_config
+from shared.llm_cache import get_llm_cache
+from shared.ratelimit import openai_client_kwargs
+from shared.streaming import StreamEvent, render_stream, stream_graph
 
 load_dotenv()
 
@@ -31,20 +36,34 @@ def forecast_tool(city: str, days: int = 3) -> str:
     return "\n".join(lines)
 
 
-def create_weather_agent():
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    return create_agent(llm, [weather_tool, forecast_tool], system_prompt=WEATHER_AGENT_SYSTEM_PROMPT)
+def create_weather_agent(llm=None, checkpointer=None):
+    llm = llm or ChatOpenAI(model="gpt-4o-mini", temperature=0, cache=get_llm_cache(), **openai_client_kwargs())
+    return create_agent(
+        llm,
+        [weather_tool, forecast_tool],
+        system_prompt=WEATHER_AGENT_SYSTEM_PROMPT,
+        checkpointer=checkpointer or get_checkpointer(),
+    )
 
 
-def main(query: str = "What's the weather like in San Francisco?"):
-    logger.info(f"Weather Agent - Query: {query}")
-    agent = create_weather_agent()
-    result = agent.invoke({"messages": [("user", query)]})
-    response = result["messages"][-1].content
-    logger.info(f"Response: {response}")
+def stream_query(query: str, session_id: str | None = None) -> Iterator[StreamEvent]:
+    """Yield answer tokens and tool progress as they happen, ending with a ``final`` event."""
+    return stream_graph(create_weather_agent(), {"messages": [("user", query)]}, config=session_config(session_id))
+
+
+def main(query: str = "What's the weather like in San Francisco?", stream: bool = False, session_id: str | None = None):
+    logger.info("Weather Agent - Query: %s", query)
+    if stream:
+        response = render_stream(stream_query(query, session_id))
+    else:
+        agent = create_weather_agent()
+        result = agent.invoke({"messages": [("user", query)]}, config=session_config(session_id))
+        response = result["messages"][-1].content
+    logger.info("Response: %s", response)
     return response
 
 
 if __name__ == "__main__":
-    query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "What's the weather like in San Francisco?"
-    main(query)
+    args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+    query = " ".join(args) if args else "What's the weather like in San Francisco?"
+    main(query, stream="--stream" in sys.argv[1:])
@@ -0,0 +1,193 @@
+"""Span analysis over protobuf captures vs the columnar (Parquet) export.
+
+Writes synthetic OTLP captures shaped like the research crew's spans (retriever spans with
+``retrieval.*`` attributes, ``calc_tool`` spans and LLM spans with token usage), then answers two
+questions both ways:
+
+- average ``retrieval.num_results`` per ``retrieval.document_type``
+- the 10 slowest ``calc_tool`` inputs
+
+``protobuf`` parses every capture with ``parse_trace`` and loops over spans in Python, as ad-hoc
+scripts do today. ``parquet`` converts the captures once with ``shared.columnar`` (timed per process
+count, plus an incremental rerun with nothing new) and answers both questions with filtered,
+column-pruned Arrow scans.
+
+Usage:
+    python benchmarks/bench_columnar.py
+    python benchmarks/bench_columnar.py --files 5000 --spans-per-file 50 --processes 1,4 --repeat 5
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from common import percentiles, write_results
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.common.v1.common_pb2 import KeyValue
+
+DOCUMENT_TYPES = ("faq", "troubleshooting", "policy")
+EXPRESSIONS = ("2 + 2", "sqrt(144) * pi", "log10(1e6) + exp(2)", "round(pow(1.05, 30) * 1000, 2)", "17 ** 0.5")
+
+
+def _set(span, key: str, value) -> None:
+    attribute = KeyValue(key=key)
+    if isinstance(value, str):
+        attribute.value.string_value = value
+    else:
+        attribute.value.int_value = value
+    span.attributes.append(attribute)
+
+
+def write_captures(directory: str, files: int, spans_per_file: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    start_ns = 1_765_000_000_000_000_000
+    for i in range(files):
+        request = ExportTraceServiceRequest()
+        resource_spans = request.resource_spans.add()
+        service = resource_spans.resource.attributes.add(key="service.name")
+        service.value.string_value = "research-crew"
+        scope_spans = resource_spans.scope_spans.add()
+        trace_id = rng.randbytes(16)
+        for _ in range(spans_per_file):
+            span = scope_spans.spans.add(trace_id=trace_id, span_id=rng.randbytes(8))
+            span.start_time_unix_nano = start_ns + i * 1_000_000_000
+            span.end_time_unix_nano = span.start_time_unix_nano + int(rng.lognormvariate(17, 1))
+            kind = rng.random()
+            if kind < 0.3:
+                span.name = "search_knowledge_base"
+                _set(span, "db.operation", "query")
+                _set(span, "retrieval.document_type", rng.choice(DOCUMENT_TYPES))
+                _set(span, "retrieval.num_results", rng.randint(0, 5))
+            elif kind < 0.5:
+                span.name = "calc_tool"
+                _set(span, "tool.name", "calc_tool")
+                _set(span, "gen_ai.tool.call.arguments", rng.choice(EXPRESSIONS))
+            else:
+                span.name = "openai.chat"
+                _set(span, "gen_ai.operation.name", "chat")
+                _set(span, "gen_ai.request.model", "gpt-4o-mini")
+                _set(span, "gen_ai.usage.input_tokens", rng.randint(100, 4000))
+                _set(span, "gen_ai.usage.output_tokens", rng.randint(10, 500))
+            for j in range(3):
+                _set(span, f"gen_ai.prompt.{j}.content", "x" * 200)
+        with open(os.path.join(directory, f"traces_{i:07d}.bin"), "wb") as f:
+            f.write(request.SerializeToString())
+
+
+def query_protobuf(directory: str) -> tuple[dict, list]:
+    from shared.otel import parse_trace
+
+    totals, slowest = {}, []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            request = parse_trace(f.read())
+        for resource_spans in request.resource_spans:
+            for scope_spans in resource_spans.scope_spans:
+                for span in scope_spans.spans:
+                    attributes = {a.key: a.value for a in span.attributes}
+                    if "retrieval.document_type" in attributes:
+                        entry = totals.setdefault(attributes["retrieval.document_type"].string_value, [0, 0])
+                        entry[0] += attributes["retrieval.num_results"].int_value
+                        entry[1] += 1
+                    if "tool.name" in attributes and attributes["tool.name"].string_value == "calc_tool":
+                        duration_ms = (span.end_time_unix_nano - span.start_time_unix_nano) / 1e6
+                        slowest.append((duration_ms, attributes["gen_ai.tool.call.arguments"].string_value))
+    means = {doc_type: total / count for doc_type, (total, count) in totals.items()}
+    return means, sorted(slowest, reverse=True)[:10]
+
+
+def query_parquet(output: str) -> tuple[dict, list]:
+    import pyarrow.compute as pc
+
+    from shared.columnar import dataset
+
+    spans = dataset(output)
+    retrievals = spans.to_table(
+        columns=["retrieval.document_type", "retrieval.num_results"], filter=pc.field("db.operation") == "query"
+    )
+    grouped = retrievals.group_by("retrieval.document_type").aggregate([("retrieval.num_results", "mean")])
+    means = dict(zip(*grouped.to_pydict().values()))
+    tools = spans.to_table(columns=["duration_ms", "input"], filter=pc.field("tool.name") == "calc_tool")
+    top = tools.sort_by([("duration_ms", "descending")]).slice(0, 10)
+    return means, list(zip(top["duration_ms"].to_pylist(), top["input"].to_pylist()))
+
+
+def _timed(fn, repeat: int) -> tuple[list[float], object]:
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Span queries over protobuf captures vs the Parquet export")
+    parser.add_argument("--files", type=int, default=2000, help="Synthetic capture files (default: 2000)")
+    parser.add_argument("--spans-per-file", type=int, default=20, help="Spans per capture (default: 20)")
+    parser.add_argument("--processes", default="1,4", help="Conversion process counts to compare (default: 1,4)")
+    parser.add_argument("--repeat", type=int, default=3, help="Query repetitions (default: 3)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/columnar_<timestamp>.json)")
+    args = parser.parse_args()
+
+    from shared.columnar import convert
+
+    workdir = tempfile.mkdtemp(prefix="bench_columnar_")
+    captures = os.path.join(workdir, "captures")
+    os.makedirs(captures)
+    results = []
+    try:
+        write_captures(captures, args.files, args.spans_per_file)
+        spans = args.files * args.spans_per_file
+        print(f"{args.files} captures, {spans} spans")
+
+        samples, expected = _timed(lambda: query_protobuf(captures), args.repeat)
+        stats = percentiles(samples)
+        results.append({"name": "protobuf_scan", "params": {}, "median_s": stats["p50"], "p95_s": stats["p95"]})
+        print(f"protobuf scan        {stats['p50']:>8.3f}s")
+
+        dataset_dir = None
+        for processes in (int(p) for p in args.processes.split(",") if p):
+            dataset_dir = os.path.join(workdir, f"parquet_{processes}")
+            start = time.perf_counter()
+            convert([captures], dataset_dir, processes=processes)
+            elapsed = time.perf_counter() - start
+            results.append(
+                {
+                    "name": "convert",
+                    "params": {"processes": processes},
+                    "median_s": elapsed,
+                    "p95_s": elapsed,
+                    "spans_per_s": spans / elapsed,
+                }
+            )
+            print(f"convert x{processes:<3}         {elapsed:>8.3f}s ({spans / elapsed:,.0f} spans/s)")
+
+        start = time.perf_counter()
+        convert([captures], dataset_dir)
+        elapsed = time.perf_counter() - start
+        row = {"name": "convert_incremental", "params": {"new_files": 0}, "median_s": elapsed, "p95_s": elapsed}
+        results.append(row)
+        print(f"incremental rerun    {elapsed:>8.3f}s")
+
+        samples, actual = _timed(lambda: query_parquet(dataset_dir), args.repeat)
+        stats = percentiles(samples)
+        results.append({"name": "parquet_scan", "params": {}, "median_s": stats["p50"], "p95_s": stats["p95"]})
+        print(f"parquet scan         {stats['p50']:>8.3f}s")
+
+        # Both paths must agree before their timings mean anything
+        assert actual[0].keys() == expected[0].keys(), (actual[0], expected[0])
+        assert all(abs(actual[0][k] - expected[0][k]) < 1e-9 for k in expected[0]), (actual[0], expected[0])
+        assert statistics.fmean(d for d, _ in actual[1]) == statistics.fmean(d for d, _ in expected[1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    path = write_results("columnar", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
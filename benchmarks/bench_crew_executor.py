@@ -0,0 +1,116 @@
+"""Crew throughput on threads (crew built per query) vs the process-pool executor (warm templates).
+
+Runs the same queries through a CrewAI crew with a fake LLM (see ``fakes.py``) two ways:
+
+- ``threads``: ``shared.registry.make_runner`` on a thread pool, building Agent/Task/Crew per query,
+  as the worker and batch modes do.
+- ``processes``: ``shared.crew_executor.CrewExecutor``, kicking off warm crew templates in worker
+  processes.
+
+With the default zero LLM latency the runs measure CrewAI's own orchestration cost, which is where
+the GIL stops threads from scaling; raise ``--latency-ms`` to see the mix with I/O wait.
+
+Usage:
+    python benchmarks/bench_crew_executor.py
+    python benchmarks/bench_crew_executor.py --agent content --queries 200 --parallelism 2,4,8 --latency-ms 50
+"""
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import percentiles, write_results
+
+QUERIES = {
+    "research": [
+        "How long does shipping take?",
+        "What payment methods do you accept?",
+        "My bluetooth headphones keep disconnecting",
+        "My device won't turn on and I want a refund",
+    ],
+    "content": ["The Future of AI Agents", "Observability for LLM apps", "Vector databases"],
+}
+
+
+def _collect(start: float, submitted: list) -> tuple[float, list[float]]:
+    # Latency from submission, so time waiting for a free thread/process counts in both modes
+    latencies = []
+    for sent, future in submitted:
+        future.result()
+        latencies.append(time.perf_counter() - sent)
+    return time.perf_counter() - start, latencies
+
+
+def run_threads(agent: str, queries: list[str], parallelism: int, llm_factory) -> tuple[float, list[float]]:
+    from shared.registry import make_runner
+
+    runner = make_runner(agent, llm=llm_factory())
+    with ThreadPoolExecutor(max_workers=parallelism) as pool:
+        start = time.perf_counter()
+        return _collect(start, [(time.perf_counter(), pool.submit(runner, query)) for query in queries])
+
+
+def run_processes(agent: str, queries: list[str], parallelism: int, llm_factory) -> tuple[float, list[float]]:
+    from shared.crew_executor import CrewExecutor
+
+    with CrewExecutor([agent], processes=parallelism, llm_factory=llm_factory) as executor:
+        executor.warm()
+        start = time.perf_counter()
+        return _collect(start, [(time.perf_counter(), executor.submit(agent, query)) for query in queries])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CrewAI kickoff throughput on threads vs a process pool")
+    parser.add_argument("--agent", choices=sorted(QUERIES), default="research", help="Crew to run (default: research)")
+    parser.add_argument("--queries", type=int, default=48, help="Kickoffs per run (default: 48)")
+    parser.add_argument("--parallelism", default="1,4", help="Threads / processes to compare (default: 1,4)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median fake LLM call latency (default: 0)")
+    parser.add_argument("--output-tokens", type=int, default=100, help="Median generated tokens per answer")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/crew_executor_<timestamp>.json)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench-fake")
+    os.environ.update(OTEL_SDK_DISABLED="true", CREWAI_DISABLE_TELEMETRY="true", CREWAI_TRACING_ENABLED="false")
+    from fakes import FakeCrewLLM
+
+    llm_factory = functools.partial(
+        FakeCrewLLM, model="fake", base_latency_s=args.latency_ms / 1000, output_tokens=args.output_tokens
+    )
+    queries = [QUERIES[args.agent][i % len(QUERIES[args.agent])] for i in range(args.queries)]
+
+    # Crew verbose output would dominate the terminal; the work is the same without it
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    saved = {fd: os.dup(fd) for fd in (1, 2)}
+    results = []
+    try:
+        for parallelism in (int(p) for p in args.parallelism.split(",") if p):
+            for mode, run in (("threads", run_threads), ("processes", run_processes)):
+                for fd in saved:
+                    os.dup2(devnull, fd)
+                elapsed, latencies = run(args.agent, queries, parallelism, llm_factory)
+                for fd, original in saved.items():
+                    os.dup2(original, fd)
+                stats = percentiles(latencies)
+                row = {
+                    "name": "crew_executor",
+                    "params": {"agent": args.agent, "mode": mode, "parallelism": parallelism},
+                    "throughput_per_s": len(queries) / elapsed,
+                    "median_s": stats["p50"],
+                    "p95_s": stats["p95"],
+                }
+                results.append(row)
+                print(
+                    f"{mode:<9} x{parallelism:<3} {row['throughput_per_s']:>7.2f} kickoffs/s  "
+                    f"p50={row['median_s'] * 1000:>8.1f}ms p95={row['p95_s'] * 1000:>8.1f}ms"
+                )
+    finally:
+        for fd, original in saved.items():
+            os.dup2(original, fd)
+
+    path = write_results("crew_executor", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
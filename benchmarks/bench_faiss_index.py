@@ -0,0 +1,119 @@
+"""Recall/latency/memory benchmark for the RAG FAISS index types.
+
+Builds each index type with the same ``make_index``/``train_index`` code the RAG knowledge base
+uses, over clustered synthetic vectors, and reports recall@k against exact (flat) search, p50/p99
+single-query latency, build and train time, and the serialized index size as memory footprint.
+IVF types are swept over ``nprobe`` and HNSW over ``efSearch``.
+
+Usage:
+    python benchmarks/bench_faiss_index.py
+    python benchmarks/bench_faiss_index.py --sizes 100000,1000000 --dim 384 --nprobe 4,16,64 --ef-search 16,64,256
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from common import load_module, percentiles, write_results
+
+
+def clustered_vectors(n: int, dim: int, seed: int = 0, clusters: int = 256, latent_dim: int = 32) -> np.ndarray:
+    """L2-normalized vectors shaped like text embeddings: Gaussian clusters in a low-dimensional
+    latent space, projected to ``dim`` dimensions. Corpus and queries share the projection."""
+    projection = np.random.default_rng(1234).standard_normal((latent_dim, dim)).astype(np.float32)
+    centers = np.random.default_rng(5678).standard_normal((clusters, latent_dim)).astype(np.float32)
+    rng = np.random.default_rng(seed)
+    latent = centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, latent_dim)).astype(np.float32)
+    vectors = latent @ projection + 0.1 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def search_latencies(index, queries: np.ndarray, k: int) -> tuple[np.ndarray, list[float]]:
+    found, samples = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        samples.append(time.perf_counter() - start)
+        found.append(ids[0])
+    return np.array(found), samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k, latency and memory of FAISS index types")
+    parser.add_argument("--sizes", default="100000", help="Corpus sizes (default: 100000)")
+    parser.add_argument("--dim", type=int, default=256, help="Vector dimension (default: 256)")
+    parser.add_argument("--types", default="flat,ivf,hnsw,ivfpq", help="Index types to benchmark")
+    parser.add_argument("--queries", type=int, default=500, help="Queries per configuration (default: 500)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query, for recall@k (default: 10)")
+    parser.add_argument("--nprobe", default="4,16,64", help="IVF nprobe values to sweep (default: 4,16,64)")
+    parser.add_argument("--ef-search", default="16,64,256", help="HNSW efSearch values to sweep (default: 16,64,256)")
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads (default: 1)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/faiss_index_<timestamp>.json)")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+    rag = load_module("agents-langgraph/rag/tools.py", "bench_rag_tools")
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        vectors = clustered_vectors(size, args.dim)
+        queries = clustered_vectors(args.queries, args.dim, seed=1)
+        exact = faiss.IndexFlatL2(args.dim)
+        exact.add(vectors)
+        _, truth = exact.search(queries, args.k)
+
+        for index_type in args.types.split(","):
+            start = time.perf_counter()
+            index = rag.make_index(index_type, args.dim, size)
+            rag.train_index(index, vectors)
+            trained = time.perf_counter()
+            index.add(vectors)
+            built = time.perf_counter()
+            memory = len(faiss.serialize_index(index))
+
+            if index_type in ("ivf", "ivfpq"):
+                sweep = [("nprobe", int(v)) for v in args.nprobe.split(",")]
+            elif index_type == "hnsw":
+                sweep = [("ef_search", int(v)) for v in args.ef_search.split(",")]
+            else:
+                sweep = [(None, None)]
+            for knob, value in sweep:
+                if knob == "nprobe":
+                    index.nprobe = value
+                elif knob == "ef_search":
+                    index.hnsw.efSearch = value
+                found, samples = search_latencies(index, queries, args.k)
+                stats = percentiles(samples)
+                params = {"type": index_type, "size": size, "dim": args.dim, "k": args.k}
+                if knob:
+                    params[knob] = value
+                row = {
+                    "name": "faiss_search",
+                    "params": params,
+                    f"recall_at_{args.k}": recall_at_k(found, truth),
+                    "median_s": stats["p50"],
+                    "p99_s": stats["p99"],
+                    "train_s": trained - start,
+                    "build_s": built - start,
+                    "memory_bytes": memory,
+                    "bytes_per_vector": memory / size,
+                }
+                results.append(row)
+                label = f"{index_type}" + (f" {knob}={value}" if knob else "")
+                print(
+                    f"size={size:<9} {label:<20} recall@{args.k}={row[f'recall_at_{args.k}']:.3f} "
+                    f"p50={stats['p50'] * 1e6:>9.1f}us p99={stats['p99'] * 1e6:>9.1f}us "
+                    f"build={row['build_s']:>7.2f}s mem={memory / 2**20:>8.1f}MB"
+                )
+
+    path = write_results("faiss_index", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
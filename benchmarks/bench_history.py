@@ -0,0 +1,126 @@
+"""Long-session benchmark for the calculator workflow's bounded message history.
+
+Runs a multi-turn session through the real calculator workflow with a fake tool-calling model and
+reports, per history budget, the prompt tokens sent to the model, the size of the conversation state
+and the per-turn latency as the session grows. Budget ``0`` is the unbounded ``add_messages``
+behaviour. Each budget runs in a fresh interpreter, since the budget is read when the agent loads.
+
+Usage:
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --turns 500 --budgets 0,2000,8000 --ms-per-1k-tokens 20
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from common import percentiles, write_results
+
+EXPRESSIONS = [
+    "2 + 2",
+    "sqrt(144) * pi",
+    "log10(1e6) + exp(2) - sin(0.5)",
+    "sum([1, 2, 3, 4, 5]) / max(1, 2)",
+    "round(pow(1.05, 30) * 1000, 2)",
+]
+
+
+def run_session(budget: int, turns: int, ms_per_1k_tokens: float, report_every: int) -> list[dict]:
+    os.environ["AGENT_HISTORY_MAX_TOKENS"] = str(budget)
+    from fakes import FakeToolCallingChatModel
+    from langchain_core.messages import HumanMessage
+    from langchain_core.messages.utils import count_tokens_approximately
+
+    from shared.registry import load_agent
+
+    calculator = load_agent("calculator")
+    llm = FakeToolCallingChatModel(latency_per_1k_input_tokens_s=ms_per_1k_tokens / 1000)
+    workflow = calculator.create_workflow(llm=llm)
+
+    messages, rows, latencies, prompt_tokens, call_tokens = [], [], [], [], []
+    for turn in range(1, turns + 1):
+        # The caller resends whatever state the previous turn returned
+        inputs = {"messages": messages + [HumanMessage(content=EXPRESSIONS[turn % len(EXPRESSIONS)])]}
+        start = time.perf_counter()
+        result = workflow.invoke(inputs)
+        latencies.append(time.perf_counter() - start)
+        messages = result["messages"]
+        # Model calls made this turn come after the turn's (last) human message
+        last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        # A turn is two model calls (tool call, then answer); each one is held to the budget
+        calls = [(getattr(m, "usage_metadata", None) or {}).get("input_tokens", 0) for m in messages[last_human:]]
+        sent = sum(calls)
+        prompt_tokens.append(sent)
+        call_tokens.append(max(calls, default=0))
+        if turn % report_every == 0 or turn == turns:
+            window = latencies[-report_every:]
+            rows.append(
+                {
+                    "name": "calculator_session",
+                    "params": {"budget": budget, "turn": turn},
+                    "prompt_tokens": sent,
+                    "state_messages": len(messages),
+                    "state_tokens": count_tokens_approximately(messages),
+                    "median_s": statistics.median(window),
+                    "mean_s": statistics.fmean(window),
+                }
+            )
+            print(
+                f"budget={budget:<6} turn={turn:<5} prompt_tokens={sent:<7} state_messages={len(messages):<6} "
+                f"turn_median={rows[-1]['median_s'] * 1000:.1f}ms"
+            )
+    stats = percentiles(latencies)
+    rows.append(
+        {
+            "name": "calculator_session_total",
+            "params": {"budget": budget, "turns": turns},
+            "total_prompt_tokens": sum(prompt_tokens),
+            "max_prompt_tokens": max(prompt_tokens),
+            "max_call_prompt_tokens": max(call_tokens),
+            "mean_s": statistics.fmean(latencies),
+            "median_s": stats["p50"],
+            "p95_s": stats["p95"],
+            "p99_s": stats["p99"],
+        }
+    )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt size and latency over long calculator sessions")
+    parser.add_argument("--turns", type=int, default=200, help="Turns per session (default: 200)")
+    parser.add_argument("--budgets", default="0,1000,4000", help="History token budgets, 0 = unbounded")
+    parser.add_argument(
+        "--ms-per-1k-tokens",
+        type=float,
+        default=10.0,
+        help="Simulated model latency per 1000 prompt tokens (default: 10)",
+    )
+    parser.add_argument("--report-every", type=int, default=25, help="Turns between progress rows (default: 25)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/history_<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for budget in (int(b) for b in args.budgets.split(",") if b):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results += pool.submit(run_session, budget, args.turns, args.ms_per_1k_tokens, args.report_every).result()
+
+    print(
+        f"\n{'budget':>8} {'total prompt tokens':>20} {'max per turn':>13} {'max per call':>13} "
+        f"{'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for row in results:
+        if row["name"] == "calculator_session_total":
+            print(
+                f"{row['params']['budget']:>8} {row['total_prompt_tokens']:>20} {row['max_prompt_tokens']:>13} "
+                f"{row['max_call_prompt_tokens']:>13} "
+                f"{row['median_s'] * 1000:>8.1f} {row['p95_s'] * 1000:>8.1f}"
+            )
+    path = write_results("history", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
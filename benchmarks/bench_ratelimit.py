@@ -0,0 +1,149 @@
+"""Goodput under rate limits with and without the client-side limiter (``shared/ratelimit.py``).
+
+Starts the local OpenAI stub (``shared/openai_stub.py``) with account-style limits in a separate
+process and drives it from many threads through ``ChatOpenAI`` (with the SDK's own retries), in
+three modes:
+
+- ``off``: no client-side limiting; bursts hit 429s and the SDK retries pile up.
+- ``aimd``: adaptive concurrency only, discovering the limit from 429s and latency.
+- ``aimd+buckets``: adaptive concurrency plus request/token buckets set to the account limits.
+
+Reports successful calls/s, the 429s the server sent, calls that failed after retries, and
+latency percentiles of successful calls.
+
+Usage:
+    python benchmarks/bench_ratelimit.py
+    python benchmarks/bench_ratelimit.py --threads 128 --rpm 1200 --tpm 60000 --max-concurrency 16 --duration 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from common import REPO_ROOT, percentiles, write_results
+
+from shared.ratelimit import AsyncRateLimitedTransport, RateLimitedTransport, RateLimiter
+
+MODES = ("off", "aimd", "aimd+buckets")
+
+
+def start_stub(args) -> tuple[subprocess.Popen, str]:
+    command = [
+        sys.executable,
+        "shared/openai_stub.py",
+        "--port",
+        "0",
+        "--rpm",
+        str(args.rpm),
+        "--tpm",
+        str(args.tpm),
+        "--max-concurrency",
+        str(args.max_concurrency),
+        "--latency-ms",
+        str(args.latency_ms),
+    ]
+    process = subprocess.Popen(
+        command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True, env={**os.environ, "PYTHONPATH": REPO_ROOT}
+    )
+    line = process.stdout.readline()  # "Listening on http://host:port/v1 ..."
+    return process, line.split()[2]
+
+
+def run_mode(mode: str, args) -> dict:
+    from langchain_openai import ChatOpenAI
+    from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+    stub, base_url = start_stub(args)
+    limiter = None
+    kwargs = {}
+    if mode != "off":
+        buckets = mode == "aimd+buckets"
+        limiter = RateLimiter(
+            requests_per_minute=args.rpm if buckets else None,
+            tokens_per_minute=args.tpm if buckets else None,
+            max_concurrency=args.threads,
+        )
+        kwargs = {
+            "http_client": DefaultHttpxClient(transport=RateLimitedTransport(limiter)),
+            "http_async_client": DefaultAsyncHttpxClient(transport=AsyncRateLimitedTransport(limiter)),
+        }
+    llm = ChatOpenAI(model="gpt-4o-mini", base_url=base_url, api_key="stub", max_retries=args.max_retries, **kwargs)
+
+    latencies, failures = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                llm.invoke("Summarise the customer's refund request in one sentence.")
+            except Exception as e:
+                with lock:
+                    failures.append(type(e).__name__)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with urllib.request.urlopen(base_url.removesuffix("/v1") + "/stats") as response:
+        server = json.load(response)
+    stub.terminate()
+    stub.wait()
+
+    stats = percentiles(latencies)
+    return {
+        "name": "ratelimit",
+        "params": {"mode": mode, "threads": args.threads, "rpm": args.rpm, "tpm": args.tpm},
+        "goodput_per_s": len(latencies) / elapsed,
+        "successes": len(latencies),
+        "failed_after_retries": len(failures),
+        "server_429s": server["status_counts"].get("429", 0),
+        "server_max_in_flight": server["max_in_flight"],
+        "median_s": stats["p50"],
+        "p95_s": stats["p95"],
+        "p99_s": stats["p99"],
+        "limiter": limiter.stats() if limiter else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Goodput under 429s with and without client-side rate limiting")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Modes to run (default: {','.join(MODES)})")
+    parser.add_argument("--threads", type=int, default=64, help="Concurrent callers (default: 64)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode (default: 10)")
+    parser.add_argument("--rpm", type=float, default=1200, help="Stub requests-per-minute limit (default: 1200)")
+    parser.add_argument("--tpm", type=float, default=100_000, help="Stub tokens-per-minute limit (default: 100000)")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="Stub concurrent request cap (default: 16)")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub latency when unloaded (default: 100)")
+    parser.add_argument("--max-retries", type=int, default=2, help="OpenAI SDK retries per call (default: 2)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/ratelimit_<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for mode in (m for m in args.modes.split(",") if m):
+        row = run_mode(mode, args)
+        results.append(row)
+        print(
+            f"{mode:<13} goodput={row['goodput_per_s']:>7.1f}/s failed={row['failed_after_retries']:<5} "
+            f"429s={row['server_429s']:<6} p50={(row['median_s'] or 0) * 1000:>7.1f}ms "
+            f"p99={(row['p99_s'] or 0) * 1000:>8.1f}ms"
+            + (f" limit={row['limiter']['concurrency_limit']}" if row["limiter"] else "")
+        )
+    path = write_results("ratelimit", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
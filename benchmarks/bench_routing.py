@@ -0,0 +1,114 @@
+"""Early-exit routing benchmark for the customer support crew.
+
+Runs a mix of FAQ, troubleshooting and policy queries through the research crew with a fake LLM
+(see ``fakes.py``), once with routing off (every query goes through the escalation specialist) and
+once with routing on. Reports the share of queries that ended after the support agent, per-query
+latency and token usage, and the latency saved as estimated by ``routing.get_routing_stats()``.
+
+Usage:
+    python benchmarks/bench_routing.py
+    python benchmarks/bench_routing.py --repeat 10 --latency-ms 400 --output-tokens 150
+"""
+import argparse
+import os
+import statistics
+import time
+
+from common import percentiles, write_results
+
+# FAQ-style questions the support agent answers alone, and cases that need policy review
+QUERIES = [
+    "How long does shipping take?",
+    "What payment methods do you accept?",
+    "How do I reset my account password?",
+    "My bluetooth headphones keep disconnecting",
+    "The screen flickers after the last update",
+    "My battery drains quickly",
+    "My device won't turn on and I want a refund",
+    "My charger is broken, is it covered by warranty?",
+    "I found it cheaper elsewhere, do you price match?",
+    "Please delete my personal data",
+]
+
+
+def run(routing: bool, module, make_llm, repeat: int) -> dict:
+    stats = module.get_routing_stats()
+    before = stats.snapshot()
+    latencies, tokens = [], []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            output = module.create_customer_support_crew(query, llm=make_llm(), routing=routing).kickoff()
+            latencies.append(time.perf_counter() - start)
+            tokens.append(output.token_usage.total_tokens)
+    after = stats.snapshot()
+    summary = percentiles(latencies)
+    resolved = after["resolved"] - before["resolved"]
+    return {
+        "name": "routing",
+        "params": {"routing": "on" if routing else "off", "queries": len(latencies)},
+        "resolved": resolved,
+        "escalated": after["escalated"] - before["escalated"] if routing else len(latencies),
+        "mean_s": statistics.fmean(latencies),
+        "median_s": summary["p50"],
+        "p95_s": summary["p95"],
+        "mean_tokens": statistics.fmean(tokens),
+        "latency_saved_s": resolved * (after["escalation_stage_mean_s"] or 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Customer support crew latency with and without early-exit routing")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the query mix per mode (default: 3)")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median fake LLM call latency (default: 200)")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Lognormal sigma of the latency")
+    parser.add_argument("--output-tokens", type=int, default=100, help="Median generated tokens per answer")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/routing_<timestamp>.json)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench-fake")
+    os.environ.update(OTEL_SDK_DISABLED="true", CREWAI_DISABLE_TELEMETRY="true", CREWAI_TRACING_ENABLED="false")
+    from fakes import FakeCrewLLM
+
+    from shared.registry import load_agent
+
+    module = load_agent("research")
+
+    def make_llm():
+        # One per crew, since the LLM accumulates the token usage the crew reports
+        return FakeCrewLLM(
+            model="fake",
+            base_latency_s=args.latency_ms / 1000,
+            latency_sigma=args.latency_sigma,
+            output_tokens=args.output_tokens,
+        )
+
+    # Crew verbose output would dominate the terminal; the work is the same without it
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    saved = {fd: os.dup(fd) for fd in (1, 2)}
+    for fd in saved:
+        os.dup2(devnull, fd)
+    try:
+        results = [run(routing, module, make_llm, args.repeat) for routing in (False, True)]
+    finally:
+        for fd, original in saved.items():
+            os.dup2(original, fd)
+
+    for row in results:
+        print(
+            f"routing={row['params']['routing']:<3} resolved={row['resolved']:<4} escalated={row['escalated']:<4} "
+            f"mean={row['mean_s'] * 1000:>7.1f}ms p50={row['median_s'] * 1000:>7.1f}ms "
+            f"p95={row['p95_s'] * 1000:>7.1f}ms tokens={row['mean_tokens']:>7.0f}"
+        )
+    off, on = results
+    print(
+        f"Early exits: {on['resolved'] / on['params']['queries']:.0%} of queries, "
+        f"{on['latency_saved_s']:.2f}s saved (estimated), "
+        f"mean latency {(on['mean_s'] / off['mean_s'] - 1) * 100:+.1f}%"
+    )
+    path = write_results("routing", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Micro-benchmarks for the tool and retrieval hot paths.
+
+Covers ``calculate``/``convert_units`` (calculator), ``_search_documents`` (research crew KB),
+``search_documents``/``format_docs`` (RAG) and span attribute encoding, over synthetic knowledge
+bases embedded with a deterministic local embedder. Results are written as JSON.
+
+Usage:
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --sizes 10000,100000,1000000 --tracing both
+    python benchmarks/compare.py benchmarks/results/tools_A.json benchmarks/results/tools_B.json
+"""
+import argparse
+import json
+
+from common import (
+    HashEmbeddings,
+    enable_tracing,
+    load_module,
+    measure,
+    synthetic_documents,
+    synthetic_queries,
+    write_results,
+)
+
+EXPRESSIONS = [
+    "2 + 2",
+    "sqrt(144) * pi",
+    "log10(1e6) + exp(2) - sin(0.5)",
+    "sum([1, 2, 3, 4, 5]) / max(1, 2)",
+    "round(pow(1.05, 30) * 1000, 2)",
+]
+CONVERSIONS = [(100, "km", "mi"), (5, "lb", "kg"), (72, "F", "C"), (3, "ft", "cm"), (300, "K", "F")]
+
+
+def _row(name: str, params: dict, stats: dict) -> dict:
+    print(f"{name:<28} {json.dumps(params, sort_keys=True):<60} median={stats['median_s'] * 1e6:>12.1f}us")
+    return {"name": name, "params": params, **stats}
+
+
+def bench_calculator(calculator, batch_sizes, repeat, tracing):
+    results = []
+    for batch in batch_sizes:
+        expressions = (EXPRESSIONS * (batch // len(EXPRESSIONS) + 1))[:batch]
+        conversions = (CONVERSIONS * (batch // len(CONVERSIONS) + 1))[:batch]
+        stats = measure(lambda: [calculator.calculate(e) for e in expressions], repeat=repeat)
+        results.append(_row("calculate", {"batch": batch, "tracing": tracing}, stats))
+        stats = measure(lambda: [calculator.convert_units(*c) for c in conversions], repeat=repeat)
+        results.append(_row("convert_units", {"batch": batch, "tracing": tracing}, stats))
+    return results
+
+
+def bench_keyword_search(research, kbs, queries, repeat, tracing):
+    results = []
+    for size, documents in kbs.items():
+        stats = measure(
+            lambda: [research._search_documents(q, "faq", documents) for q in queries],
+            repeat=repeat,
+            warmup=0 if size >= 1_000_000 else 1,
+        )
+        stats = {k: v / len(queries) if k.endswith("_s") else v for k, v in stats.items()}
+        stats["ops_per_s"] = 1.0 / stats["median_s"]
+        results.append(_row("_search_documents", {"kb_size": size, "tracing": tracing}, stats))
+    return results
+
+
+def bench_vector_search(rag, stores, queries, batch_sizes, repeat, tracing):
+    results = []
+    for size, vector_store in stores.items():
+        for k in batch_sizes:
+            retriever = vector_store.as_retriever(search_kwargs={"k": k})
+            stats = measure(lambda: [rag.search_documents(q, retriever) for q in queries], repeat=repeat)
+            stats = {key: v / len(queries) if key.endswith("_s") else v for key, v in stats.items()}
+            stats["ops_per_s"] = 1.0 / stats["median_s"]
+            results.append(_row("search_documents", {"kb_size": size, "k": k, "tracing": tracing}, stats))
+    return results
+
+
+def bench_formatting(rag, documents, batch_sizes, repeat, tracing):
+    from langchain_core.documents import Document
+
+    results = []
+    for k in batch_sizes:
+        docs = [
+            Document(page_content=d["content"], metadata={"id": d["id"], "title": d["title"]}) for d in documents[:k]
+        ]
+        stats = measure(lambda: rag.format_docs(docs), repeat=repeat, number=100)
+        results.append(_row("format_docs", {"k": k, "tracing": tracing}, stats))
+
+        documents_list = [{"content": d.page_content, "metadata": dict(d.metadata)} for d in docs]
+        stats = measure(
+            lambda: json.dumps([{"role": "assistant", "content": documents_list}]), repeat=repeat, number=100
+        )
+        results.append(_row("span_attribute_encoding", {"k": k, "tracing": tracing}, stats))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for tool and retrieval hot paths")
+    parser.add_argument("--sizes", default="10000,100000", help="Keyword KB sizes (default: 10000,100000)")
+    parser.add_argument("--kb-sizes", default="10000", help="Vector KB sizes for search_documents (default: 10000)")
+    parser.add_argument("--batch-sizes", default="3,10,50", help="Batch sizes / k values (default: 3,10,50)")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per timed search batch (default: 20)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark (default: 5)")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension (default: 256)")
+    parser.add_argument("--tracing", choices=["off", "on", "both"], default="both", help="Span variants to run")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/tools_<timestamp>.json)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    kb_sizes = [int(s) for s in args.kb_sizes.split(",") if s]
+    batch_sizes = [int(s) for s in args.batch_sizes.split(",") if s]
+    only = set(args.only.split(",")) if args.only else None
+
+    def enabled(name):
+        return only is None or name in only
+
+    calculator = load_module("agents-langgraph/calculator/tools.py", "bench_calculator_tools")
+    rag = load_module("agents-langgraph/rag/tools.py", "bench_rag_tools")
+    research = None
+    if enabled("_search_documents"):
+        research = load_module("agents-crewai/research/tools.py", "bench_research_tools")
+
+    queries = synthetic_queries(args.queries)
+    kbs = {size: synthetic_documents(size) for size in sizes} if enabled("_search_documents") else {}
+    stores = {}
+    if enabled("search_documents"):
+        embeddings = HashEmbeddings(args.dim)
+        for size in kb_sizes:
+            print(f"Building vector KB with {size} documents...")
+            stores[size], _ = rag.create_knowledge_base(synthetic_documents(size), embeddings)
+    format_docs_input = synthetic_documents(max(batch_sizes), seed=2)
+
+    passes = ["off", "on"] if args.tracing == "both" else [args.tracing]
+    results = []
+    for tracing in passes:
+        if tracing == "on":
+            enable_tracing()
+        if enabled("calculate") or enabled("convert_units"):
+            results += bench_calculator(calculator, batch_sizes, args.repeat, tracing)
+        if kbs:
+            results += bench_keyword_search(research, kbs, queries, args.repeat, tracing)
+        if stores:
+            results += bench_vector_search(rag, stores, queries, batch_sizes, args.repeat, tracing)
+        if enabled("format_docs") or enabled("span_attribute_encoding"):
+            results += bench_formatting(rag, format_docs_input, batch_sizes, args.repeat, tracing)
+
+    path = write_results("tools", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Shared helpers for the benchmark scripts: module loading, synthetic data, timing and result files."""
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+VOCABULARY = (
+    "battery charge refund warranty shipping order device screen bluetooth firmware reset "
+    "payment account password return policy claim repair replacement delivery express "
+    "machine learning neural network transformer embedding vector retrieval search index "
+    "model training inference latency throughput token context document query answer"
+).split()
+
+
+def load_module(relative_path: str, name: str):
+    """Load a module from a repo-relative file path under a unique name.
+
+    The agent directories reuse module names (``tools``, ``prompt``), so they cannot be imported normally
+    side by side.
+    """
+    path = os.path.join(REPO_ROOT, relative_path)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic local embedder using the hashing trick (no network, stable across runs)."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            h = zlib.crc32(token.encode())
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text).tolist()
+
+
+def synthetic_documents(n: int, seed: int = 0, words: int = 40, prefix: str = "doc") -> list[dict]:
+    """Generate ``n`` deterministic documents shaped like the repo's knowledge bases."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"{prefix}{i}",
+            "title": " ".join(rng.choices(VOCABULARY, k=3)).title(),
+            "content": " ".join(rng.choices(VOCABULARY, k=words)) + ".",
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_queries(n: int, seed: int = 1, words: int = 4) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(VOCABULARY, k=words)) for _ in range(n)]
+
+
+def measure(fn, *, repeat: int = 5, number: int = 1, warmup: int = 1) -> dict:
+    """Time ``fn`` and return per-call statistics in seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "n": repeat * number,
+        "mean_s": statistics.fmean(samples),
+        "median_s": median,
+        "p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_s": samples[0],
+        "ops_per_s": 1.0 / median if median else float("inf"),
+    }
+
+
+def percentiles(samples: list[float], points=(50, 95, 99)) -> dict:
+    """Return ``{"p50": ..., ...}`` for a list of samples (nearest-rank)."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+
+
+def enable_tracing():
+    """Install a recording tracer provider whose spans are batched and discarded.
+
+    Measures the in-process cost of span creation and attribute encoding without any network I/O.
+    Can only be called once per process (OpenTelemetry does not allow replacing the provider).
+    """
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+    class NullExporter(SpanExporter):
+        def export(self, spans):
+            return SpanExportResult.SUCCESS
+
+    provider = TracerProvider()
+    provider.add_span_processor(BatchSpanProcessor(NullExporter()))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(suite: str, results: list[dict], output: str | None = None, params: dict | None = None) -> str:
+    """Write machine-readable results; returns the output path."""
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{suite}_{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    payload = {
+        "suite": suite,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": params or {},
+        },
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=2)
+    return output
+
+
+def result_key(result: dict) -> str:
+    """Stable identity of a result row, used to match rows across runs."""
+    return f"{result['name']} {json.dumps(result.get('params', {}), sort_keys=True)}"
@@ -0,0 +1,50 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+
+from common import result_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", help="Baseline result JSON")
+    parser.add_argument("candidate", help="Candidate result JSON")
+    parser.add_argument("--metric", default="median_s", help="Metric to compare (default: median_s)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown reported as a regression (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = {result_key(r): r for r in json.load(f)["results"]}
+    with open(args.candidate) as f:
+        candidate = {result_key(r): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key].get(args.metric), candidate[key].get(args.metric)
+        if not before or after is None:
+            continue
+        change = after / before - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:<90} {before:>12.6g} -> {after:>12.6g} ({change:+.1%}){flag}")
+
+    for key in sorted(baseline.keys() - candidate.keys()):
+        print(f"{key:<90} missing from candidate")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Deterministic stand-ins for the hosted LLMs, so agent graphs and crews can be benchmarked offline.
+
+Both fakes share the same simulated cost model: a base latency (optionally lognormally jittered),
+prefill time per 1000 prompt tokens and decode time per generated token, with the number of
+generated tokens drawn from a lognormal distribution around ``output_tokens``.
+"""
+import json
+import random
+import re
+import time
+from itertools import cycle, islice
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+try:
+    from crewai.llms.base_llm import BaseLLM
+except ImportError:  # LangGraph-only install
+    BaseLLM = None
+
+# First tool and its first argument in a CrewAI ReAct prompt
+REACT_TOOL = re.compile(r'Tool Name: (\S+)\nTool Arguments: \{\s*"properties": \{\s*"(\w+)"')
+FILLER = "the agent checked the relevant records and this answer summarises what it found".split()
+
+
+def simulate_call(model, input_tokens: int) -> str:
+    """Sleep for the simulated duration of one call and return the filler text it generated."""
+    output_tokens = 0
+    if model.output_tokens:
+        output_tokens = max(1, round(model.output_tokens * random.lognormvariate(0, model.output_tokens_sigma)))
+    delay = (
+        model.base_latency_s * (random.lognormvariate(0, model.latency_sigma) if model.latency_sigma else 1.0)
+        + model.latency_per_1k_input_tokens_s * input_tokens / 1000
+        + model.latency_per_output_token_s * output_tokens
+    )
+    if delay:
+        time.sleep(delay)
+    return " ".join(islice(cycle(FILLER), output_tokens))
+
+
+class FakeToolCallingChatModel(BaseChatModel):
+    """Calls ``tool_name`` once per user turn with the user's text, then answers with the tool output.
+
+    Latency is simulated as ``base_latency_s`` plus ``latency_per_1k_input_tokens_s`` for every 1000
+    prompt tokens, so prompt growth shows up in timings the way prefill cost does with a real model.
+    Final answers are padded with about ``output_tokens`` generated tokens. Usage metadata reports
+    approximate prompt and completion tokens.
+    """
+
+    tool_name: str = "calc_tool"
+    arg_name: str = "expression"
+    base_latency_s: float = 0.0
+    latency_sigma: float = 0.0
+    latency_per_1k_input_tokens_s: float = 0.0
+    latency_per_output_token_s: float = 0.0
+    output_tokens: int = 0
+    output_tokens_sigma: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        input_tokens = count_tokens_approximately(messages)
+        generated = simulate_call(self, input_tokens)
+        last = messages[-1]
+        if isinstance(last, HumanMessage):
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": self.tool_name, "args": {self.arg_name: last.content}, "id": f"call_{len(messages)}"}
+                ],
+            )
+        else:
+            content = last.content if isinstance(last, ToolMessage) else "Done."
+            message = AIMessage(content=f"The result is: {content} {generated}".rstrip())
+        output_tokens = count_tokens_approximately([message])
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return message
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._reply(messages)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            args = json.dumps(call["args"])
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[{"name": call["name"], "args": args, "id": call["id"], "index": 0}],
+                usage_metadata=message.usage_metadata,
+            )
+            yield ChatGenerationChunk(message=chunk)
+            return
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            chunk = AIMessageChunk(
+                content=word if last else word + " ",
+                usage_metadata=message.usage_metadata if last else None,
+            )
+            yield ChatGenerationChunk(message=chunk)
+
+
+if BaseLLM is not None:
+
+    class FakeCrewLLM(BaseLLM):
+        """CrewAI counterpart of ``FakeToolCallingChatModel`` for the ReAct agent loop.
+
+        On each task's first call it invokes the first tool listed in the agent's prompt with the
+        start of the task description, then gives a final answer. Token usage is tracked the way the
+        provider LLMs report it, so crew results carry usage metrics.
+        """
+
+        base_latency_s: float = 0.0
+        latency_sigma: float = 0.0
+        latency_per_1k_input_tokens_s: float = 0.0
+        latency_per_output_token_s: float = 0.0
+        output_tokens: int = 0
+        output_tokens_sigma: float = 0.0
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, **kwargs):
+            if isinstance(messages, str):
+                messages = [{"role": "user", "content": messages}]
+            input_tokens = count_tokens_approximately([(m["role"], str(m["content"])) for m in messages])
+            generated = simulate_call(self, input_tokens)
+            tool = REACT_TOOL.search(messages[0]["content"])
+            if tool and not any(m["role"] == "assistant" for m in messages):
+                task = " ".join(str(messages[-1]["content"]).split()[:12])
+                action_input = json.dumps({tool[2]: task})
+                content = f"Thought: I should search first.\nAction: {tool[1]}\nAction Input: {action_input}"
+            else:
+                content = f"Thought: I now know the final answer\nFinal Answer: {generated or 'Done.'}"
+            output_tokens = count_tokens_approximately([("assistant", content)])
+            self._track_token_usage_internal(
+                {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                }
+            )
+            return content
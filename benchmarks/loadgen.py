@@ -0,0 +1,255 @@
+"""Open-loop load generator for end-to-end agent latency and throughput.
+
+Drives each agent through the same warm runners the worker and batch modes use
+(``shared.registry.make_runner``), with the hosted LLM replaced by a fake whose latency and output
+length follow configurable distributions (see ``fakes.py``). Requests arrive at a fixed rate
+(Poisson or evenly spaced) regardless of how fast earlier ones complete, so a saturated agent shows
+up as growing queueing delay instead of a silently lower request rate. Latency is measured from
+each request's scheduled arrival, which avoids coordinated omission.
+
+Every agent runs once with telemetry off (``OTEL_SDK_DISABLED``) and once with telemetry on,
+exporting spans over OTLP/HTTP to the local ingest server (``shared/ingest_server.py``) or
+``--otlp-endpoint``. Each mode runs in a fresh interpreter, since the tracer provider can only be
+installed once per process. Reports p50/p95/p99 latency, queueing delay, service time and achieved
+throughput per agent and mode, and the latency overhead of telemetry.
+
+Usage:
+    python benchmarks/loadgen.py
+    python benchmarks/loadgen.py --agents weather,rag --rate 50 --duration 30 --concurrency 64
+    python benchmarks/loadgen.py --latency-ms 400 --latency-sigma 0.5 --output-tokens 200 --ms-per-output-token 5
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+from common import HashEmbeddings, percentiles, write_results
+
+# What each agent is asked; the fake LangGraph model passes the user text to (tool, argument)
+QUERIES = {
+    "weather": ["San Francisco", "Tokyo", "London", "New York"],
+    "calculator": ["2 + 2", "sqrt(144) * pi", "log10(1e6) + exp(2)", "round(pow(1.05, 30) * 1000, 2)"],
+    "rag": ["What is RAG?", "How do embeddings work?", "vector search", "retrieval augmented generation"],
+    "content": ["The Future of AI Agents", "Observability for LLM apps", "Vector databases"],
+    "research": ["My device won't turn on and I want a refund", "How long does shipping take?"],
+}
+FAKE_TOOLS = {
+    "weather": ("weather_tool", "city"),
+    "calculator": ("calc_tool", "expression"),
+    "rag": ("retrieve_documents", "query"),
+}
+
+
+def _enable_telemetry(endpoint: str) -> None:
+    os.environ.update(
+        OTEL_SERVICE_NAME="loadgen",
+        OTEL_EXPORTER_OTLP_TRACES_ENDPOINT=endpoint,
+        OTEL_EXPORTER_OTLP_TRACES_PROTOCOL="http/protobuf",
+        OTEL_EXPORTER_OTLP_HEADERS="Galileo-API-Key=loadgen,project=loadgen,logstream=loadgen",
+        OTEL_METRICS_EXPORTER="none",
+        OTEL_LOGS_EXPORTER="none",
+    )
+    try:
+        # Same setup as running under ``opentelemetry-instrument``: SDK from env plus installed instrumentors
+        from opentelemetry.instrumentation.auto_instrumentation import initialize
+
+        initialize()
+    except ImportError:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider()
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(provider)
+
+
+def _make_llm(framework: str, name: str, fake_args: dict):
+    from fakes import FakeCrewLLM, FakeToolCallingChatModel
+
+    if framework == "crewai":
+        return FakeCrewLLM(model="fake", **fake_args)
+    tool_name, arg_name = FAKE_TOOLS[name]
+    return FakeToolCallingChatModel(tool_name=tool_name, arg_name=arg_name, **fake_args)
+
+
+def drive(run, queries: list[str], rate: float, duration: float, concurrency: int, poisson: bool) -> list[dict]:
+    """Submit requests at ``rate`` per second for ``duration`` seconds; return one record per request."""
+    records = []
+    lock = threading.Lock()
+    rng = random.Random(0)
+
+    def request(scheduled: float, query: str):
+        started = time.perf_counter()
+        error = None
+        try:
+            run(query)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+        with lock:
+            records.append({"scheduled": scheduled, "started": started, "finished": finished, "error": error})
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadgen") as executor:
+        start = time.perf_counter()
+        offset, i = 0.0, 0
+        while offset < duration:
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(request, scheduled, queries[i % len(queries)])
+            i += 1
+            offset += rng.expovariate(rate) if poisson else 1.0 / rate
+    return records
+
+
+def summarize(records: list[dict]) -> dict:
+    ok = [r for r in records if r["error"] is None]
+    latency = percentiles([r["finished"] - r["scheduled"] for r in ok])
+    queue = percentiles([r["started"] - r["scheduled"] for r in ok])
+    service = percentiles([r["finished"] - r["started"] for r in ok])
+    span = max(r["finished"] for r in records) - min(r["scheduled"] for r in records) if records else 0
+    return {
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "throughput_rps": len(ok) / span if span else 0.0,
+        "median_s": latency["p50"],
+        "p95_s": latency["p95"],
+        "p99_s": latency["p99"],
+        "queue_p50_s": queue["p50"],
+        "queue_p99_s": queue["p99"],
+        "service_p50_s": service["p50"],
+        "service_p99_s": service["p99"],
+    }
+
+
+def run_mode(telemetry: bool, endpoint: str | None, agents: list[str], args: dict, fake_args: dict) -> list[dict]:
+    os.environ.setdefault("OPENAI_API_KEY", "loadgen-fake")
+    os.environ.update(CREWAI_DISABLE_TELEMETRY="true", CREWAI_TRACING_ENABLED="false")
+    if telemetry:
+        _enable_telemetry(endpoint)
+    else:
+        os.environ["OTEL_SDK_DISABLED"] = "true"
+    random.seed(args["seed"])
+
+    from opentelemetry import trace
+
+    from shared.registry import get_spec, load_agent, make_runner
+
+    # Agents print (crew verbose output, logs) on the request path; keep that cost but not the noise.
+    # This is a dedicated worker process, so its stdout can go to /dev/null.
+    os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+    rows = []
+    for name in agents:
+        params = {"agent": name, "telemetry": "on" if telemetry else "off", "rate": args["rate"]}
+        spec = get_spec(name)
+        try:
+            module = load_agent(name)
+            if hasattr(module, "get_retriever"):
+                module.get_retriever(HashEmbeddings())
+            runner = make_runner(name, llm=_make_llm(spec.framework, name, fake_args))
+
+            def run(query, runner=runner):
+                result = runner(query)
+                if not result.response:
+                    raise RuntimeError("empty response")
+
+            for query in QUERIES[name][: args["warmup"]]:
+                run(query)
+        except Exception as e:
+            # An agent that can't load or answer is reported; the other agents still run
+            rows.append({"name": "loadgen", "params": params, **summarize([]), "error": f"{type(e).__name__}: {e}"})
+            continue
+        records = drive(
+            run, QUERIES[name], args["rate"], args["duration"], args["concurrency"], args["arrivals"] == "poisson"
+        )
+        rows.append({"name": "loadgen", "params": params, **summarize(records)})
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "force_flush"):
+        provider.force_flush()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test of the agents with a fake LLM")
+    parser.add_argument("--agents", default="weather,calculator,rag,content,research", help="Agents to drive")
+    parser.add_argument("--rate", type=float, default=20.0, help="Arrival rate in requests/s (default: 20)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals per agent (default: 10)")
+    parser.add_argument("--arrivals", choices=("poisson", "constant"), default="poisson", help="Arrival process")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in service at once (default: 32)")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per agent first (default: 2)")
+    parser.add_argument("--telemetry", default="off,on", help="Telemetry modes to compare (default: off,on)")
+    parser.add_argument("--otlp-endpoint", help="OTLP/HTTP traces endpoint (default: a local ingest server)")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median fake LLM call latency (default: 200)")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Lognormal sigma of the latency")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=5.0, help="Prefill latency per 1000 prompt tokens")
+    parser.add_argument("--output-tokens", type=int, default=100, help="Median generated tokens per answer")
+    parser.add_argument("--output-tokens-sigma", type=float, default=0.5, help="Lognormal sigma of output tokens")
+    parser.add_argument("--ms-per-output-token", type=float, default=0.0, help="Decode latency per generated token")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake LLM distributions")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/loadgen_<timestamp>.json)")
+    args = parser.parse_args()
+
+    agents = [a for a in args.agents.split(",") if a]
+    fake_args = {
+        "base_latency_s": args.latency_ms / 1000,
+        "latency_sigma": args.latency_sigma,
+        "latency_per_1k_input_tokens_s": args.ms_per_1k_tokens / 1000,
+        "latency_per_output_token_s": args.ms_per_output_token / 1000,
+        "output_tokens": args.output_tokens,
+        "output_tokens_sigma": args.output_tokens_sigma,
+    }
+
+    server = None
+    endpoint = args.otlp_endpoint
+    if endpoint is None and "on" in args.telemetry:
+        from shared.ingest_server import TRACE_PATHS, create_server
+
+        server = create_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}{TRACE_PATHS[0]}"
+
+    results = []
+    for mode in (m for m in args.telemetry.split(",") if m):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results += pool.submit(run_mode, mode == "on", endpoint, agents, vars(args), fake_args).result()
+
+    print(
+        f"\n{'agent':<11} {'otel':<4} {'req':>5} {'err':>4} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'queue p99':>10} {'service p50':>12}"
+    )
+    for row in results:
+        if "error" in row:
+            print(f"{row['params']['agent']:<11} {row['params']['telemetry']:<4} failed: {row['error']}")
+            continue
+        ms = {k: (row[k] or 0) * 1000 for k in ("median_s", "p95_s", "p99_s", "queue_p99_s", "service_p50_s")}
+        print(
+            f"{row['params']['agent']:<11} {row['params']['telemetry']:<4} {row['requests']:>5} {row['errors']:>4} "
+            f"{row['throughput_rps']:>7.1f} {ms['median_s']:>8.1f} {ms['p95_s']:>8.1f} {ms['p99_s']:>8.1f} "
+            f"{ms['queue_p99_s']:>10.1f} {ms['service_p50_s']:>12.1f}"
+        )
+
+    by_mode = {(r["params"]["agent"], r["params"]["telemetry"]): r for r in results}
+    for name in agents:
+        off, on = by_mode.get((name, "off")), by_mode.get((name, "on"))
+        if off and on and off["median_s"] and on["median_s"]:
+            print(
+                f"Telemetry overhead {name}: p50 {(on['median_s'] / off['median_s'] - 1) * 100:+.1f}%, "
+                f"p99 {(on['p99_s'] / off['p99_s'] - 1) * 100:+.1f}%"
+            )
+    if server is not None:
+        stats = server.stats.snapshot()
+        print(f"Ingest server: {stats['spans_accepted']} spans accepted, {stats['spans_rejected']} rejected")
+        server.shutdown()
+
+    path = write_results("loadgen", results, args.output, params=vars(args))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 """Shared utilities."""
 from shared.logger import logger
-from shared.telemetry import setup_telemetry
 
-__all__ = ["logger", "setup_telemetry"]
+__all__ = ["logger"]
@@ -0,0 +1,225 @@
+"""Checkpointed batch evaluation runner over query datasets.
+
+Reads a JSONL or CSV dataset (``query`` plus optional ``id`` and ``agent`` columns), fans the rows
+out across agents with bounded parallelism and writes one row per (dataset row, agent) to a
+Parquet file with the response, latency and token usage.
+
+Completed rows are appended to ``<output>.checkpoint.jsonl`` as they finish, so a crashed or
+interrupted run resumes where it stopped when started again with the same arguments; rows that
+failed are retried and unreadable checkpoint lines are skipped (their rows run again). Every
+LangGraph run is tagged with the batch id through the ``session.id`` trace metadata.
+
+Usage:
+    python -m shared.batch dataset.jsonl --agents calculator,weather --concurrency 8 --output results.parquet
+    python -m shared.batch dataset.csv --output results.parquet   # per-row ``agent`` column
+"""
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from shared import logger
+from shared.registry import AGENTS, make_runner
+
+COLUMNS = [
+    "batch_id",
+    "row_id",
+    "agent",
+    "query",
+    "response",
+    "error",
+    "latency_ms",
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "started_at",
+]
+
+
+def read_dataset(path: str) -> list[dict]:
+    """Load dataset rows; ``id`` defaults to the row number."""
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    for i, row in enumerate(rows):
+        row.setdefault("id", str(i))
+        row["id"] = str(row["id"])
+    return rows
+
+
+def load_checkpoint(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    done = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                done.append(json.loads(line))
+            except ValueError:
+                # A crash can leave a truncated line; that row simply runs again, later rows still count
+                logger.warning("Ignoring unreadable line %d of %s", number, path)
+    return done
+
+
+def _tokens(usage: dict) -> dict:
+    """Normalize LangChain (input/output) and CrewAI (prompt/completion) usage keys."""
+    return {
+        "input_tokens": usage.get("input_tokens", usage.get("prompt_tokens")),
+        "output_tokens": usage.get("output_tokens", usage.get("completion_tokens")),
+        "total_tokens": usage.get("total_tokens"),
+    }
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Writing results requires pyarrow: pip install -e '.[analysis]'") from None
+    return pa, pq
+
+
+def write_parquet(rows: list[dict], path: str) -> None:
+    pa, pq = _import_pyarrow()
+
+    schema = pa.schema(
+        [
+            ("batch_id", pa.string()),
+            ("row_id", pa.string()),
+            ("agent", pa.string()),
+            ("query", pa.string()),
+            ("response", pa.string()),
+            ("error", pa.string()),
+            ("latency_ms", pa.float64()),
+            ("input_tokens", pa.int64()),
+            ("output_tokens", pa.int64()),
+            ("total_tokens", pa.int64()),
+            ("started_at", pa.string()),
+        ]
+    )
+    table = pa.Table.from_pylist([{column: row.get(column) for column in COLUMNS} for row in rows], schema=schema)
+    pq.write_table(table, path, compression="zstd")
+
+
+class BatchRunner:
+    def __init__(self, batch_id: str, checkpoint_path: str, concurrency: int = 4):
+        self.batch_id = batch_id
+        self.concurrency = concurrency
+        self.runners = {}
+        self._runner_lock = threading.Lock()
+        self._checkpoint = open(checkpoint_path, "a")
+        self._checkpoint_lock = threading.Lock()
+        self.completed = 0
+
+    def _runner(self, agent: str):
+        # Built once per agent and reused for every row
+        with self._runner_lock:
+            if agent not in self.runners:
+                self.runners[agent] = make_runner(agent)
+            return self.runners[agent]
+
+    def _run_one(self, row: dict, agent: str) -> dict:
+        started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        result = {"batch_id": self.batch_id, "row_id": row["id"], "agent": agent, "query": row["query"]}
+        try:
+            # Rows share the batch's session.id but never each other's conversation state
+            thread_id = f"{self.batch_id}/{row['id']}/{agent}"
+            output = self._runner(agent)(row["query"], session_id=self.batch_id, thread_id=thread_id)
+            result.update(response=output.response, error=None, **_tokens(output.usage))
+        except Exception as e:
+            logger.error("Row %s (%s) failed: %s: %s", row["id"], agent, type(e).__name__, e)
+            result.update(response=None, error=f"{type(e).__name__}: {e}")
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["started_at"] = started_at
+        with self._checkpoint_lock:
+            self._checkpoint.write(json.dumps(result) + "\n")
+            self._checkpoint.flush()
+            os.fsync(self._checkpoint.fileno())
+            self.completed += 1
+            if self.completed % 100 == 0:
+                logger.info("Progress: %d rows completed", self.completed)
+        return result
+
+    def run(self, work: list[tuple[dict, str]]) -> list[dict]:
+        """Run (row, agent) pairs with at most ``concurrency`` in flight; returns completed results."""
+        results = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = set()
+            for row, agent in work:
+                if len(pending) >= self.concurrency * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results += [future.result() for future in done]
+                pending.add(executor.submit(self._run_one, row, agent))
+            results += [future.result() for future in wait(pending).done]
+        self._checkpoint.close()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a query dataset through agents with checkpointing")
+    parser.add_argument("dataset", help="JSONL or CSV file with a 'query' column (optional 'id' and 'agent')")
+    parser.add_argument(
+        "--agents",
+        help=f"Comma-separated agents to run every row against ({', '.join(AGENTS)}); "
+        "default: each row's 'agent' column",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Rows processed in parallel (default: 4)")
+    parser.add_argument("--output", default="batch_results.parquet", help="Parquet output file")
+    parser.add_argument("--batch-id", help="Batch id used as trace session.id (default: resumed or generated)")
+    parser.add_argument("--limit", type=int, help="Only run the first N dataset rows")
+    args = parser.parse_args()
+    # Fail before running the batch, not after it when the results are written
+    _import_pyarrow()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    checkpoint_path = f"{args.output}.checkpoint.jsonl"
+    completed = load_checkpoint(checkpoint_path)
+    batch_id = args.batch_id or (completed[0]["batch_id"] if completed else None)
+    batch_id = batch_id or f"batch-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+    # Rows that failed are run again; the latest attempt is the one written
+    done_keys = {(row["row_id"], row["agent"]) for row in completed if not row.get("error")}
+
+    rows = read_dataset(args.dataset)[: args.limit]
+    agents = [a.strip() for a in args.agents.split(",")] if args.agents else None
+    work = []
+    for row in rows:
+        for agent in agents or [row.get("agent")]:
+            if agent not in AGENTS:
+                parser.error(f"Row {row['id']}: unknown agent {agent!r}")
+            if (row["id"], agent) not in done_keys:
+                work.append((row, agent))
+
+    logger.info("Batch %s: %d to run, %d already completed", batch_id, len(work), len(done_keys))
+    start = time.perf_counter()
+    results = BatchRunner(batch_id, checkpoint_path, args.concurrency).run(work)
+    elapsed = time.perf_counter() - start
+
+    # Keep the latest attempt per (row, agent)
+    final = {(row["row_id"], row["agent"]): row for row in load_checkpoint(checkpoint_path)}
+    write_parquet(list(final.values()), args.output)
+    errors = sum(1 for r in results if r["error"])
+    logger.info(
+        "Batch %s: ran %d rows in %.1fs (%.2f rows/s, %d errors); results in %s",
+        batch_id,
+        len(results),
+        elapsed,
+        len(results) / elapsed if elapsed else 0,
+        errors,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
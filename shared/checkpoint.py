@@ -0,0 +1,375 @@
+"""File-backed LangGraph checkpointer for resuming multi-turn sessions.
+
+Opt-in via environment variables:
+
+    AGENT_CHECKPOINT_PATH=.cache/checkpoints.sqlite   # enables checkpointing
+    AGENT_CHECKPOINT_KEEP=10                           # checkpoints kept per session
+
+Each checkpoint is stored whole (channel values included), so resuming a session is one indexed
+read of the latest row, and the latest checkpoint of recently used sessions is also served from
+memory. Writes are buffered and committed in batches by a background flusher (and on exit), and
+old checkpoints are compacted away periodically so storage per session stays bounded. Graphs that
+use ``DeltaChannel`` need their ancestor chain and should not use this saver.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from shared import logger
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpoint saver with write batching, an in-memory latest cache and per-thread compaction."""
+
+    def __init__(
+        self,
+        path: str,
+        keep_last: int = 10,
+        flush_interval_s: float = 0.5,
+        flush_batch: int = 64,
+        compact_every: int = 20,
+        cache_threads: int = 1024,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.keep_last = keep_last
+        self.flush_batch = flush_batch
+        self.compact_every = compact_every
+        self.cache_threads = cache_threads
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+            "parent_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL, "
+            "metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS writes ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+            "task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, "
+            "type TEXT NOT NULL, value BLOB NOT NULL, task_path TEXT NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)) WITHOUT ROWID"
+        )
+        # Guards the buffers and the cache; _db_lock serializes flushes and reads of the file
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending_checkpoints = []
+        self._pending_writes = []
+        self._dirty_threads = set()
+        self._flushes = 0
+        # (thread_id, checkpoint_ns) -> [checkpoint row, {(task_id, idx): write row}], most recent last
+        self._latest = OrderedDict()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, args=(flush_interval_s,), name="checkpoint-flusher", daemon=True
+        )
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # -- writes ---------------------------------------------------------------------------------
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        row = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),
+            *self.serde.dumps_typed(checkpoint),
+            *self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+        )
+        with self._lock:
+            self._pending_checkpoints.append(row)
+            self._dirty_threads.add(thread_id)
+            self._cache((thread_id, checkpoint_ns), [row, {}])
+            full = len(self._pending_checkpoints) + len(self._pending_writes) >= self.flush_batch
+        if full:
+            self.flush()
+        return {
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        # Special channels (errors, interrupts) overwrite; regular writes are only recorded once
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        with self._lock:
+            self._pending_writes.append((replace, rows))
+            cached = self._latest.get((thread_id, checkpoint_ns))
+            if cached is not None and cached[0][2] == checkpoint_id:
+                for row in rows:
+                    if replace or (row[3], row[4]) not in cached[1]:
+                        cached[1][(row[3], row[4])] = row
+            full = len(self._pending_checkpoints) + len(self._pending_writes) >= self.flush_batch
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit buffered checkpoints and writes in one transaction."""
+        with self._db_lock:
+            with self._lock:
+                checkpoints, self._pending_checkpoints = self._pending_checkpoints, []
+                writes, self._pending_writes = self._pending_writes, []
+                if not checkpoints and not writes:
+                    return
+                compact = self._dirty_threads if (self._flushes + 1) % self.compact_every == 0 else set()
+                if compact:
+                    self._dirty_threads = set()
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", checkpoints
+                )
+                for replace, rows in writes:
+                    verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+                    self._conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                for thread_id in compact:
+                    self._compact(thread_id)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # Put the rows back ahead of anything buffered since, so the next flush retries them
+                with self._lock:
+                    self._pending_checkpoints[:0] = checkpoints
+                    self._pending_writes[:0] = writes
+                    self._dirty_threads |= compact
+                raise
+            self._flushes += 1
+
+    def _flush_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                # The rows stay buffered; keep the flusher alive so they are retried
+                logger.exception("Checkpoint flush to %s failed", self.path)
+
+    def _compact(self, thread_id: str) -> None:
+        """Keep the last ``keep_last`` top-level checkpoints of a thread, plus subgraph checkpoints
+        (e.g. the calculator's inner agent) that are newer than the oldest one kept."""
+        row = self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, self.keep_last - 1),
+        ).fetchone()
+        if row is None:
+            return
+        # Checkpoint ids are time-ordered (uuid6), so they compare across namespaces
+        self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < ?", (thread_id, row[0]))
+        self._conn.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_id < ?", (thread_id, row[0]))
+
+    # -- reads ----------------------------------------------------------------------------------
+
+    def _tuple(self, row, writes) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, blob, metadata_type, metadata = row
+        ordered = sorted(writes, key=lambda w: writes_sort_key(w[8], w[3], w[4]))
+        return CheckpointTuple(
+            config={
+                "configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
+            },
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            pending_writes=[(w[3], w[5], self.serde.loads_typed((w[6], w[7]))) for w in ordered],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+        )
+
+    def _select(self, where: str, params: tuple, limit: int | None = None) -> list:
+        query = f"SELECT * FROM checkpoints WHERE {where} ORDER BY checkpoint_id DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self._conn.execute(query, params).fetchall()
+
+    def _writes(self, row) -> list:
+        return self._conn.execute(
+            "SELECT * FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", row[:3]
+        ).fetchall()
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        key = (thread_id, checkpoint_ns)
+        with self._lock:
+            cached = self._latest.get(key)
+            if cached is not None and checkpoint_id in (None, cached[0][2]):
+                self._latest.move_to_end(key)
+                row, writes = cached[0], list(cached[1].values())
+                return self._tuple(row, writes)
+
+        self.flush()
+        with self._db_lock:
+            if checkpoint_id:
+                rows = self._select("thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", (*key, checkpoint_id))
+            else:
+                rows = self._select("thread_id = ? AND checkpoint_ns = ?", key, limit=1)
+            if not rows:
+                return None
+            writes = self._writes(rows[0])
+        if checkpoint_id is None:
+            with self._lock:
+                # A put() may have cached a newer checkpoint while the file was read
+                if key not in self._latest:
+                    self._cache(key, [rows[0], {(w[3], w[4]): w for w in writes}])
+        return self._tuple(rows[0], writes)
+
+    def _cache(self, key: tuple, entry: list) -> None:
+        """Make ``entry`` the latest checkpoint of ``key``, evicting the least recently used threads.
+
+        Callers hold ``_lock``.
+        """
+        self._latest[key] = entry
+        self._latest.move_to_end(key)
+        while len(self._latest) > self.cache_threads:
+            self._latest.popitem(last=False)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        self.flush()
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        with self._db_lock:
+            # Metadata filters are applied after decoding, so the SQL limit only applies without them
+            rows = self._select(" AND ".join(clauses) or "1", tuple(params), None if filter else limit)
+            results = [(row, self._writes(row)) for row in rows]
+        for row, writes in results:
+            checkpoint_tuple = self._tuple(row, writes)
+            if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield checkpoint_tuple
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.flush()
+        with self._lock:
+            for key in [key for key in self._latest if key[0] == thread_id]:
+                del self._latest[key]
+        with self._db_lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    # The async API shares the sync implementation: reads are mostly served from memory and
+    # writes only append to the in-memory buffers
+
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for checkpoint_tuple in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def compact(self) -> None:
+        """Flush and compact every thread now (normally done every ``compact_every`` flushes)."""
+        self.flush()
+        with self._db_lock:
+            threads = [row[0] for row in self._conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+            self._conn.execute("BEGIN")
+            for thread_id in threads:
+                self._compact(thread_id)
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+
+    def stats(self) -> dict:
+        self.flush()
+        with self._db_lock:
+            checkpoints, threads = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT thread_id) FROM checkpoints"
+            ).fetchone()
+            writes = self._conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+        return {"threads": threads, "checkpoints": checkpoints, "writes": writes, "flushes": self._flushes}
+
+
+def get_checkpointer() -> SQLiteCheckpointSaver | None:
+    """Return the process-wide checkpointer if ``AGENT_CHECKPOINT_PATH`` is set, else None.
+
+    Pass the result as ``checkpointer=`` when compiling a graph; None keeps runs stateless.
+    """
+    global _checkpointer
+    path = os.getenv("AGENT_CHECKPOINT_PATH")
+    if not path:
+        return None
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = SQLiteCheckpointSaver(path, keep_last=int(os.getenv("AGENT_CHECKPOINT_KEEP", "10")))
+    return _checkpointer
+
+
+def session_config(session_id: str | None = None, thread_id: str | None = None) -> dict:
+    """Run config for a session: the session id is the trace ``session.id`` and, unless ``thread_id``
+    is given, also the checkpoint thread that is resumed.
+
+    Without either a fresh thread is used, so the run starts from an empty conversation.
+    """
+    return {
+        "configurable": {"thread_id": thread_id or session_id or uuid.uuid4().hex},
+        "metadata": {"session.id": session_id} if session_id else {},
+    }
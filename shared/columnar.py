@@ -0,0 +1,362 @@
+"""Convert OTLP trace captures (``.bin``) into a partitioned Parquet dataset for local analysis.
+
+Each span becomes one row. Span fields get fixed columns (ids as hex, ``start_time``/``end_time``,
+``duration_ms``, status); the attributes used by this repo's agents get typed columns named after
+the attribute (``db.operation``, ``retrieval.*``, ``gen_ai.*``, ``tool.name``, plus the span's
+``input``/``output``); every other attribute is kept in the ``attributes`` map as a string. The
+dataset is Hive-partitioned by ``service_name`` and ``date``, so queries scan only the partitions
+and columns they need instead of parsing every capture.
+
+Files are converted in batches on a process pool; each batch is written as one Parquet file per
+partition. Converted captures are recorded by path in ``<output>/_manifest.jsonl`` (captures are
+write-once), so a rerun over the same directories only converts new captures. Parquet files of a
+batch that was started but never recorded as finished (an interrupted run) are deleted on the next
+run, so no span is counted twice; an unreadable manifest line only loses its own batch.
+
+Usage:
+    python -m shared.columnar agents-langgraph/*/otlp_trace agents-crewai/*/otlp_trace --output traces_parquet
+    python -m shared.columnar /var/spool/otlp_trace --output traces_parquet --processes 8
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.proto.trace.v1.trace_pb2 import Span, Status
+
+from shared import logger
+from shared.otel import parse_trace
+from shared.validation import OPERATION_KEYS, PROVIDER_KEYS, TOOL_INPUT_KEYS, TOOL_NAME_KEYS, TOOL_OUTPUT_KEYS
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    raise ImportError("shared.columnar requires pyarrow: pip install -e '.[analysis]'") from None
+
+MANIFEST = "_manifest.jsonl"
+_PART_NAME = re.compile(r"part-([0-9a-f]{32})-\d+\.parquet")
+
+# Typed column -> (Arrow type, attribute keys that fill it, first match wins). The keys are the ones
+# span validation accepts, so traceloop spans (``traceloop.span.kind``/``traceloop.entity.*``) fill them too.
+ATTRIBUTE_COLUMNS = {
+    "db.operation": (pa.string(), ("db.operation",)),
+    "db.system": (pa.string(), ("db.system",)),
+    "retrieval.document_type": (pa.string(), ("retrieval.document_type",)),
+    "retrieval.query_type": (pa.string(), ("retrieval.query_type",)),
+    "retrieval.num_results": (pa.int64(), ("retrieval.num_results",)),
+    "retrieval.context.num_passages": (pa.int64(), ("retrieval.context.num_passages",)),
+    "retrieval.context.tokens": (pa.int64(), ("retrieval.context.tokens",)),
+    "retrieval.context.num_dropped": (pa.int64(), ("retrieval.context.num_dropped",)),
+    "retrieval.context.num_trimmed": (pa.int64(), ("retrieval.context.num_trimmed",)),
+    "gen_ai.operation.name": (pa.string(), OPERATION_KEYS + ("llm.request.type",)),
+    "gen_ai.provider.name": (pa.string(), PROVIDER_KEYS),
+    "gen_ai.request.model": (pa.string(), ("gen_ai.request.model",)),
+    "gen_ai.response.model": (pa.string(), ("gen_ai.response.model",)),
+    "gen_ai.request.temperature": (pa.float64(), ("gen_ai.request.temperature",)),
+    "gen_ai.usage.input_tokens": (pa.int64(), ("gen_ai.usage.input_tokens", "gen_ai.usage.prompt_tokens")),
+    "gen_ai.usage.output_tokens": (pa.int64(), ("gen_ai.usage.output_tokens", "gen_ai.usage.completion_tokens")),
+    "gen_ai.usage.cache_read_input_tokens": (pa.int64(), ("gen_ai.usage.cache_read_input_tokens",)),
+    "gen_ai.usage.reasoning_tokens": (pa.int64(), ("gen_ai.usage.reasoning_tokens",)),
+    "gen_ai.cache.hit": (pa.bool_(), ("gen_ai.cache.hit",)),
+    "tool.name": (pa.string(), TOOL_NAME_KEYS),
+    "input": (pa.string(), TOOL_INPUT_KEYS),
+    "output": (pa.string(), TOOL_OUTPUT_KEYS),
+}
+# Flattened traceloop messages (``gen_ai.prompt.0.content``), collected into ``input``/``output``
+# as a JSON message list when no key above fills them
+_FLAT_MESSAGE = re.compile(r"gen_ai\.(prompt|completion)\.(\d+)\.(role|content)")
+_FLAT_COLUMNS = {"prompt": "input", "completion": "output"}
+
+SCHEMA = pa.schema(
+    [
+        ("trace_id", pa.string()),
+        ("span_id", pa.string()),
+        ("parent_span_id", pa.string()),
+        ("name", pa.string()),
+        ("kind", pa.string()),
+        ("scope_name", pa.string()),
+        ("start_time", pa.timestamp("ns", tz="UTC")),
+        ("end_time", pa.timestamp("ns", tz="UTC")),
+        ("duration_ms", pa.float64()),
+        ("status_code", pa.string()),
+        ("status_message", pa.string()),
+        *((column, arrow_type) for column, (arrow_type, _) in ATTRIBUTE_COLUMNS.items()),
+        ("attributes", pa.map_(pa.string(), pa.string())),
+        ("source_file", pa.string()),
+        ("service_name", pa.string()),
+        ("date", pa.date32()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([SCHEMA.field("service_name"), SCHEMA.field("date")]), flavor="hive")
+
+# Attribute key -> (typed column, Arrow type, rank among the keys that fill that column)
+_KEY_COLUMNS = {
+    key: (column, arrow_type, rank)
+    for column, (arrow_type, keys) in ATTRIBUTE_COLUMNS.items()
+    for rank, key in enumerate(keys)
+}
+_SPAN_KINDS = {value: name.removeprefix("SPAN_KIND_") for name, value in Span.SpanKind.items()}
+_STATUS_CODES = {value: name.removeprefix("STATUS_CODE_") for name, value in Status.StatusCode.items()}
+
+
+def _to_string(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+_COERCE = {
+    pa.string(): _to_string,
+    pa.int64(): lambda v: int(v) if not isinstance(v, float) or v.is_integer() else None,
+    pa.float64(): float,
+    pa.bool_(): lambda v: v if isinstance(v, bool) else None,
+}
+
+
+def _value(any_value):
+    kind = any_value.WhichOneof("value")
+    if kind in ("array_value", "kvlist_value"):
+        return MessageToDict(getattr(any_value, kind))
+    if kind == "bytes_value":
+        return any_value.bytes_value.hex()
+    return getattr(any_value, kind) if kind else None
+
+
+def _append_span(columns: dict, span, service_name: str, scope_name: str, source_file: str) -> None:
+    columns["trace_id"].append(span.trace_id.hex())
+    columns["span_id"].append(span.span_id.hex())
+    columns["parent_span_id"].append(span.parent_span_id.hex() or None)
+    columns["name"].append(span.name)
+    columns["kind"].append(_SPAN_KINDS.get(span.kind))
+    columns["scope_name"].append(scope_name or None)
+    columns["start_time"].append(span.start_time_unix_nano)
+    columns["end_time"].append(span.end_time_unix_nano)
+    columns["duration_ms"].append((span.end_time_unix_nano - span.start_time_unix_nano) / 1e6)
+    columns["status_code"].append(_STATUS_CODES.get(span.status.code))
+    columns["status_message"].append(span.status.message or None)
+    columns["source_file"].append(source_file)
+    columns["service_name"].append(service_name)
+
+    # One pass over the attributes; when several keys fill a column the lowest rank wins
+    typed, rest = {}, []
+    traceloop_kind, flat = None, {"input": {}, "output": {}}
+    for attribute in span.attributes:
+        value = _value(attribute.value)
+        if value is None:
+            continue
+        if attribute.key == "traceloop.span.kind":
+            traceloop_kind = value
+        elif m := _FLAT_MESSAGE.fullmatch(attribute.key):
+            flat[_FLAT_COLUMNS[m[1]]].setdefault(int(m[2]), {})[m[3]] = value
+        target = _KEY_COLUMNS.get(attribute.key)
+        if target is not None:
+            column, arrow_type, rank = target
+            try:
+                coerced = _COERCE[arrow_type](value)
+            except (TypeError, ValueError):
+                coerced = None
+            if coerced is not None and (column not in typed or rank < typed[column][0]):
+                if column in typed:
+                    rest.append(typed[column][1])
+                typed[column] = (rank, (attribute.key, _to_string(value)), coerced)
+                continue
+        # Untyped, or of an unexpected type: kept as a string in the attributes map
+        rest.append((attribute.key, _to_string(value)))
+    # traceloop.entity.name names workflows and tasks too; only a tool span's entity is its tool
+    if "tool.name" in typed and typed["tool.name"][1][0] == "traceloop.entity.name" and traceloop_kind != "tool":
+        rest.append(typed.pop("tool.name")[1])
+    for column, messages in flat.items():
+        if messages and column not in typed:
+            typed[column] = (None, None, json.dumps([messages[i] for i in sorted(messages)]))
+    for column in ATTRIBUTE_COLUMNS:
+        columns[column].append(typed[column][2] if column in typed else None)
+    columns["attributes"].append(rest)
+
+
+def _convert_batch(paths: list[str], output: str, batch_id: str) -> tuple[list[dict], list[str]]:
+    """Convert one batch of captures (in a worker process); return manifest entries and written files."""
+    columns = {name: [] for name in SCHEMA.names if name != "date"}
+    entries = []
+    for path in paths:
+        entry = {"path": path, "spans": 0}
+        try:
+            with open(path, "rb") as f:
+                request = parse_trace(f.read())
+        except Exception as e:
+            # Recorded anyway, so a corrupt capture is reported once instead of on every run
+            entry["error"] = f"{type(e).__name__}: {e}"
+            entries.append(entry)
+            continue
+        for resource_spans in request.resource_spans:
+            service_name = next(
+                (a.value.string_value for a in resource_spans.resource.attributes if a.key == "service.name"),
+                "unknown",
+            )
+            for scope_spans in resource_spans.scope_spans:
+                for span in scope_spans.spans:
+                    _append_span(columns, span, service_name, scope_spans.scope.name, path)
+                    entry["spans"] += 1
+        entries.append(entry)
+
+    written = []
+    if columns["span_id"]:
+        table = pa.Table.from_pydict(columns, schema=SCHEMA.remove(SCHEMA.get_field_index("date")))
+        table = table.append_column(SCHEMA.field("date"), table["start_time"].cast(pa.date32()))
+        ds.write_dataset(
+            table,
+            output,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{batch_id}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+            file_visitor=lambda written_file: written.append(os.path.relpath(written_file.path, output)),
+        )
+    return entries, written
+
+
+def load_manifest(output: str) -> tuple[set[str], set[str], set[str]]:
+    """Captures already converted, the Parquet files that hold them and batches that never finished."""
+    converted, parts, started, finished = set(), set(), set(), set()
+    path = os.path.join(output, MANIFEST)
+    if not os.path.exists(path):
+        return converted, parts, set()
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a truncated line; only that batch is lost (and converted again)
+                logger.warning("Ignoring unreadable line %d of %s", number, path)
+                continue
+            if "started" in record:
+                started.add(record["started"])
+                continue
+            finished.add(record.get("batch"))
+            converted.update(entry["path"] for entry in record["files"])
+            parts.update(record["parts"])
+    return converted, parts, started - finished
+
+
+def remove_orphans(output: str, parts: set[str], unfinished: set[str], before: float) -> int:
+    """Delete Parquet files of batches that were started but never recorded as finished.
+
+    Only files named by this writer (``part-<batch id>-<n>.parquet``) for such a batch and last
+    written before ``before`` (the start of this run) are removed; anything else is left alone.
+    """
+    removed = 0
+    for path in glob.glob(os.path.join(output, "**", "part-*.parquet"), recursive=True):
+        match = _PART_NAME.fullmatch(os.path.basename(path))
+        if (
+            match
+            and match.group(1) in unfinished
+            and os.path.relpath(path, output) not in parts
+            and os.path.getmtime(path) < before
+        ):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def _open_manifest(path: str):
+    manifest = open(path, "a+")
+    # After a torn write the next record must start on its own line, not extend the broken one
+    if manifest.tell():
+        manifest.seek(manifest.tell() - 1)
+        if manifest.read(1) != "\n":
+            manifest.write("\n")
+    return manifest
+
+
+def find_captures(inputs: list[str]) -> list[str]:
+    """Capture files under the given files/directories, as absolute paths, sorted by name."""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            found.update(glob.glob(os.path.join(item, "**", "*.bin"), recursive=True))
+        else:
+            found.update(glob.glob(item))
+    return sorted(os.path.abspath(path) for path in found)
+
+
+def convert(inputs: list[str], output: str, processes: int | None = None, files_per_part: int = 500) -> dict:
+    """Convert captures under ``inputs`` that are not in ``output``'s manifest yet."""
+    os.makedirs(output, exist_ok=True)
+    converted, parts, unfinished = load_manifest(output)
+    orphans = remove_orphans(output, parts, unfinished, time.time())
+    if orphans:
+        logger.info("Removed %d Parquet files of an interrupted conversion", orphans)
+
+    pending = [path for path in find_captures(inputs) if path not in converted]
+    stats = {"files": 0, "spans": 0, "errors": 0, "skipped": len(converted), "parts": 0}
+    if not pending:
+        return stats
+    processes = processes or os.cpu_count() or 1
+    # Large batches keep Parquet files big, small enough ones keep every process busy
+    size = max(1, min(files_per_part, -(-len(pending) // processes)))
+    batches = [pending[i : i + size] for i in range(0, len(pending), size)]
+
+    batch_ids = [uuid.uuid4().hex for _ in batches]
+    manifest = _open_manifest(os.path.join(output, MANIFEST))
+    with ProcessPoolExecutor(max_workers=min(processes, len(batches))) as pool, manifest:
+        # Batches are announced before any of their files exist, so an interrupted one can be cleaned up
+        manifest.writelines(json.dumps({"started": batch_id}) + "\n" for batch_id in batch_ids)
+        manifest.flush()
+        futures = {
+            pool.submit(_convert_batch, batch, output, batch_id): batch_id
+            for batch, batch_id in zip(batches, batch_ids)
+        }
+        for future in as_completed(futures):
+            entries, written = future.result()
+            record = {
+                "batch": futures[future],
+                "converted_at": datetime.now(timezone.utc).isoformat(),
+                "parts": written,
+                "files": entries,
+            }
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            for entry in entries:
+                if "error" in entry:
+                    logger.warning("Skipped %s: %s", entry["path"], entry["error"])
+            stats["files"] += len(entries)
+            stats["spans"] += sum(entry["spans"] for entry in entries)
+            stats["errors"] += sum("error" in entry for entry in entries)
+            stats["parts"] += len(written)
+    return stats
+
+
+def dataset(output: str) -> ds.Dataset:
+    """Open a converted directory as a ``pyarrow.dataset.Dataset`` for filtered, column-pruned scans."""
+    return ds.dataset(output, format="parquet", schema=SCHEMA, partitioning=PARTITIONING)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert OTLP trace captures into a partitioned Parquet dataset")
+    parser.add_argument("inputs", nargs="+", help="Capture files or directories (searched recursively for *.bin)")
+    parser.add_argument("--output", required=True, help="Dataset directory; reruns append only new captures")
+    parser.add_argument("--processes", type=int, help="Conversion processes (default: CPU count)")
+    parser.add_argument("--files-per-part", type=int, default=500, help="Captures per Parquet file (default: 500)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = convert(args.inputs, args.output, args.processes, args.files_per_part)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Converted %d captures (%d spans, %d unreadable) into %d Parquet files in %.2fs; %d already converted",
+        stats["files"],
+        stats["spans"],
+        stats["errors"],
+        stats["parts"],
+        elapsed,
+        stats["skipped"],
+    )
+
+
+if __name__ == "__main__":
+    main()
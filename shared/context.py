@@ -0,0 +1,142 @@
+"""Token-budgeted assembly of retrieved passages into tool context.
+
+Retrieved hits are ordered by score, near-duplicates are removed with MinHash signatures over word
+shingles, and the remaining passages are packed into a token budget, trimming the last one that
+fits at a sentence boundary. What was dropped or trimmed, and why, is reported so it can be
+recorded on the retriever span.
+
+Configured with ``RETRIEVAL_CONTEXT_MAX_TOKENS`` (default 1000) and ``RETRIEVAL_DEDUPE_THRESHOLD``
+(estimated Jaccard similarity above which a passage counts as a duplicate, default 0.8).
+"""
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class Passage:
+    id: str
+    content: str
+    score: float = 0.0
+    title: str = ""
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class AssembledContext:
+    passages: list[Passage]
+    # {"id": ..., "reason": "duplicate" | "budget", "duplicate_of": ...}
+    dropped: list[dict] = field(default_factory=list)
+    trimmed: list[str] = field(default_factory=list)
+    tokens: int = 0
+
+    def record_on_span(self, span) -> None:
+        span.set_attribute("retrieval.context.num_passages", len(self.passages))
+        span.set_attribute("retrieval.context.tokens", self.tokens)
+        span.set_attribute("retrieval.context.num_dropped", len(self.dropped))
+        span.set_attribute("retrieval.context.num_trimmed", len(self.trimmed))
+        if self.dropped:
+            span.set_attribute("retrieval.context.dropped", json.dumps(self.dropped))
+        if self.trimmed:
+            span.set_attribute("retrieval.context.trimmed", json.dumps(self.trimmed))
+
+
+class ContextAssembler:
+    def __init__(
+        self,
+        max_tokens: int = 1000,
+        dedupe_threshold: float = 0.8,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        min_trimmed_tokens: int = 32,
+        token_counter=estimate_tokens,
+    ):
+        self.max_tokens = max_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.shingle_size = shingle_size
+        self.min_trimmed_tokens = min_trimmed_tokens
+        self.token_counter = token_counter
+        rng = np.random.default_rng(0)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+
+    @classmethod
+    def from_env(cls) -> "ContextAssembler":
+        return cls(
+            max_tokens=int(os.getenv("RETRIEVAL_CONTEXT_MAX_TOKENS", "1000")),
+            dedupe_threshold=float(os.getenv("RETRIEVAL_DEDUPE_THRESHOLD", "0.8")),
+        )
+
+    def signature(self, text: str) -> np.ndarray | None:
+        words = re.findall(r"\w+", text.lower())
+        if not words:
+            return None
+        k = min(self.shingle_size, len(words))
+        shingles = {zlib.crc32(" ".join(words[i : i + k]).encode()) for i in range(len(words) - k + 1)}
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # Universal hashing (a * x + b) mod p as the permutations; uint64 overflow is harmless here
+        with np.errstate(over="ignore"):
+            return ((np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+    def _trim(self, text: str, budget: int) -> str | None:
+        kept = []
+        for sentence in _SENTENCE_END.split(text):
+            if self.token_counter(" ".join(kept + [sentence])) > budget:
+                break
+            kept.append(sentence)
+        return " ".join(kept) if kept else None
+
+    def assemble(self, passages: list[Passage], max_tokens: int | None = None) -> AssembledContext:
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        result = AssembledContext(passages=[])
+        signatures = []
+        for passage in sorted(passages, key=lambda p: p.score, reverse=True):
+            signature = self.signature(passage.content)
+            duplicate_of = None
+            if signature is not None:
+                for kept_id, kept_signature in signatures:
+                    if np.mean(signature == kept_signature) >= self.dedupe_threshold:
+                        duplicate_of = kept_id
+                        break
+            if duplicate_of is not None:
+                result.dropped.append({"id": passage.id, "reason": "duplicate", "duplicate_of": duplicate_of})
+                continue
+
+            remaining = budget - result.tokens - self.token_counter(passage.title)
+            tokens = self.token_counter(passage.content)
+            if tokens > remaining:
+                trimmed = self._trim(passage.content, remaining) if remaining >= self.min_trimmed_tokens else None
+                if trimmed is None:
+                    result.dropped.append({"id": passage.id, "reason": "budget"})
+                    continue
+                passage = Passage(passage.id, trimmed, passage.score, passage.title, passage.metadata)
+                result.trimmed.append(passage.id)
+                tokens = self.token_counter(trimmed)
+            if signature is not None:
+                signatures.append((passage.id, signature))
+            result.passages.append(passage)
+            result.tokens += tokens + self.token_counter(passage.title)
+        return result
+
+
+_assembler: ContextAssembler | None = None
+
+
+def get_context_assembler() -> ContextAssembler:
+    """Process-wide assembler configured from the environment."""
+    global _assembler
+    if _assembler is None:
+        _assembler = ContextAssembler.from_env()
+    return _assembler
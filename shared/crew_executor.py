@@ -0,0 +1,185 @@
+"""Process-pool executor for CrewAI crews with warm, reusable crew templates.
+
+CrewAI's orchestration (prompt assembly, ReAct parsing, event bus) is pure Python and holds the GIL,
+so kickoffs on threads don't scale past one core. ``CrewExecutor`` runs them in a pool of worker
+processes instead. Each worker imports the crews and builds one template per crew at startup (agents,
+tasks and LLM client, with ``{query}``/``{topic}`` placeholders); a query is then a
+``crew.kickoff(inputs=...)`` on that template, without rebuilding ``Agent``/``Task``/``Crew``/``LLM``.
+A worker runs one kickoff at a time, so templates are never shared between concurrent runs.
+
+Workers are started with ``spawn`` and write their (crew verbose) output to stderr. Under
+``opentelemetry-instrument`` they inherit its environment and instrument themselves; their spans
+are flushed when the pool shuts down.
+
+Usage:
+    python -m shared.crew_executor --agent research --processes 4 < queries.txt > results.jsonl
+    python -m shared.crew_executor --agent content "Vector databases" "Observability for LLM apps"
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context, util
+from typing import Callable, Iterable
+
+from shared import logger
+from shared.registry import AgentResult, get_spec, load_agent
+
+_templates = {}
+
+
+def _flush_telemetry() -> None:
+    from opentelemetry import trace
+
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "force_flush"):
+        provider.force_flush()
+
+
+def _init_worker(agents: list[str], llm_factory: Callable | None, ready) -> None:
+    # Crew verbose output goes to stderr, so the parent's stdout only carries results
+    os.dup2(2, 1)
+    try:
+        for name in agents:
+            spec = get_spec(name)
+            factory = getattr(load_agent(name), spec.factory)
+            _templates[name] = factory(llm=llm_factory()) if llm_factory else factory()
+    except BaseException:
+        ready.abort()
+        raise
+    # Pool workers exit without running atexit handlers, but multiprocessing finalizers do run
+    util.Finalize(None, _flush_telemetry, exitpriority=10)
+    ready.wait()
+
+
+def _started() -> int:
+    return os.getpid()
+
+
+def _usage(crew) -> dict:
+    return {k: v for k, v in crew.calculate_usage_metrics().model_dump().items() if isinstance(v, int)}
+
+
+def _kickoff(name: str, query: str) -> AgentResult:
+    crew = _templates[name]
+    # LLM token counters accumulate over the template's lifetime; report this run's share
+    before = _usage(crew)
+    output = crew.kickoff(inputs={get_spec(name).crew_input: query})
+    usage = {k: v - before.get(k, 0) for k, v in _usage(crew).items()}
+    return AgentResult(response=str(output), usage=usage)
+
+
+class CrewExecutor:
+    """Dispatches crew kickoffs to warm crew templates in a pool of worker processes."""
+
+    def __init__(self, agents: list[str], processes: int | None = None, llm_factory: Callable | None = None):
+        """``llm_factory`` (picklable, e.g. a module-level class or ``functools.partial``) builds each
+        worker's LLM; by default the crews build their own."""
+        for name in agents:
+            spec = get_spec(name)
+            if spec.framework != "crewai" or spec.crew_input is None:
+                raise ValueError(f"Agent '{name}' is not a templated CrewAI crew")
+        self.agents = list(agents)
+        self.processes = processes or os.cpu_count() or 1
+        context = get_context("spawn")
+        # Every worker waits here after building its templates, so warm() returns once all are ready
+        ready = context.Barrier(self.processes + 1)
+        self._ready = ready
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.agents, llm_factory, ready),
+        )
+        self._warm = False
+
+    def warm(self) -> float:
+        """Start all workers and wait until each has built its crew templates; return the seconds taken."""
+        if self._warm:
+            return 0.0
+        start = time.perf_counter()
+        futures = [self._pool.submit(_started) for _ in range(self.processes)]
+        try:
+            self._ready.wait()
+        except threading.BrokenBarrierError:
+            pass  # A worker failed to build its templates; the error surfaces from the futures
+        for future in futures:
+            future.result()
+        self._warm = True
+        return time.perf_counter() - start
+
+    def submit(self, agent: str, query: str) -> Future:
+        """Schedule one kickoff; the future resolves to an ``AgentResult``."""
+        if agent not in self.agents:
+            raise ValueError(f"Agent '{agent}' was not loaded by this executor")
+        self.warm()
+        return self._pool.submit(_kickoff, agent, query)
+
+    def map(self, agent: str, queries: Iterable[str]) -> list[AgentResult | Exception]:
+        """Run many kickoffs in parallel and return their results in input order.
+
+        A kickoff that raised is returned as its exception, so one failing crew doesn't lose the others.
+        """
+        futures = [self.submit(agent, query) for query in queries]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def shutdown(self) -> None:
+        if not self._warm:
+            # Workers that were never started would otherwise wait at the barrier forever
+            self._ready.abort()
+        self._pool.shutdown()
+
+    def __enter__(self) -> "CrewExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many queries through a CrewAI crew on a process pool")
+    parser.add_argument("--agent", required=True, help="Crew to run: content or research")
+    parser.add_argument("--processes", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("queries", nargs="*", help="Queries (default: one per line from stdin)")
+    args = parser.parse_args()
+
+    queries = args.queries or [line.strip() for line in sys.stdin if line.strip()]
+    # Logs go to stdout; keep the real stdout for results only
+    results_out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    with CrewExecutor([args.agent], processes=args.processes) as executor:
+        logger.info("Warmed %d workers in %.2fs", executor.processes, executor.warm())
+        start = time.perf_counter()
+        results = executor.map(args.agent, queries)
+        elapsed = time.perf_counter() - start
+    errors = 0
+    for query, result in zip(queries, results):
+        record = {"agent": args.agent, "query": query}
+        if isinstance(result, Exception):
+            errors += 1
+            logger.error("Query %r failed: %s: %s", query, type(result).__name__, result)
+            record.update(response=None, usage={}, error=f"{type(result).__name__}: {result}")
+        else:
+            record.update(response=result.response, usage=result.usage, error=None)
+        results_out.write(json.dumps(record) + "\n")
+    results_out.flush()
+    logger.info(
+        "Ran %d kickoffs in %.2fs (%.2f/s, %d errors)",
+        len(queries),
+        elapsed,
+        len(queries) / elapsed if elapsed else 0,
+        errors,
+    )
+
+
+if __name__ == "__main__":
+    main()
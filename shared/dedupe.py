@@ -0,0 +1,221 @@
+"""Persistent record of uploaded spans, to strip re-sent spans out of replayed trace captures.
+
+Every ``(trace_id, span_id)`` the endpoint has acknowledged goes into two stores next to each other:
+
+- a Bloom filter in a memory-mapped file (``<path>.bloom``), about 1.2 bytes per span at a 1% false
+  positive rate, so a lookup for a span that was never sent (the common case) touches no disk index;
+- an SQLite table with the exact keys (``<path>``), consulted only when the filter says "maybe", so
+  false positives never drop a new span.
+
+Resident memory is bounded by the OS page cache for the mapped filter and SQLite's own cache rather
+than by the number of spans; a filter for 500 million spans is a 600 MB file. Hashing and bit tests
+are vectorized per request with numpy.
+"""
+import math
+import mmap
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+
+from shared.validation import _prune_empty, _replace
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer: spreads ids that are not random (tests, sequential generators) over all bits
+    x = (x ^ (x >> np.uint64(30))) * _M1
+    x = (x ^ (x >> np.uint64(27))) * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+def _key_hashes(keys: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    """Two independent 64-bit hashes per 24-byte ``trace_id + span_id`` key."""
+    words = np.frombuffer(b"".join(keys), dtype="<u8").reshape(-1, 3)
+    with np.errstate(over="ignore"):
+        h1 = _mix(words[:, 0] ^ _mix(words[:, 1] ^ _mix(words[:, 2])))
+        h2 = _mix(h1 ^ words[:, 2] ^ np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+    return h1, h2
+
+
+def _span_key(span) -> bytes:
+    # Pad missing/short ids so every key is 24 bytes; such spans are rejected by validation anyway
+    return span.trace_id.rjust(16, b"\0")[:16] + span.span_id.rjust(8, b"\0")[:8]
+
+
+class BloomFilter:
+    """Bloom filter over a memory-mapped bit array, vectorized over batches of keys."""
+
+    def __init__(self, path: str, num_bits: int, num_hashes: int):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        size = (num_bits + 7) // 8
+        with open(path, "a+b") as f:
+            if os.fstat(f.fileno()).st_size != size:
+                f.truncate(size)  # Sparse: blocks are only allocated as bits get set
+            self._mmap = mmap.mmap(f.fileno(), size)
+        self._bits = np.frombuffer(self._mmap, dtype=np.uint8)
+
+    @staticmethod
+    def parameters(capacity: int, error_rate: float) -> tuple[int, int]:
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        return num_bits, max(1, round(num_bits / capacity * math.log(2)))
+
+    def _positions(self, keys: list[bytes]) -> np.ndarray:
+        h1, h2 = _key_hashes(keys)
+        i = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def contains(self, keys: list[bytes]) -> np.ndarray:
+        """Boolean array: ``False`` means definitely not added, ``True`` means probably added."""
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        bits = self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return np.all(bits & 1, axis=1)
+
+    def add(self, keys: list[bytes]) -> None:
+        if keys:
+            positions = self._positions(keys).ravel()
+            masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+            np.bitwise_or.at(self._bits, positions >> np.uint64(3), masks)
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        del self._bits
+        self._mmap.close()
+
+
+@dataclass
+class DedupeReport:
+    total: int = 0
+    duplicates: int = 0
+
+    @property
+    def kept(self) -> int:
+        return self.total - self.duplicates
+
+
+class SpanDeduplicator:
+    """Filters spans already acknowledged by the endpoint out of ``ExportTraceServiceRequest``s.
+
+    Call ``filter_request`` before sending and ``mark_sent`` with the same request once the endpoint
+    has accepted it (or ``release`` if the upload failed). Spans of requests still in flight are also
+    treated as duplicates, so concurrent uploads of overlapping captures send each span once.
+    """
+
+    def __init__(self, path: str, capacity: int = 100_000_000, error_rate: float = 0.01):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sent (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        # The filter's size is fixed when it is created; later runs reuse it whatever --capacity says
+        meta = dict(self._db.execute("SELECT name, value FROM meta"))
+        if "num_bits" not in meta:
+            meta["num_bits"], meta["num_hashes"] = BloomFilter.parameters(capacity, error_rate)
+            self._db.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        bloom_path = f"{path}.bloom"
+        rebuild = not os.path.exists(bloom_path)
+        self.bloom = BloomFilter(bloom_path, meta["num_bits"], meta["num_hashes"])
+        if rebuild:
+            self._rebuild_filter()
+        self._in_flight = set()
+        self.checked = 0
+        self.duplicates = 0
+        self.exact_lookups = 0
+
+    def _rebuild_filter(self, batch: int = 100_000) -> None:
+        cursor = self._db.execute("SELECT key FROM sent")
+        while rows := cursor.fetchmany(batch):
+            self.bloom.add([row[0] for row in rows])
+        self.bloom.flush()
+
+    def _already_sent(self, keys: list[bytes]) -> set[bytes]:
+        candidates = [key for key, maybe in zip(keys, self.bloom.contains(keys)) if maybe]
+        sent = set()
+        for start in range(0, len(candidates), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = candidates[start : start + 500]
+            self.exact_lookups += len(chunk)
+            query = f"SELECT key FROM sent WHERE key IN ({','.join('?' * len(chunk))})"
+            sent.update(row[0] for row in self._db.execute(query, chunk))
+        return sent
+
+    def filter_request(self, request: ExportTraceServiceRequest) -> DedupeReport:
+        """Remove already-sent (and repeated) spans from ``request`` in place and reserve the rest."""
+        spans = [
+            (scope_spans, span)
+            for resource_spans in request.resource_spans
+            for scope_spans in resource_spans.scope_spans
+            for span in scope_spans.spans
+        ]
+        keys = [_span_key(span) for _, span in spans]
+        report = DedupeReport(total=len(keys))
+        with self._lock:
+            sent = self._already_sent(keys)
+            kept = {}
+            for (scope_spans, span), key in zip(spans, keys):
+                # In flight covers spans repeated within this request and spans of concurrent uploads
+                if key in sent or key in self._in_flight:
+                    report.duplicates += 1
+                    continue
+                self._in_flight.add(key)
+                kept.setdefault(id(scope_spans), (scope_spans, []))[1].append(span)
+            if report.duplicates:
+                for resource_spans in request.resource_spans:
+                    for scope_spans in resource_spans.scope_spans:
+                        _replace(scope_spans.spans, kept.get(id(scope_spans), (None, []))[1])
+                _prune_empty(request)
+            self.checked += report.total
+            self.duplicates += report.duplicates
+        return report
+
+    def mark_sent(self, request: ExportTraceServiceRequest) -> None:
+        """Record the spans of an acknowledged request."""
+        keys = _request_keys(request)
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR IGNORE INTO sent VALUES (?)", ((key,) for key in keys))
+            self._db.execute("COMMIT")
+            self.bloom.add(keys)
+            self._in_flight.difference_update(keys)
+
+    def release(self, request: ExportTraceServiceRequest) -> None:
+        """Forget the reservation of a request that was not delivered, so a retry can send its spans."""
+        with self._lock:
+            self._in_flight.difference_update(_request_keys(request))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "spans_checked": self.checked,
+                "duplicates": self.duplicates,
+                "dedupe_ratio": round(self.duplicates / self.checked, 4) if self.checked else 0.0,
+                "exact_lookups": self.exact_lookups,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self.bloom.flush()
+            self.bloom.close()
+            self._db.close()
+
+
+def _request_keys(request: ExportTraceServiceRequest) -> list[bytes]:
+    return [
+        _span_key(span)
+        for resource_spans in request.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    ]
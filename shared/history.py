@@ -0,0 +1,66 @@
+"""Bounded conversation history for LangGraph message state.
+
+``bounded_add_messages`` is a drop-in replacement for the ``add_messages`` reducer that keeps the
+merged history under a token budget with a sliding window (whole turns are dropped from the front,
+so tool calls are never separated from their results) and replaces repeated tool outputs with a
+short stub. The budget comes from ``AGENT_HISTORY_MAX_TOKENS`` (default 4000, ``0`` disables it).
+"""
+import os
+
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langgraph.graph.message import add_messages
+
+DEFAULT_MAX_TOKENS = 4000
+
+
+def history_token_budget() -> int:
+    return int(os.getenv("AGENT_HISTORY_MAX_TOKENS", DEFAULT_MAX_TOKENS))
+
+
+def dedupe_tool_outputs(messages: list[AnyMessage]) -> list[AnyMessage]:
+    """Stub out earlier copies of identical tool outputs, keeping the most recent one in full.
+
+    Keeping the latest copy means the sliding window always drops the stubs before the original.
+    """
+    seen = set()
+    deduped = []
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage) and isinstance(message.content, str):
+            key = (message.name, message.content)
+            stub = f"[duplicate output omitted; see the later {message.name} result]"
+            if key in seen and len(message.content) > len(stub):
+                message = message.model_copy(update={"content": stub})
+            seen.add(key)
+        deduped.append(message)
+    deduped.reverse()
+    return deduped
+
+
+def compact_history(messages: list[AnyMessage], max_tokens: int) -> list[AnyMessage]:
+    """Trim ``messages`` to the last whole turns that fit in ``max_tokens`` and dedupe tool outputs."""
+    if max_tokens and count_tokens_approximately(messages) > max_tokens:
+        kept = trim_messages(
+            messages,
+            max_tokens=max_tokens,
+            token_counter=count_tokens_approximately,
+            strategy="last",
+            start_on="human",
+            include_system=True,
+        )
+        if not kept:
+            # The latest turn alone is over budget; keep it rather than send no context at all
+            last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+            kept = messages[last_human:]
+        messages = kept
+    return dedupe_tool_outputs(messages)
+
+
+def bounded_add_messages(max_tokens: int | None = None):
+    """Build an ``add_messages``-compatible reducer that keeps state within ``max_tokens``."""
+    budget = history_token_budget() if max_tokens is None else max_tokens
+
+    def reducer(left, right):
+        return compact_history(add_messages(left, right), budget)
+
+    return reducer
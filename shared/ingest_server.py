@@ -0,0 +1,260 @@
+"""Local stand-in for the Galileo OTLP ingest endpoint.
+
+Implements the request validation and response shapes documented in the README
+(401/404/415/422 errors, ``partialSuccess`` with ``Group N: `` messages) so the
+uploader can be exercised and benchmarked offline.
+
+Usage:
+    python shared/ingest_server.py --port 4318 --latency-ms 50 --failure-rate 0.01
+    python shared/otel.py --api-key test --project p --logstream l --url http://localhost:4318/otel/v1/traces
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google.protobuf.message import DecodeError
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+
+from shared.validation import NO_GENAI_PATTERNS, SpanValidator, has_genai_pattern
+
+TRACE_PATHS = ("/otel/v1/traces", "/v1/traces")
+PROTOBUF_CONTENT_TYPE = "application/x-protobuf"
+PROCESSOR_EXCEPTION = "Span dropped due to unexpected processor exception."
+DRAIN_CHUNK_BYTES = 64 * 1024
+
+
+class IngestStats:
+    """Thread-safe throughput counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.bytes = 0
+        self.spans_accepted = 0
+        self.spans_rejected = 0
+        self.status_counts = {}
+
+    def record(self, status: int, body_bytes: int, accepted: int = 0, rejected: int = 0):
+        with self._lock:
+            self.requests += 1
+            self.bytes += body_bytes
+            self.spans_accepted += accepted
+            self.spans_rejected += rejected
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            spans = self.spans_accepted + self.spans_rejected
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "spans_accepted": self.spans_accepted,
+                "spans_rejected": self.spans_rejected,
+                "status_counts": {str(k): v for k, v in sorted(self.status_counts.items())},
+                "requests_per_s": round(self.requests / elapsed, 2),
+                "spans_per_s": round(spans / elapsed, 2),
+                "mb_per_s": round(self.bytes / elapsed / 1e6, 3),
+            }
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    server_version = "GalileoIngestStub/0.1"
+
+    def log_message(self, format, *args):
+        if self.server.config.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reject(self, status: int, detail: str, body_bytes: int = 0):
+        self.server.stats.record(status, body_bytes)
+        self._send_json(status, {"detail": detail})
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.stats.snapshot())
+        else:
+            self._send_json(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        config = self.server.config
+        if self.path not in TRACE_PATHS:
+            self._send_json(404, {"detail": "Not Found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        if length > config.max_body_bytes:
+            # Drain the body in chunks, so the client sees the response instead of a reset connection
+            # without the oversized body ever being held in memory
+            remaining = length
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, DRAIN_CHUNK_BYTES))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+            self._reject(413, f"Request body too large ({length} > {config.max_body_bytes} bytes)", length)
+            return
+        body = self.rfile.read(length)
+
+        api_key = self.headers.get("Galileo-API-Key")
+        if not api_key:
+            self._reject(401, "API Key is missing", length)
+            return
+        if config.api_key and api_key != config.api_key:
+            self._reject(401, "Invalid API Key", length)
+            return
+
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip() != PROTOBUF_CONTENT_TYPE:
+            detail = f"{content_type} is not supported, content_type needs to be: '{PROTOBUF_CONTENT_TYPE}'"
+            self._reject(415, detail, length)
+            return
+        if not (self.headers.get("project") or self.headers.get("projectid")):
+            self._reject(404, "Project not found.", length)
+            return
+        if not (self.headers.get("logstream") or self.headers.get("logstreamid")):
+            self._reject(422, "log_stream_id is required.", length)
+            return
+
+        request = ExportTraceServiceRequest()
+        try:
+            request.ParseFromString(body)
+        except DecodeError as e:
+            self._reject(422, f"Trace processing failed: {e}", length)
+            return
+        if not any(ss.spans for rs in request.resource_spans for ss in rs.scope_spans):
+            self._reject(422, "No spans found in request.", length)
+            return
+
+        accepted, rejected, messages = self._process(request)
+        if config.latency_ms or config.jitter_ms:
+            time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000)
+
+        self.server.stats.record(200, length, accepted, rejected)
+        if rejected:
+            self._send_json(200, {"partialSuccess": {"rejectedSpans": rejected, "errorMessage": "; ".join(messages)}})
+        else:
+            self._send_json(200, {})
+
+    def _process(self, request) -> tuple[int, int, list[str]]:
+        failure_rate = self.server.config.failure_rate
+        accepted = rejected = 0
+        messages = []
+        for group, resource_spans in enumerate(request.resource_spans):
+            spans = [span for ss in resource_spans.scope_spans for span in ss.spans]
+            if not has_genai_pattern(resource_spans):
+                rejected += len(spans)
+                messages.append(f"Group {group}: {NO_GENAI_PATTERNS}")
+                continue
+            group_messages = []
+            for span in spans:
+                error = self.server.validator.validate_span(span)
+                if error is None and failure_rate and random.random() < failure_rate:
+                    error = PROCESSOR_EXCEPTION
+                if error is None:
+                    accepted += 1
+                    continue
+                rejected += 1
+                if error not in group_messages:
+                    group_messages.append(error)
+            messages.extend(f"Group {group}: {message}" for message in group_messages)
+        return accepted, rejected, messages
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 4318,
+    api_key: str | None = None,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    failure_rate: float = 0.0,
+    max_body_bytes: int = 16 * 1024 * 1024,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """Create (but do not start) an ingest server. Use ``port=0`` for an ephemeral port."""
+    server = ThreadingHTTPServer((host, port), IngestHandler)
+    server.daemon_threads = True
+    server.config = argparse.Namespace(
+        api_key=api_key,
+        latency_ms=latency_ms,
+        jitter_ms=jitter_ms,
+        failure_rate=failure_rate,
+        max_body_bytes=max_body_bytes,
+        verbose=verbose,
+    )
+    server.stats = IngestStats()
+    server.validator = SpanValidator()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Galileo OTLP ingest endpoint")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=4318, help="Bind port (default: 4318)")
+    parser.add_argument("--api-key", help="Only accept this Galileo-API-Key (default: accept any non-empty key)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per accepted request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random jitter added to the latency")
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a valid span is dropped with a transient processor exception",
+    )
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=16 * 1024 * 1024,
+        help="Reject larger requests with 413 (default: 16 MiB)",
+    )
+    parser.add_argument("--report-interval", type=float, default=0.0, help="Print throughput every N seconds")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args()
+
+    server = create_server(
+        host=args.host,
+        port=args.port,
+        api_key=args.api_key,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        max_body_bytes=args.max_body_bytes,
+        verbose=args.verbose,
+    )
+
+    if args.report_interval > 0:
+
+        def report():
+            while True:
+                time.sleep(args.report_interval)
+                print(f"Stats: {json.dumps(server.stats.snapshot())}", flush=True)
+
+        threading.Thread(target=report, daemon=True).start()
+
+    host, port = server.server_address[:2]
+    print(f"Listening on http://{host}:{port}{TRACE_PATHS[0]} (stats at /stats)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Final stats: {json.dumps(server.stats.snapshot())}")
+
+
+if __name__ == "__main__":
+    main()
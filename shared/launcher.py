@@ -0,0 +1,151 @@
+"""Single fast-starting entry point for all agents.
+
+Nothing heavy (LangChain, LangGraph, CrewAI, the RAG knowledge base) is imported until an agent
+actually runs, so ``--help`` and ``--list`` return immediately. ``--check`` loads each agent in a
+subprocess, so an agent that fails to import is reported instead of crashing the launcher.
+
+Usage:
+    galileo-agents weather "What's the forecast for NYC?"
+    galileo-agents --stream rag "What is RAG?"
+    AGENT_CHECKPOINT_PATH=.cache/checkpoints.sqlite galileo-agents --session s-1 calculator "And in feet?"
+    galileo-agents --list
+    galileo-agents --check rag
+    galileo-agents --profile-imports rag
+    opentelemetry-instrument galileo-agents calculator "sqrt(2) * 10"
+"""
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+from shared.registry import AGENTS, REPO_ROOT, get_spec, load_agent
+
+REQUIRED_ENV = ("OPENAI_API_KEY",)
+
+
+def _load_error(name: str) -> str | None:
+    """Import an agent in a fresh interpreter (agents reuse sibling module names); return its error, if any."""
+    proc = subprocess.run(
+        [sys.executable, "-c", f"from shared.registry import load_agent; load_agent({name!r})"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "check"},
+    )
+    if proc.returncode == 0:
+        return None
+    lines = proc.stderr.strip().splitlines()
+    return lines[-1] if lines else f"exit code {proc.returncode}"
+
+
+def check(names: list[str]) -> bool:
+    """Health check: files, packages and environment, then load each agent module in a subprocess."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    ok = True
+    for name in names:
+        spec = get_spec(name)
+        problems = []
+        if not os.path.exists(os.path.join(REPO_ROOT, spec.path)):
+            problems.append(f"missing {spec.path}")
+        problems += [f"package '{pkg}' not installed" for pkg in spec.requires if not importlib.util.find_spec(pkg)]
+        problems += [f"{var} not set" for var in REQUIRED_ENV if not os.getenv(var)]
+        if not any(problem.startswith(("missing", "package")) for problem in problems):
+            # Finding the packages isn't enough: the agent's own imports can still fail
+            error = _load_error(name)
+            if error:
+                problems.append(f"failed to load: {error}")
+        print(f"{name:<12} {'ok' if not problems else 'FAIL: ' + '; '.join(problems)}")
+        ok = ok and not problems
+    return ok
+
+
+def profile_imports(name: str, top: int = 25) -> None:
+    """Report the import cost of an agent's module tree, aggregated per top-level package."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"from shared.registry import load_agent; load_agent({name!r}); "
+        "print(time.perf_counter() - start)"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        sys.exit(proc.returncode)
+
+    per_package, per_module = {}, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        package = module.split(".")[0]
+        per_package[package] = per_package.get(package, 0) + int(self_us)
+        per_module.append((int(cumulative_us), module))
+
+    total_us = sum(per_package.values())
+    wall = float(proc.stdout.strip().splitlines()[-1])
+    print(f"Agent '{name}': module load {wall:.2f}s wall, {total_us / 1e6:.2f}s in {len(per_module)} imports")
+    print(f"\n{'package':<40} {'self ms':>10} {'share':>7}")
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<40} {self_us / 1000:>10.1f} {self_us / total_us:>7.1%}")
+    print(f"\n{'slowest modules (cumulative)':<60} {'ms':>10}")
+    for cumulative_us, module in sorted(per_module, reverse=True)[:top]:
+        print(f"{module:<60} {cumulative_us / 1000:>10.1f}")
+
+
+def run(name: str, query: str | None, stream: bool = False, session_id: str | None = None) -> object:
+    spec = get_spec(name)
+    kwargs = {key: value for key, value in (("stream", stream), ("session_id", session_id)) if value}
+    if kwargs and spec.framework != "langgraph":
+        raise SystemExit(f"--stream and --session are only supported for LangGraph agents, not '{name}'")
+    start = time.perf_counter()
+    module = load_agent(name)
+    loaded = time.perf_counter()
+    result = getattr(module, spec.entry)(query or spec.default_query, **kwargs)
+    print(f"[{name}] startup {loaded - start:.2f}s, run {time.perf_counter() - loaded:.2f}s", file=sys.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a galileo-agents agent or crew")
+    parser.add_argument("agent", nargs="?", choices=list(AGENTS), help="Agent to run")
+    parser.add_argument("query", nargs="*", help="Query (or topic, for the content crew)")
+    parser.add_argument("--list", action="store_true", help="List available agents")
+    parser.add_argument(
+        "--check", action="store_true", help="Check dependencies and environment and load the agent(s), then exit"
+    )
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="Report per-package import cost of the agent's modules, then exit",
+    )
+    parser.add_argument("--stream", action="store_true", help="Print answer tokens and tool progress as they arrive")
+    parser.add_argument(
+        "--session",
+        help="Session id; with AGENT_CHECKPOINT_PATH set, the agent resumes this session's conversation",
+    )
+    parser.add_argument("--top", type=int, default=25, help="Rows shown by --profile-imports (default: 25)")
+    args = parser.parse_args()
+
+    if args.list:
+        for spec in AGENTS.values():
+            print(f"{spec.name:<12} {spec.framework:<10} {spec.path}")
+        return
+    if args.check:
+        sys.exit(0 if check([args.agent] if args.agent else list(AGENTS)) else 1)
+    if args.agent is None:
+        parser.error("an agent is required (see --list)")
+    if args.profile_imports:
+        profile_imports(args.agent, args.top)
+        return
+
+    run(args.agent, " ".join(args.query) or None, stream=args.stream, session_id=args.session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Disk-backed LLM response cache for deterministic (temperature=0) agent calls.
+
+Opt-in via environment variables:
+
+    LLM_CACHE_PATH=.cache/llm_cache.sqlite   # enables the cache
+    LLM_CACHE_MAX_MB=256                      # size bound, least-recently-used entries are evicted
+
+Entries are keyed on the chat model's configuration string (model, parameters and bound tool
+schemas, as built by LangChain) plus the serialized messages, so any change to the prompt, tools
+or parameters is a miss. Hits set ``gen_ai.cache.hit`` on the current span and are counted in the
+``gen_ai.client.cache.lookups`` metric.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from opentelemetry import metrics, trace
+
+_cache = None
+_cache_lock = threading.Lock()
+
+_meter = metrics.get_meter(__name__)
+_lookups = _meter.create_counter(
+    "gen_ai.client.cache.lookups",
+    description="LLM response cache lookups, by hit/miss",
+)
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain cache stored in a single SQLite file with size-based LRU eviction."""
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        hit = row is not None
+        _lookups.add(1, {"gen_ai.cache.hit": hit})
+        if hit:
+            trace.get_current_span().set_attribute("gen_ai.cache.hit", True)
+            return loads(row[0], allowed_objects="core")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        value = dumps(return_val)
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries until the cache is at 90% of its size bound."""
+        target = int(self.max_bytes * 0.9)
+        self._conn.execute("BEGIN")
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall():
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._total_bytes -= size
+        self._conn.execute("COMMIT")
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {"entries": entries, "bytes": self._total_bytes, "hits": self.hits, "misses": self.misses}
+
+
+def get_llm_cache() -> SQLiteLLMCache | None:
+    """Return the process-wide cache if ``LLM_CACHE_PATH`` is set, else None (caching disabled).
+
+    Pass the result as ``cache=`` to chat models that run with ``temperature=0``; None keeps
+    LangChain's default behaviour.
+    """
+    global _cache
+    path = os.getenv("LLM_CACHE_PATH")
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_mb = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+            _cache = SQLiteLLMCache(path, max_bytes=int(max_mb * 1024 * 1024))
+            # ``loads`` warns that it is in beta on every cache hit; only for calls from this module
+            warnings.filterwarnings("ignore", category=LangChainBetaWarning, module=__name__)
+    return _cache
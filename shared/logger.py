@@ -1,20 +1,122 @@
-"""Singleton logger for galileo-agents."""
+"""Singleton logger for galileo-agents.
+
+``AGENT_LOG_MODE=async`` moves output off the request path: records are handed to a background
+``QueueListener`` thread through a bounded queue (``AGENT_LOG_QUEUE_SIZE``, default 10000). When the
+queue is full the record is dropped rather than blocking, and the number of dropped records is
+reported at exit. Messages are formatted by the listener, so pass arguments lazily
+(``logger.info("Result: %s", result)``) rather than with f-strings.
+
+``AGENT_LOG_FORMAT=json`` emits one compact JSON object per line, including the OpenTelemetry trace
+and span ids of the span active when the record was logged.
+"""
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - opentelemetry is a core dependency
+    trace = None
 
 _logger = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Compact JSON lines with trace/span ids (set by ``TraceContextFilter``)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+            entry["span_id"] = record.span_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class TraceContextFilter(logging.Filter):
+    """Attach the current span's trace and span ids; runs on the logging thread, where the span is active."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = record.span_id = None
+        if trace is not None:
+            context = trace.get_current_span().get_span_context()
+            if context.is_valid:
+                record.trace_id = format(context.trace_id, "032x")
+                record.span_id = format(context.span_id, "016x")
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueue records without blocking, dropping them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base class, don't format here: the listener thread formats msg % args.
+        # Exception tracebacks are rendered now, since the frames may be gone by then.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Block (rather than fail on a full queue) so the records already queued are flushed at exit
+        self.queue.put(self._sentinel)
+
+
+def _stop_listener(handler: DroppingQueueHandler) -> None:
+    _listener.stop()
+    if handler.dropped:
+        sys.stderr.write(f"galileo-agents logger: dropped {handler.dropped} records (queue full)\n")
 
 
 def get_logger() -> logging.Logger:
     """Get or create the singleton logger."""
-    global _logger
+    global _logger, _listener
     if _logger is None:
         _logger = logging.getLogger("galileo-agents")
         _logger.setLevel(logging.INFO)
         _logger.propagate = False
         if not _logger.handlers:
             handler = logging.StreamHandler(sys.stdout)
-            handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+            if os.getenv("AGENT_LOG_FORMAT", "text") == "json":
+                handler.setFormatter(JsonFormatter())
+                trace_filter = TraceContextFilter()
+            else:
+                handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+                trace_filter = None
+
+            if os.getenv("AGENT_LOG_MODE", "sync") == "async":
+                queue_handler = DroppingQueueHandler(queue.Queue(int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000"))))
+                _listener = _Listener(queue_handler.queue, handler)
+                _listener.start()
+                atexit.register(_stop_listener, queue_handler)
+                handler = queue_handler
+            if trace_filter:
+                handler.addFilter(trace_filter)
             _logger.addHandler(handler)
     return _logger
 
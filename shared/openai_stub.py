@@ -0,0 +1,253 @@
+"""Local stand-in for the OpenAI chat completions API that enforces rate limits.
+
+Serves ``/v1/chat/completions`` (plain and streamed) and ``/v1/embeddings`` with canned content and
+``usage``, and enforces account-style limits the way the hosted API does: requests and tokens per
+minute, plus a cap on concurrent requests. Over-limit requests get a 429 with ``Retry-After`` /
+``retry-after-ms`` headers, and latency rises with the number of requests in flight. Point agents at
+it with ``OPENAI_BASE_URL`` to exercise ``shared/ratelimit.py`` offline.
+
+Usage:
+    python shared/openai_stub.py --port 8400 --rpm 600 --tpm 100000 --max-concurrency 16 --latency-ms 200
+    OPENAI_BASE_URL=http://127.0.0.1:8400/v1 OPENAI_API_KEY=stub LLM_MAX_CONCURRENCY=32 \
+        python agents-langgraph/weather/agent.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from shared.ratelimit import TokenBucket
+
+COMPLETION_TEXT = "This is a canned response from the local OpenAI stub."
+
+
+class StubStats:
+    """Thread-safe request counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.status_counts = {}
+        self.tokens = 0
+
+    def enter(self) -> int:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self.in_flight
+
+    def exit(self, status: int, tokens: int = 0):
+        with self._lock:
+            self.in_flight -= 1
+            self.status_counts[str(status)] = self.status_counts.get(str(status), 0) + 1
+            self.tokens += tokens
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            ok = self.status_counts.get("200", 0)
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "status_counts": dict(self.status_counts),
+                "max_in_flight": self.max_in_flight,
+                "tokens": self.tokens,
+                "ok_per_s": round(ok / elapsed, 2) if elapsed else 0.0,
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.config.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _throttle(self, wait_s: float, reason: str):
+        headers = {"Retry-After": str(max(1, round(wait_s))), "retry-after-ms": str(int(wait_s * 1000))}
+        error = {"message": f"Rate limit reached: {reason}", "type": "requests", "code": "rate_limit_exceeded"}
+        self._send_json(429, {"error": error}, headers)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.stats.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": "Not Found"}})
+
+    def do_POST(self):
+        config = self.server.config
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        path = self.path.split("?")[0]
+        if path not in ("/v1/chat/completions", "/v1/embeddings"):
+            self._send_json(404, {"error": {"message": "Not Found"}})
+            return
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        prompt_tokens = len(body) // 4
+        completion_tokens = 0 if path == "/v1/embeddings" else config.completion_tokens
+        in_flight = self.server.stats.enter()
+        status = 429
+        try:
+            if config.max_concurrency and in_flight > config.max_concurrency:
+                self._throttle(0.5, f"more than {config.max_concurrency} concurrent requests")
+                return
+            for bucket, amount, unit in (
+                (self.server.requests, 1, "requests"),
+                (self.server.tokens, prompt_tokens + completion_tokens, "tokens"),
+            ):
+                wait = bucket.try_take(amount) if bucket else 0.0
+                if wait:
+                    self._throttle(wait, f"{unit} per minute")
+                    return
+            # Latency grows with load, like a shared backend under contention
+            latency = config.latency_ms * (1 + config.load_factor * (in_flight - 1))
+            latency += random.uniform(0, config.jitter_ms)
+            time.sleep(latency / 1000)
+            status = 200
+            if path == "/v1/embeddings":
+                self._send_embeddings(request, prompt_tokens)
+            elif request.get("stream"):
+                self._send_stream(request)
+            else:
+                self._send_completion(request, prompt_tokens, completion_tokens)
+        finally:
+            self.server.stats.exit(status, prompt_tokens + completion_tokens if status == 200 else 0)
+
+    def _send_completion(self, request: dict, prompt_tokens: int, completion_tokens: int):
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-stub-{random.getrandbits(48):x}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": COMPLETION_TEXT},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+    def _send_stream(self, request: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "model": request.get("model", "stub")}
+        for word in COMPLETION_TEXT.split(" "):
+            chunk = {**base, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        done = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+        self.close_connection = True
+
+    def _send_embeddings(self, request: dict, prompt_tokens: int):
+        inputs = request.get("input", [])
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        dimensions = request.get("dimensions") or 1536
+        data = [{"object": "embedding", "index": i, "embedding": [0.0] * dimensions} for i in range(len(inputs))]
+        usage = {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens}
+        self._send_json(200, {"object": "list", "data": data, "model": request.get("model", "stub"), "usage": usage})
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8400,
+    rpm: float | None = None,
+    tpm: float | None = None,
+    max_concurrency: int = 0,
+    latency_ms: float = 200.0,
+    jitter_ms: float = 0.0,
+    load_factor: float = 0.05,
+    completion_tokens: int = 50,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """Create (but do not start) a stub server. Use ``port=0`` for an ephemeral port.
+
+    Limits allow one second's worth of burst, roughly how the hosted API smooths per-minute quotas.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = argparse.Namespace(
+        max_concurrency=max_concurrency,
+        latency_ms=latency_ms,
+        jitter_ms=jitter_ms,
+        load_factor=load_factor,
+        completion_tokens=completion_tokens,
+        verbose=verbose,
+    )
+    server.requests = TokenBucket(rpm / 60, max(1.0, rpm / 60)) if rpm else None
+    server.tokens = TokenBucket(tpm / 60, tpm / 60) if tpm else None
+    server.stats = StubStats()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI API stand-in that returns 429s over its limits")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8400, help="Bind port (default: 8400)")
+    parser.add_argument("--rpm", type=float, help="Requests per minute before 429s (default: unlimited)")
+    parser.add_argument("--tpm", type=float, help="Tokens per minute before 429s (default: unlimited)")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Concurrent requests before 429s (0 = no cap)")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Latency of an unloaded request (default: 200)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random jitter added to the latency")
+    parser.add_argument(
+        "--load-factor",
+        type=float,
+        default=0.05,
+        help="Extra latency per concurrent request, as a fraction of --latency-ms (default: 0.05)",
+    )
+    parser.add_argument("--completion-tokens", type=int, default=50, help="Completion tokens reported per response")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = create_server(
+        host=args.host,
+        port=args.port,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_concurrency=args.max_concurrency,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        load_factor=args.load_factor,
+        completion_tokens=args.completion_tokens,
+        verbose=args.verbose,
+    )
+    host, port = server.server_address[:2]
+    print(f"Listening on http://{host}:{port}/v1 (stats at /stats)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Final stats: {json.dumps(server.stats.snapshot())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,41 @@
+"""Upload OTLP trace captures (``*.bin`` ``ExportTraceServiceRequest`` files) to the Galileo endpoint.
+
+By default every capture in ``--directory`` is uploaded once. With ``--watch`` the script runs as a
+daemon: it watches the directory (inotify, or polling with ``--poll``) and uploads captures as they
+are completed, with at most ``--max-in-flight`` files being read or sent at a time. Throttling
+(429), server errors and connection failures are retried with exponential backoff that pauses all
+senders, so a slow endpoint holds new files on disk instead of piling up requests. After the
+endpoint acknowledges a file it is kept, deleted or moved to ``--archive-dir`` (``--after-upload``).
+
+With ``--dedupe-db`` the uploader records every span the endpoint acknowledged and strips spans it
+has already sent out of later uploads (see ``shared/dedupe.py``), so replaying overlapping capture
+directories or rerunning after a partial failure costs no bandwidth or ingest quota twice.
+"""
 import argparse
 import glob
+import os
+import random
+import shutil
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
 import requests
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
     ExportTraceServiceRequest,
 )
 
+from shared.validation import SpanValidator, write_quarantine
+from shared.watcher import DirectoryWatcher
+
+if TYPE_CHECKING:
+    from shared.dedupe import SpanDeduplicator
+
+# Statuses worth retrying; other errors (401, 404, 413, 415, 422) are permanent for a given file
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
 
 def parse_trace(body_bytes):
     reqtrace = ExportTraceServiceRequest()
@@ -13,6 +43,231 @@ def parse_trace(body_bytes):
     return reqtrace
 
 
+def build_headers(args) -> dict:
+    headers = {
+        "Galileo-API-Key": args.api_key,
+        "Content-Type": "application/x-protobuf",
+    }
+
+    # Add project or projectid to headers (prefer project over projectid if both provided)
+    if args.project:
+        headers["project"] = args.project
+    elif args.projectid:
+        headers["projectid"] = args.projectid
+
+    # Add logstream or logstreamid to headers (prefer logstream over logstreamid if both provided)
+    if args.logstream:
+        headers["logstream"] = args.logstream
+    elif args.logstreamid:
+        headers["logstreamid"] = args.logstreamid
+    return headers
+
+
+def load_request(file: str, validator: SpanValidator | None, args) -> ExportTraceServiceRequest | None:
+    """Read a capture and apply pre-flight validation; ``None`` when no span is left to upload."""
+    with open(file, "rb") as f:
+        reqtrace = parse_trace(f.read())
+    if validator is not None:
+        report, rejected = validator.filter_request(reqtrace)
+        if report.rejected:
+            print(f"Validation: {report.valid}/{report.total} spans valid, rejected: {report.reasons()}")
+            if args.validate == "quarantine":
+                base = write_quarantine(args.quarantine_dir, file, report, rejected)
+                print(f"Quarantined rejected spans to {base}.rejected.bin")
+        if not report.valid:
+            print("Skipping upload: no valid spans")
+            return None
+    return reqtrace
+
+
+def dedupe_request(reqtrace: ExportTraceServiceRequest, deduper: "SpanDeduplicator | None") -> bool:
+    """Strip spans that were already sent; ``False`` when none are left."""
+    if deduper is None:
+        return True
+    report = deduper.filter_request(reqtrace)
+    if report.duplicates:
+        print(f"Dedupe: {report.duplicates}/{report.total} spans already sent")
+    if not report.kept:
+        print("Skipping upload: all spans already sent")
+        return False
+    return True
+
+
+def finish_file(file: str, action: str, archive_dir: str) -> None:
+    """Keep, delete or archive a capture the endpoint has acknowledged."""
+    if action == "delete":
+        os.remove(file)
+    elif action == "archive":
+        os.makedirs(archive_dir, exist_ok=True)
+        shutil.move(file, os.path.join(archive_dir, os.path.basename(file)))
+
+
+class Backoff:
+    """Exponential backoff shared by all senders: one throttled request pauses every upload."""
+
+    def __init__(self, initial_s: float = 1.0, max_s: float = 60.0):
+        self.initial_s = initial_s
+        self.max_s = max_s
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._resume_at = 0.0
+
+    def wait(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            stop.wait(delay)
+
+    def failure(self, retry_after: float | None = None) -> float:
+        with self._lock:
+            self._failures += 1
+            delay = min(self.max_s, self.initial_s * 2 ** (self._failures - 1)) * random.uniform(0.5, 1.0)
+            delay = max(delay, retry_after or 0.0)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            return delay
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class StreamingUploader:
+    """Uploads completed captures from a watched directory with bounded in-flight work."""
+
+    def __init__(self, args, headers: dict, validator: SpanValidator | None, deduper: "SpanDeduplicator | None" = None):
+        self.args = args
+        self.headers = headers
+        self.validator = validator
+        self.deduper = deduper
+        self.stop = threading.Event()
+        self.backoff = Backoff(max_s=args.max_backoff)
+        self._slots = threading.BoundedSemaphore(args.max_in_flight)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counts = {"uploaded": 0, "skipped": 0, "duplicates": 0, "failed": 0, "retries": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def send(self, body: bytes) -> requests.Response | None:
+        """POST with retries; ``None`` if stopped before the endpoint accepted or rejected the file."""
+        while not self.stop.is_set():
+            self.backoff.wait(self.stop)
+            if self.stop.is_set():
+                break
+            try:
+                response = self._session().post(
+                    self.args.url, headers=self.headers, data=body, timeout=self.args.timeout
+                )
+            except requests.RequestException as e:
+                delay = self.backoff.failure()
+                print(f"Upload failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    self.backoff.success()
+                    return response
+                delay = self.backoff.failure(_retry_after(response))
+                print(f"Status {response.status_code}, retrying in {delay:.1f}s")
+            self._count("retries")
+        return None
+
+    def ship(self, file: str) -> None:
+        reqtrace = None
+        delivered = False
+        try:
+            reqtrace = load_request(file, self.validator, self.args)
+            if reqtrace is None:
+                self._count("skipped")
+                return
+            if not dedupe_request(reqtrace, self.deduper):
+                # Everything in it was delivered before, which counts as acknowledged
+                finish_file(file, self.args.after_upload, self.args.archive_dir)
+                self._count("duplicates")
+                return
+            started = time.perf_counter()
+            response = self.send(reqtrace.SerializeToString())
+            if response is None:
+                return  # Stopping; the file stays for the next run
+            latency_ms = (time.perf_counter() - started) * 1000
+            print(f"Uploaded {file}: status {response.status_code} in {latency_ms:.0f}ms")
+            if response.ok:
+                delivered = True
+                if self.deduper is not None:
+                    self.deduper.mark_sent(reqtrace)
+                if response.text.strip() not in ("", "{}"):
+                    print(f"Response: {response.text}")
+                finish_file(file, self.args.after_upload, self.args.archive_dir)
+                self._count("uploaded")
+            else:
+                print(f"Response: {response.text}")
+                self._count("failed")
+        except Exception as e:
+            print(f"Failed to process {file}: {type(e).__name__}: {e}")
+            self._count("failed")
+        finally:
+            if self.deduper is not None and reqtrace is not None and not delivered:
+                self.deduper.release(reqtrace)
+            self._slots.release()
+
+    def run(self) -> dict:
+        watcher = DirectoryWatcher(
+            self.args.directory,
+            poll_interval_s=self.args.poll_interval,
+            settle_s=self.args.settle,
+            use_inotify=False if self.args.poll else None,
+        )
+        print(f"Watching {self.args.directory} ({watcher.mode}), up to {self.args.max_in_flight} uploads in flight")
+        with ThreadPoolExecutor(max_workers=self.args.max_in_flight, thread_name_prefix="otel-upload") as pool:
+            for file in watcher.watch(self.stop):
+                if not self._acquire_slot():
+                    break
+                pool.submit(self.ship, file)
+        return self.counts
+
+    def _acquire_slot(self) -> bool:
+        # Back-pressure: take no new file until an in-flight upload finishes
+        while not self._slots.acquire(timeout=0.5):
+            if self.stop.is_set():
+                return False
+        return True
+
+
+def upload_once(args, headers: dict, validator: SpanValidator | None, deduper: "SpanDeduplicator | None") -> None:
+    glob_files = glob.glob(f"{args.directory}/*.bin")
+    glob_files.sort()
+    for file in glob_files:
+        print(f"Processing file: {file}")
+        reqtrace = load_request(file, validator, args)
+        if reqtrace is None:
+            continue
+        if not dedupe_request(reqtrace, deduper):
+            finish_file(file, args.after_upload, args.archive_dir)
+            continue
+        response = requests.post(args.url, headers=headers, data=reqtrace.SerializeToString())
+        print(f"Status: {response.status_code}")
+        print(f"Response: {response.text}")
+        if response.ok:
+            if deduper is not None:
+                deduper.mark_sent(reqtrace)
+            finish_file(file, args.after_upload, args.archive_dir)
+        elif deduper is not None:
+            deduper.release(reqtrace)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Send OTLP traces to Galileo API")
     parser.add_argument(
@@ -46,6 +301,78 @@ def main():
         default="agents-langgraph/weather/otlp_trace",
         help="Directory containing .bin trace files (default: agents-langgraph/weather/otlp_trace)",
     )
+    parser.add_argument(
+        "--validate",
+        choices=["off", "drop", "quarantine"],
+        default="off",
+        help="Pre-flight span validation: drop invalid spans, quarantine them to --quarantine-dir, "
+        "or upload everything unchecked (default: off)",
+    )
+    parser.add_argument(
+        "--quarantine-dir",
+        default="otlp_quarantine",
+        help="Directory for rejected spans and reports when --validate=quarantine (default: otlp_quarantine)",
+    )
+    parser.add_argument(
+        "--after-upload",
+        choices=["keep", "delete", "archive"],
+        default="keep",
+        help="What to do with a capture once the endpoint accepted it (default: keep)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        help="Destination for --after-upload=archive (default: <directory>/uploaded)",
+    )
+    parser.add_argument(
+        "--dedupe-db",
+        help="SQLite file (plus a .bloom filter next to it) recording sent spans; spans already sent are not re-sent",
+    )
+    parser.add_argument(
+        "--dedupe-capacity",
+        type=int,
+        default=100_000_000,
+        help="Spans the dedupe filter is sized for at a 1%% false-positive rate, when it is created (default: 1e8)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and upload new captures as they are completed (stop with Ctrl-C or SIGTERM)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll the directory instead of using inotify",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between directory scans when polling (default: 1)",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=1.0,
+        help="Seconds a polled file must stay unchanged to count as complete (default: 1)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="With --watch, files read or uploading at once (default: 4)",
+    )
+    parser.add_argument(
+        "--max-backoff",
+        type=float,
+        default=60.0,
+        help="Longest pause between retries of throttled or failed uploads (default: 60)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Request timeout in seconds with --watch (default: 30)",
+    )
 
     args = parser.parse_args()
 
@@ -57,34 +384,31 @@ def main():
     if not args.logstream and not args.logstreamid:
         parser.error("At least one of --logstream or --logstreamid must be provided")
 
-    # Build headers
-    headers = {
-        "Galileo-API-Key": args.api_key,
-        "Content-Type": "application/x-protobuf",
-    }
-
-    # Add project or projectid to headers (prefer project over projectid if both provided)
-    if args.project:
-        headers["project"] = args.project
-    elif args.projectid:
-        headers["projectid"] = args.projectid
-
-    # Add logstream or logstreamid to headers (prefer logstream over logstreamid if both provided)
-    if args.logstream:
-        headers["logstream"] = args.logstream
-    elif args.logstreamid:
-        headers["logstreamid"] = args.logstreamid
+    args.archive_dir = args.archive_dir or os.path.join(args.directory, "uploaded")
+    headers = build_headers(args)
+    validator = SpanValidator() if args.validate != "off" else None
+    deduper = None
+    if args.dedupe_db:
+        # Only dedupe needs numpy (the "dedupe" extra); plain uploads don't import it
+        try:
+            from shared.dedupe import SpanDeduplicator
+        except ImportError as e:
+            parser.error(f"--dedupe-db requires numpy ({e}): pip install -e '.[dedupe]'")
+        deduper = SpanDeduplicator(args.dedupe_db, capacity=args.dedupe_capacity)
 
-    glob_files = glob.glob(f"{args.directory}/*.bin")
-    glob_files.sort()
-    for file in glob_files:
-        print(f"Processing file: {file}")
-        with open(file, "rb") as f:
-            body_bytes = f.read()
-            reqtrace = parse_trace(body_bytes)
-        response = requests.post(args.url, headers=headers, data=reqtrace.SerializeToString())
-        print(f"Status: {response.status_code}")
-        print(f"Response: {response.text}")
+    try:
+        if not args.watch:
+            upload_once(args, headers, validator, deduper)
+        else:
+            uploader = StreamingUploader(args, headers, validator, deduper)
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: uploader.stop.set())
+            counts = uploader.run()
+            print(f"Stopped: {counts}")
+    finally:
+        if deduper is not None:
+            print(f"Dedupe: {deduper.stats()}")
+            deduper.close()
 
 
 if __name__ == "__main__":
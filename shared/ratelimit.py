@@ -0,0 +1,472 @@
+"""Process-wide client-side rate limiting and adaptive concurrency for LLM calls.
+
+All agents share one OpenAI account, so every LLM (and embeddings) client in the process routes its
+HTTP requests through one ``RateLimiter``:
+
+- Token buckets for requests and tokens per minute, refilled continuously. A request reserves its
+  estimated tokens (request body size / 4 plus the requested output limit) before it is sent. The
+  estimate is corrected from the response's ``usage`` once it completes.
+- AIMD concurrency: the in-flight limit grows by about one per round of successful calls and is
+  halved on a 429, a 5xx, a request that failed without a response (timeout, connection error) or a
+  latency spike (a call slower than ``latency_spike_factor`` times the smoothed baseline), at most
+  once per round trip. A ``Retry-After`` on a 429 pauses all new requests.
+  A streamed (SSE) response holds its slot until the stream is closed; its latency is the time to
+  the response headers.
+
+Opt-in via environment variables (any one enables the limiter):
+
+    LLM_RATE_LIMIT_RPM=500          # requests per minute
+    LLM_RATE_LIMIT_TPM=200000       # tokens per minute
+    LLM_MAX_CONCURRENCY=32          # upper bound for the adaptive in-flight limit (default: 64)
+
+LangChain clients take ``**openai_client_kwargs()`` (an httpx client pair with a rate-limited
+transport); CrewAI LLMs take ``**crewai_llm_kwargs()`` (a transport interceptor).
+"""
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+
+THROTTLED_STATUSES = (429, 503)
+DEFAULT_OUTPUT_TOKENS = 512
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Continuously refilled bucket of ``rate`` units per second, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` now, going into debt if needed; return the seconds to wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level -= amount
+            return max(0.0, -self._level / self.rate)
+
+    def try_take(self, amount: float) -> float:
+        """Take ``amount`` if available and return 0, else take nothing and return the seconds until it is."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._level >= amount:
+                self._level -= amount
+                return 0.0
+            return (amount - self._level) / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) units after the fact."""
+        with self._lock:
+            self._level = min(self.capacity, self._level + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD in-flight limit: additive increase on success, multiplicative decrease on overload."""
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+        latency_spike_factor: float = 3.0,
+        smoothing: float = 0.1,
+    ):
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_spike_factor = latency_spike_factor
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.baseline_s = None
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def aacquire(self) -> None:
+        # LLM calls take hundreds of milliseconds, so polling adds negligible wake-up delay
+        delay = 0.001
+        while not self.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def release(self, latency_s: float, overloaded: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            spike = self.baseline_s is not None and latency_s > self.latency_spike_factor * self.baseline_s
+            if overloaded or spike:
+                now = time.monotonic()
+                # Calls failing from the same overload arrive together; back off once per round trip
+                if now - self._last_decrease > (self.baseline_s or latency_s):
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                if self.baseline_s is None:
+                    self.baseline_s = latency_s
+                else:
+                    self.baseline_s += self.smoothing * (latency_s - self.baseline_s)
+            self._cond.notify_all()
+
+
+def _bucket(per_minute: float | None, burst_s: float) -> TokenBucket | None:
+    return TokenBucket(per_minute / 60, per_minute / 60 * burst_s) if per_minute else None
+
+
+@dataclass
+class Lease:
+    estimated_tokens: int
+    started: float = field(default_factory=time.monotonic)
+
+
+class RateLimiter:
+    """Request/token buckets plus adaptive concurrency, shared by every LLM client in the process."""
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_concurrency: int = 64,
+        initial_concurrency: int = 8,
+        burst_s: float = 10.0,
+        latency_spike_factor: float = 3.0,
+    ):
+        # Buckets hold ``burst_s`` seconds of quota, so short bursts pass without waiting
+        self.requests = _bucket(requests_per_minute, burst_s)
+        self.tokens = _bucket(tokens_per_minute, burst_s)
+        self.concurrency = AdaptiveConcurrency(
+            initial=initial_concurrency, maximum=max_concurrency, latency_spike_factor=latency_spike_factor
+        )
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.wait_s = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        rpm = os.getenv("LLM_RATE_LIMIT_RPM")
+        tpm = os.getenv("LLM_RATE_LIMIT_TPM")
+        return cls(
+            requests_per_minute=float(rpm) if rpm else None,
+            tokens_per_minute=float(tpm) if tpm else None,
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "64")),
+        )
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = self._paused_until - time.monotonic()
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        with self._lock:
+            self.calls += 1
+            self.wait_s += max(0.0, wait)
+        return wait
+
+    def acquire(self, estimated_tokens: int) -> Lease:
+        self.concurrency.acquire()
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return Lease(estimated_tokens)
+
+    async def aacquire(self, estimated_tokens: int) -> Lease:
+        await self.concurrency.aacquire()
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return Lease(estimated_tokens)
+
+    def release(
+        self,
+        lease: Lease,
+        status_code: int | None,
+        headers=None,
+        used_tokens: int | None = None,
+        latency_s: float | None = None,
+    ) -> None:
+        """Record the outcome of a call; ``status_code`` None means the request failed without a response.
+
+        Failed requests and 5xx responses count as overload, like 429s: the upstream is struggling, so
+        the concurrency limit backs off instead of growing. ``latency_s`` defaults to the time since
+        the lease was taken.
+        """
+        throttled = status_code in THROTTLED_STATUSES
+        overloaded = throttled or status_code is None or status_code >= 500
+        if throttled:
+            with self._lock:
+                self.throttled += 1
+                retry_after = _retry_after_s(headers)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        if self.tokens and used_tokens is not None:
+            self.tokens.adjust(lease.estimated_tokens - used_tokens)
+        if latency_s is None:
+            latency_s = time.monotonic() - lease.started
+        self.concurrency.release(latency_s, overloaded)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "wait_s": round(self.wait_s, 3),
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "concurrency_decreases": self.concurrency.decreases,
+            "latency_baseline_s": self.concurrency.baseline_s,
+        }
+
+
+def _retry_after_s(headers) -> float | None:
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) / scale
+            except ValueError:
+                return None
+    return None
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """Prompt tokens (~4 bytes each of the JSON body, tool schemas included) plus the output limit."""
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return DEFAULT_OUTPUT_TOKENS
+    prompt_tokens = len(request.content) // 4
+    if not isinstance(body, dict) or "messages" not in body:
+        return prompt_tokens  # Embeddings: no output tokens
+    return prompt_tokens + (body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_OUTPUT_TOKENS)
+
+
+def _is_json(response: httpx.Response) -> bool:
+    # Streamed (SSE) and error responses keep their token estimate
+    return response.status_code < 400 and response.headers.get("content-type", "").startswith("application/json")
+
+
+def _finish(limiter: "RateLimiter", lease: Lease, response: httpx.Response) -> None:
+    """Release ``lease`` for a response whose body, if JSON, has already been read."""
+    used = None
+    if _is_json(response):
+        try:
+            used = response.json().get("usage", {}).get("total_tokens")
+        except ValueError:
+            pass
+    limiter.release(lease, response.status_code, response.headers, used)
+
+
+def _release_on_close(limiter: "RateLimiter", lease: Lease, stream) -> weakref.finalize:
+    """Release ``lease`` once, when ``stream`` is closed or garbage collected unclosed."""
+    response = stream.response
+    latency_s = time.monotonic() - lease.started
+    return weakref.finalize(stream, limiter.release, lease, response.status_code, response.headers, None, latency_s)
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that holds the concurrency slot until it is closed."""
+
+    def __init__(self, limiter: "RateLimiter", lease: Lease, response: httpx.Response):
+        self.response = response
+        self._stream = response.stream
+        self._release = _release_on_close(limiter, lease, self)
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    """Async counterpart of ``_ReleasingStream``."""
+
+    def __init__(self, limiter: "RateLimiter", lease: Lease, response: httpx.Response):
+        self.response = response
+        self._stream = response.stream
+        self._release = _release_on_close(limiter, lease, self)
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def _finish_or_hold(limiter: "RateLimiter", lease: Lease, response: httpx.Response, stream_type) -> None:
+    """Release ``lease`` now for a read (JSON) or closed response, else when its stream is closed."""
+    if _is_json(response) or response.is_closed:
+        _finish(limiter, lease, response)
+    else:
+        response.stream = stream_type(limiter, lease, response)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """httpx transport that admits requests through a ``RateLimiter``."""
+
+    def __init__(self, limiter: RateLimiter, transport: httpx.BaseTransport | None = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        lease = self.limiter.acquire(estimate_tokens(request))
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException:
+            self.limiter.release(lease, None)
+            raise
+        if _is_json(response):
+            response.read()
+        _finish_or_hold(self.limiter, lease, response, _ReleasingStream)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of ``RateLimitedTransport``."""
+
+    def __init__(self, limiter: RateLimiter, transport: httpx.AsyncBaseTransport | None = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        lease = await self.limiter.aacquire(estimate_tokens(request))
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.limiter.release(lease, None)
+            raise
+        if _is_json(response):
+            await response.aread()
+        _finish_or_hold(self.limiter, lease, response, _AsyncReleasingStream)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    """Return the process-wide limiter if any ``LLM_RATE_LIMIT_*``/``LLM_MAX_CONCURRENCY`` is set, else None."""
+    global _limiter
+    if not any(os.getenv(name) for name in ("LLM_RATE_LIMIT_RPM", "LLM_RATE_LIMIT_TPM", "LLM_MAX_CONCURRENCY")):
+        return None
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter.from_env()
+    return _limiter
+
+
+def openai_client_kwargs() -> dict:
+    """``http_client``/``http_async_client`` for ``ChatOpenAI``/``OpenAIEmbeddings``; empty when disabled."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return {}
+    from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+    return {
+        "http_client": DefaultHttpxClient(transport=RateLimitedTransport(limiter)),
+        "http_async_client": DefaultAsyncHttpxClient(transport=AsyncRateLimitedTransport(limiter)),
+    }
+
+
+def crewai_llm_kwargs() -> dict:
+    """``interceptor`` for CrewAI's ``LLM``; empty when disabled."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return {}
+    return {"interceptor": _crewai_interceptor(limiter)}
+
+
+def _crewai_interceptor(limiter: RateLimiter):
+    from crewai.llms.hooks.base import BaseInterceptor
+
+    # The response CrewAI passes to ``on_inbound`` has no ``.request`` yet, but both hooks run in
+    # the same thread (or task) back to back, so the lease travels in a context variable.
+    current = contextvars.ContextVar("rate_limit_lease", default=None)
+
+    class RateLimitInterceptor(BaseInterceptor[httpx.Request, httpx.Response]):
+        """Admits CrewAI's provider requests through the limiter.
+
+        CrewAI only calls ``on_inbound`` when a response arrives, so the lease is also released when
+        the request object is garbage collected, which covers requests that failed in transit.
+        """
+
+        def on_outbound(self, message: httpx.Request) -> httpx.Request:
+            self._attach(message, limiter.acquire(estimate_tokens(message)))
+            return message
+
+        async def aon_outbound(self, message: httpx.Request) -> httpx.Request:
+            self._attach(message, await limiter.aacquire(estimate_tokens(message)))
+            return message
+
+        def on_inbound(self, message: httpx.Response) -> httpx.Response:
+            lease = self._detach()
+            if lease is not None:
+                if _is_json(message):
+                    message.read()
+                _finish_or_hold(limiter, lease, message, _ReleasingStream)
+            return message
+
+        async def aon_inbound(self, message: httpx.Response) -> httpx.Response:
+            lease = self._detach()
+            if lease is not None:
+                if _is_json(message):
+                    await message.aread()
+                _finish_or_hold(limiter, lease, message, _AsyncReleasingStream)
+            return message
+
+        @staticmethod
+        def _attach(request: httpx.Request, lease: Lease) -> None:
+            current.set((weakref.finalize(request, limiter.release, lease, None), lease))
+
+        @staticmethod
+        def _detach() -> Lease | None:
+            release, lease = current.get() or (None, None)
+            current.set(None)
+            if release is None or release.detach() is None:
+                return None  # Not ours, or already released
+            return lease
+
+    return RateLimitInterceptor()
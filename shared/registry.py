@@ -0,0 +1,184 @@
+"""Registry of the runnable agents and an isolating loader for their modules.
+
+Each agent directory is a flat script directory whose modules import their siblings by bare name
+(``from tools import ...``, ``from prompt import ...``). ``load_agent`` imports an agent with its
+own directory on ``sys.path`` and then unregisters those bare names, so several agents can be
+loaded into one process without picking up each other's ``tools``/``prompt`` modules.
+"""
+import importlib.util
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bare module names shared between agent directories
+_SIBLING_MODULES = ("agent", "agents", "crew", "prompt", "prompts", "routing", "tools")
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    name: str
+    framework: str
+    path: str
+    entry: str
+    default_query: str
+    requires: tuple[str, ...]
+    # Module function that builds the compiled graph (LangGraph) or the per-query crew (CrewAI)
+    factory: str
+    # CrewAI: the kickoff input the query fills in when the factory builds a template (no query argument)
+    crew_input: str | None = None
+
+
+@dataclass
+class AgentResult:
+    response: str
+    usage: dict = field(default_factory=dict)
+
+
+AGENTS = {
+    spec.name: spec
+    for spec in (
+        AgentSpec(
+            name="weather",
+            framework="langgraph",
+            path="agents-langgraph/weather/agent.py",
+            entry="main",
+            default_query="What's the weather like in San Francisco?",
+            requires=("langchain", "langchain_openai", "langgraph"),
+            factory="create_weather_agent",
+        ),
+        AgentSpec(
+            name="calculator",
+            framework="langgraph",
+            path="agents-langgraph/calculator/agent.py",
+            entry="main",
+            default_query="Convert 100 km to mi",
+            requires=("langchain", "langchain_openai", "langgraph"),
+            factory="create_workflow",
+        ),
+        AgentSpec(
+            name="rag",
+            framework="langgraph",
+            path="agents-langgraph/rag/agent.py",
+            entry="main",
+            default_query="What is RAG and how does it work?",
+            requires=("langchain", "langchain_openai", "langchain_community", "langgraph", "faiss"),
+            factory="create_rag_agent",
+        ),
+        AgentSpec(
+            name="content",
+            framework="crewai",
+            path="agents-crewai/content/crew.py",
+            entry="main",
+            default_query="The Future of AI Agents",
+            requires=("crewai",),
+            factory="create_crew",
+            crew_input="topic",
+        ),
+        AgentSpec(
+            name="research",
+            framework="crewai",
+            path="agents-crewai/research/crew.py",
+            entry="run_support_query",
+            default_query="My device won't turn on and I want a refund",
+            requires=("crewai",),
+            factory="create_customer_support_crew",
+            crew_input="query",
+        ),
+    )
+}
+
+
+def get_spec(name: str) -> AgentSpec:
+    try:
+        return AGENTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown agent '{name}'. Available: {', '.join(AGENTS)}") from None
+
+
+def load_agent(name: str):
+    """Import an agent's entry module (once per process) and return it."""
+    spec = get_spec(name)
+    with _load_lock:
+        if name in _loaded:
+            return _loaded[name]
+
+        path = os.path.join(REPO_ROOT, spec.path)
+        directory = os.path.dirname(path)
+        module_name = f"galileo_agents_{name}"
+        saved = {m: sys.modules.pop(m) for m in _SIBLING_MODULES if m in sys.modules}
+        sys.path.insert(0, directory)
+        try:
+            module_spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(module_spec)
+            sys.modules[module_name] = module
+            module_spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+        finally:
+            sys.path.remove(directory)
+            for sibling in _SIBLING_MODULES:
+                loaded = sys.modules.pop(sibling, None)
+                if loaded is not None:
+                    sys.modules[f"{module_name}.{sibling}"] = loaded
+            sys.modules.update(saved)
+
+        _loaded[name] = module
+        return module
+
+
+def _graph_usage(messages) -> dict:
+    # A resumed session returns its whole history; only count this turn (after the last user message)
+    last_user = max((i for i, m in enumerate(messages) if getattr(m, "type", None) == "human"), default=0)
+    usage = {}
+    for message in messages[last_user:]:
+        for key, value in (getattr(message, "usage_metadata", None) or {}).items():
+            if isinstance(value, int):
+                usage[key] = usage.get(key, 0) + value
+    return usage
+
+
+def make_runner(name: str, **factory_kwargs) -> Callable[..., AgentResult]:
+    """Build a warm, reusable runner ``run(query, session_id=None, thread_id=None) -> AgentResult``.
+
+    LangGraph graphs are compiled once and invoked concurrently. A crew template is built once and
+    reused by ``shared.crew_executor.CrewExecutor``, one per worker process; it can't run two kickoffs
+    at once, so this in-process runner, which may be called from many threads, assembles a crew per
+    query instead. With checkpointing enabled (``AGENT_CHECKPOINT_PATH``),
+    LangGraph runs resume the conversation of ``thread_id`` (default: the session id).
+    ``factory_kwargs`` (e.g. ``llm=``) are passed to the agent's factory.
+    """
+    spec = get_spec(name)
+    module = load_agent(name)
+    factory = getattr(module, spec.factory)
+
+    if spec.framework == "langgraph":
+        from shared.checkpoint import session_config
+
+        graph = factory(**factory_kwargs)
+        if hasattr(module, "get_retriever"):
+            module.get_retriever()
+
+        def run_graph(query: str, session_id: str | None = None, thread_id: str | None = None) -> AgentResult:
+            result = graph.invoke({"messages": [("user", query)]}, config=session_config(session_id, thread_id))
+            return AgentResult(response=result["messages"][-1].content, usage=_graph_usage(result["messages"]))
+
+        return run_graph
+
+    def run_crew(query: str, session_id: str | None = None, thread_id: str | None = None) -> AgentResult:
+        output = factory(query, **factory_kwargs).kickoff()
+        return AgentResult(response=str(output), usage=_crew_usage(output))
+
+    return run_crew
+
+
+def _crew_usage(output) -> dict:
+    token_usage = getattr(output, "token_usage", None)
+    return token_usage.model_dump() if token_usage is not None else {}
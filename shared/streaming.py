@@ -0,0 +1,87 @@
+"""Token and tool-progress streaming for LangGraph agents.
+
+Runs the same compiled graph with the same config as ``invoke`` (so spans are unchanged), but
+surfaces final-answer tokens and tool calls/results as they happen instead of after the whole
+multi-turn tool loop finishes.
+
+Text of an AI message that calls tools is intermediate, not part of the answer. It is emitted as
+``thought`` events from the chunk that carries the first tool call on; text streamed before that
+chunk can't be told apart from the answer yet and stays a ``token``.
+"""
+import sys
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+STREAM_MODES = ["messages", "values"]
+
+
+@dataclass
+class StreamEvent:
+    # "token" | "thought" | "tool_call" | "tool_result" | "final"
+    type: str
+    content: str = ""
+    name: str | None = None
+
+
+def _events(namespace: tuple, mode: str, chunk, state: dict) -> Iterator[StreamEvent]:
+    if mode == "values":
+        # Only the outer graph's state holds the final answer
+        if not namespace and chunk.get("messages"):
+            state["final"] = chunk["messages"][-1]
+        return
+    message, _metadata = chunk
+    if isinstance(message, AIMessageChunk):
+        if message.tool_call_chunks and message.id:
+            state["tool_calling"].add(message.id)
+        if isinstance(message.content, str) and message.content:
+            intermediate = message.tool_call_chunks or message.id in state["tool_calling"]
+            yield StreamEvent("thought" if intermediate else "token", content=message.content)
+        for tool_call in message.tool_call_chunks:
+            if tool_call.get("name"):
+                yield StreamEvent("tool_call", name=tool_call["name"])
+    elif isinstance(message, ToolMessage) and message.id not in state["tool_results"]:
+        state["tool_results"].add(message.id)
+        yield StreamEvent("tool_result", content=str(message.content), name=message.name)
+
+
+def stream_graph(graph, inputs: dict, config: dict | None = None) -> Iterator[StreamEvent]:
+    """Stream a graph run; the last event is always ``final`` with the same content ``invoke`` returns."""
+    state = {"final": None, "tool_results": set(), "tool_calling": set()}
+    for namespace, mode, chunk in graph.stream(inputs, config=config, stream_mode=STREAM_MODES, subgraphs=True):
+        yield from _events(namespace, mode, chunk, state)
+    yield StreamEvent("final", content=state["final"].content if state["final"] is not None else "")
+
+
+async def astream_graph(graph, inputs: dict, config: dict | None = None) -> AsyncIterator[StreamEvent]:
+    """Async variant of :func:`stream_graph`."""
+    state = {"final": None, "tool_results": set(), "tool_calling": set()}
+    async for namespace, mode, chunk in graph.astream(
+        inputs, config=config, stream_mode=STREAM_MODES, subgraphs=True
+    ):
+        for event in _events(namespace, mode, chunk, state):
+            yield event
+    yield StreamEvent("final", content=state["final"].content if state["final"] is not None else "")
+
+
+def render_stream(events: Iterator[StreamEvent], out=sys.stdout, progress=sys.stderr) -> str:
+    """Print tokens as they arrive, and intermediate text and tool progress to ``progress``; return the final answer."""
+    final = ""
+    for event in events:
+        if event.type == "token":
+            out.write(event.content)
+            out.flush()
+        elif event.type == "thought":
+            progress.write(event.content)
+            progress.flush()
+        elif event.type == "tool_call":
+            progress.write(f"\n[calling {event.name}]\n")
+            progress.flush()
+        elif event.type == "tool_result":
+            progress.write(f"[{event.name} done]\n")
+            progress.flush()
+        elif event.type == "final":
+            final = event.content
+    out.write("\n")
+    return final
@@ -0,0 +1,282 @@
+"""Client-side span validation against Galileo's minimum span requirements.
+
+The rules mirror the README "Minimum Requirements for Valid Spans" and the permanent
+``partialSuccess`` rejections. They are compiled once into a single regex plus bitmasks,
+so each span is validated in one pass over its attributes.
+
+Spans are only held to a span-type's requirements when they declare that type through
+GenAI attributes (``gen_ai.operation.name``, ``db.operation``, ``openinference.span.kind``
+or ``traceloop.span.kind``). Traceloop spans satisfy them with their ``traceloop.entity.*``
+equivalents. Framework spans (e.g. traceloop workflow/task spans) are accepted as long as
+their resource group carries GenAI patterns, matching how the ingest endpoint treats them.
+"""
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+
+NO_GENAI_PATTERNS = (
+    "No GenAI patterns detected in spans. Ensure spans contain standard OTEL GenAI attributes "
+    "or are from a supported framework."
+)
+MISSING_SPAN_ID = "Missing required field 'id' (span_id): Every span must have a unique identifier"
+MISSING_TRACE_ID = "Missing required field 'trace_id': Every span must belong to a trace"
+
+GENAI_PREFIXES = ("gen_ai.", "llm.", "openinference.", "traceloop.", "crewai.", "db.operation")
+
+INPUT_KEYS = ("gen_ai.input.messages", "input.value", "llm.input_messages", "gen_ai.prompt", "traceloop.entity.input")
+OUTPUT_KEYS = (
+    "gen_ai.output.messages",
+    "output.value",
+    "llm.output_messages",
+    "gen_ai.completion",
+    "traceloop.entity.output",
+)
+# Keys shared by the agent/tool requirements below and the typed columns of ``shared.columnar``
+OPERATION_KEYS = ("gen_ai.operation.name", "traceloop.span.kind")
+PROVIDER_KEYS = ("gen_ai.provider.name", "gen_ai.system")
+TOOL_NAME_KEYS = ("tool.name", "gen_ai.tool.name", "traceloop.entity.name")
+TOOL_INPUT_KEYS = ("gen_ai.tool.call.arguments",) + INPUT_KEYS
+TOOL_OUTPUT_KEYS = ("gen_ai.tool.call.result",) + OUTPUT_KEYS
+
+# (field reported in the error, attribute keys that satisfy it) per span type.
+# A key also matches its flattened OpenInference/traceloop form, e.g. ``gen_ai.prompt.0.content``.
+SPAN_REQUIREMENTS = {
+    "agent": [
+        ("gen_ai.operation.name", OPERATION_KEYS),
+        ("gen_ai.provider.name", PROVIDER_KEYS),
+        ("input", INPUT_KEYS),
+        ("output", OUTPUT_KEYS),
+    ],
+    "llm": [
+        ("gen_ai.operation.name", ("gen_ai.operation.name",)),
+        ("gen_ai.provider.name", PROVIDER_KEYS),
+        ("input", INPUT_KEYS),
+        ("output", OUTPUT_KEYS),
+    ],
+    "tool": [
+        ("gen_ai.operation.name", OPERATION_KEYS),
+        ("tool.name", TOOL_NAME_KEYS),
+        ("input", TOOL_INPUT_KEYS),
+        ("output", TOOL_OUTPUT_KEYS),
+    ],
+    "retriever": [
+        ("db.operation", ("db.operation",)),
+        ("input", INPUT_KEYS),
+        ("output", ("retrieval.documents",) + OUTPUT_KEYS),
+    ],
+}
+
+AGENT_OPERATIONS = {"invoke_agent", "create_agent"}
+LLM_OPERATIONS = {"chat", "text_completion", "embeddings", "generate_content"}
+RETRIEVER_OPERATIONS = {"query", "search"}
+# traceloop.span.kind values that declare a span type; workflow/task spans are framework spans
+TRACELOOP_KINDS = {"agent": "agent", "tool": "tool"}
+
+
+@dataclass
+class RejectedSpan:
+    group: int
+    trace_id: str
+    span_id: str
+    name: str
+    reason: str
+
+
+@dataclass
+class ValidationReport:
+    total: int = 0
+    rejected: list[RejectedSpan] = field(default_factory=list)
+
+    @property
+    def valid(self) -> int:
+        return self.total - len(self.rejected)
+
+    def reasons(self) -> dict[str, int]:
+        counts = {}
+        for span in self.rejected:
+            counts[span.reason] = counts.get(span.reason, 0) + 1
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "valid": self.valid,
+            "rejected": len(self.rejected),
+            "reasons": self.reasons(),
+            "spans": [asdict(span) for span in self.rejected],
+        }
+
+
+class SpanValidator:
+    """Validates spans against compiled per-type requirement rules."""
+
+    def __init__(self, requirements: dict = SPAN_REQUIREMENTS):
+        key_masks = {}
+        self._required = {}
+        self._fields = []
+        for span_type, rules in requirements.items():
+            required = 0
+            for field_name, keys in rules:
+                bit = 1 << len(self._fields)
+                self._fields.append(field_name)
+                required |= bit
+                for key in keys:
+                    key_masks[key] = key_masks.get(key, 0) | bit
+            self._required[span_type] = required
+        self._key_masks = key_masks
+        # Longest keys first so e.g. ``gen_ai.tool.call.result`` is never shadowed by a shorter prefix
+        alternatives = "|".join(re.escape(key) for key in sorted(key_masks, key=len, reverse=True))
+        self._pattern = re.compile(rf"({alternatives})(?:\.|$)")
+
+    def validate_span(self, span) -> str | None:
+        """Return the rejection message for a span, or None if it is valid."""
+        if not any(span.span_id):
+            return MISSING_SPAN_ID
+        if not any(span.trace_id):
+            return MISSING_TRACE_ID
+
+        present = 0
+        operation = db_operation = oi_kind = traceloop_kind = None
+        match = self._pattern.match
+        for kv in span.attributes:
+            key = kv.key
+            m = match(key)
+            if m is None:
+                if key == "openinference.span.kind":
+                    oi_kind = kv.value.string_value.lower()
+                continue
+            value = kv.value
+            if not value.WhichOneof("value") or (value.HasField("string_value") and not value.string_value):
+                continue
+            present |= self._key_masks[m.group(1)]
+            if key == "gen_ai.operation.name":
+                operation = value.string_value
+            elif key == "db.operation":
+                db_operation = value.string_value
+            elif key == "traceloop.span.kind":
+                traceloop_kind = value.string_value
+
+        span_type = _classify(operation, db_operation, oi_kind, traceloop_kind)
+        if span_type is None:
+            return None
+        missing = self._required.get(span_type, 0) & ~present
+        if missing:
+            field_name = self._fields[(missing & -missing).bit_length() - 1]
+            return f"Galileo schema validation failed for field '{field_name}': required for {span_type} spans"
+        if span_type == "retriever" and db_operation is not None and db_operation not in RETRIEVER_OPERATIONS:
+            return "Galileo schema validation failed for field 'db.operation': must be 'query' or 'search'"
+        return None
+
+    def validate_request(self, request) -> ValidationReport:
+        """Validate every span in an ``ExportTraceServiceRequest`` without modifying it."""
+        report = ValidationReport()
+        for group, resource_spans in enumerate(request.resource_spans):
+            genai = has_genai_pattern(resource_spans)
+            for scope_spans in resource_spans.scope_spans:
+                for span in scope_spans.spans:
+                    report.total += 1
+                    reason = NO_GENAI_PATTERNS if not genai else self.validate_span(span)
+                    if reason is not None:
+                        report.rejected.append(_rejected(group, span, reason))
+        return report
+
+    def filter_request(self, request) -> tuple[ValidationReport, ExportTraceServiceRequest]:
+        """Remove invalid spans from ``request`` in place.
+
+        Returns:
+            Tuple of (report, request holding only the rejected spans, for quarantine)
+        """
+        report = ValidationReport()
+        quarantine = ExportTraceServiceRequest()
+        for group, resource_spans in enumerate(request.resource_spans):
+            genai = has_genai_pattern(resource_spans)
+            rejected_rs = None
+            for scope_spans in resource_spans.scope_spans:
+                kept, dropped = [], []
+                for span in scope_spans.spans:
+                    report.total += 1
+                    reason = NO_GENAI_PATTERNS if not genai else self.validate_span(span)
+                    if reason is None:
+                        kept.append(span)
+                    else:
+                        dropped.append(span)
+                        report.rejected.append(_rejected(group, span, reason))
+                if not dropped:
+                    continue
+                if rejected_rs is None:
+                    rejected_rs = quarantine.resource_spans.add()
+                    rejected_rs.resource.CopyFrom(resource_spans.resource)
+                    rejected_rs.schema_url = resource_spans.schema_url
+                rejected_ss = rejected_rs.scope_spans.add()
+                rejected_ss.scope.CopyFrom(scope_spans.scope)
+                rejected_ss.schema_url = scope_spans.schema_url
+                rejected_ss.spans.extend(dropped)
+                _replace(scope_spans.spans, kept)
+
+        _prune_empty(request)
+        return report, quarantine
+
+
+def _classify(
+    operation: str | None, db_operation: str | None, oi_kind: str | None, traceloop_kind: str | None = None
+) -> str | None:
+    if db_operation is not None or oi_kind == "retriever":
+        return "retriever"
+    if operation == "execute_tool":
+        return "tool"
+    if operation in AGENT_OPERATIONS:
+        return "agent"
+    if operation in LLM_OPERATIONS:
+        return "llm"
+    return TRACELOOP_KINDS.get(traceloop_kind)
+
+
+def has_genai_pattern(resource_spans) -> bool:
+    return any(
+        kv.key.startswith(GENAI_PREFIXES)
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+        for kv in span.attributes
+    )
+
+
+def _rejected(group: int, span, reason: str) -> RejectedSpan:
+    return RejectedSpan(
+        group=group, trace_id=span.trace_id.hex(), span_id=span.span_id.hex(), name=span.name, reason=reason
+    )
+
+
+def _replace(repeated, items: list):
+    """Replace the contents of a repeated message field, copying items out before clearing it."""
+    copies = []
+    for item in items:
+        copy = type(item)()
+        copy.CopyFrom(item)
+        copies.append(copy)
+    del repeated[:]
+    repeated.extend(copies)
+
+
+def _prune_empty(request):
+    """Drop scope/resource groups that no longer contain spans."""
+    for resource_spans in request.resource_spans:
+        if not all(ss.spans for ss in resource_spans.scope_spans):
+            _replace(resource_spans.scope_spans, [ss for ss in resource_spans.scope_spans if ss.spans])
+    if not all(rs.scope_spans for rs in request.resource_spans):
+        _replace(request.resource_spans, [rs for rs in request.resource_spans if rs.scope_spans])
+
+
+def write_quarantine(directory: str, source_file: str, report: ValidationReport, quarantine) -> str:
+    """Write rejected spans (protobuf) and the report (JSON) next to each other; return the base path."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, os.path.splitext(os.path.basename(source_file))[0])
+    with open(f"{base}.rejected.bin", "wb") as f:
+        f.write(quarantine.SerializeToString())
+    with open(f"{base}.rejected.json", "w") as f:
+        json.dump({"source": source_file, **report.to_dict()}, f, indent=2)
+    return base
@@ -0,0 +1,156 @@
+"""Directory watcher that yields capture files once they are complete.
+
+On Linux, ``inotify`` (through ``ctypes``) reports a file when its writer closes it
+(``IN_CLOSE_WRITE``) or when it is renamed into the directory (``IN_MOVED_TO``), so files are picked up
+as soon as they are finished, without rescanning. Elsewhere, or when inotify is unavailable (e.g. some
+network filesystems and containers), the directory is polled and a file counts as complete once its
+size and modification time have not changed for ``settle_s``.
+
+Files already in the directory at start are yielded first, oldest name first. Each file is yielded
+at most once while it exists. Names of files that have since been removed (e.g. deleted or archived
+after upload) are forgotten on the next scan, so a long-running watcher's memory stays bounded by the
+directory's contents.
+"""
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Iterator
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Inotify:
+    """Minimal inotify binding for one directory."""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> tuple[list[str], bool]:
+        """Wait up to ``timeout`` seconds; return completed file names and whether events overflowed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return [], False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+        names, overflow, offset = [], False, 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif length:
+                names.append(os.fsdecode(data[offset : offset + length].rstrip(b"\0")))
+            offset += length
+        return names, overflow
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """Yield paths of completed files matching ``pattern`` in ``directory`` (not recursive)."""
+
+    def __init__(
+        self,
+        directory: str,
+        pattern: str = "*.bin",
+        poll_interval_s: float = 1.0,
+        settle_s: float = 1.0,
+        use_inotify: bool | None = None,
+        prune_interval_s: float = 60.0,
+    ):
+        self.directory = directory
+        self.pattern = pattern
+        self.poll_interval_s = poll_interval_s
+        self.settle_s = settle_s
+        self.prune_interval_s = prune_interval_s
+        self._inotify = None
+        if use_inotify is not False and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(directory)
+            except (OSError, AttributeError):
+                if use_inotify:
+                    raise
+        self.mode = "inotify" if self._inotify else "polling"
+        self._seen = set()
+        self._scanned = 0.0
+        # Files that are still being written: name -> (size, mtime, first time seen unchanged)
+        self._pending = {}
+
+    def watch(self, stop: threading.Event) -> Iterator[str]:
+        """Yield completed files until ``stop`` is set."""
+        try:
+            yield from self._scan()
+            while not stop.is_set():
+                if self._inotify:
+                    names, overflow = self._inotify.read(self.poll_interval_s)
+                    for name in names:
+                        if fnmatch.fnmatch(name, self.pattern) and name not in self._seen:
+                            self._pending.pop(name, None)
+                            self._seen.add(name)
+                            yield os.path.join(self.directory, name)
+                    if overflow or self._pending or time.monotonic() - self._scanned >= self.prune_interval_s:
+                        # Missed events, files still being written at the initial scan, or due to
+                        # forget removed files
+                        yield from self._scan()
+                else:
+                    stop.wait(self.poll_interval_s)
+                    yield from self._scan()
+        finally:
+            self.close()
+
+    def _scan(self) -> Iterator[str]:
+        now = time.time()
+        try:
+            names = sorted(n for n in os.listdir(self.directory) if fnmatch.fnmatch(n, self.pattern))
+        except FileNotFoundError:
+            return
+        self._scanned = time.monotonic()
+        # Forget files that no longer exist, so the set is bounded by the directory listing
+        present = set(names)
+        self._seen &= present
+        for name in self._pending.keys() - present:
+            del self._pending[name]
+        for name in names:
+            if name in self._seen:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            previous = self._pending.get(name)
+            if previous is None or previous[:2] != signature:
+                since = stat.st_mtime if previous is None else now
+                self._pending[name] = (*signature, since)
+                previous = self._pending[name]
+            if stat.st_size and now - previous[2] >= self.settle_s:
+                del self._pending[name]
+                self._seen.add(name)
+                yield path
+
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
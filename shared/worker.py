@@ -0,0 +1,179 @@
+"""Long-lived multi-agent worker serving JSONL requests with warm state.
+
+Agents are imported and built once at startup; requests are then served concurrently without
+per-query interpreter, import or graph construction cost.
+
+Request (one JSON object per line):
+    {"id": "1", "agent": "calculator", "query": "sqrt(2) * 10", "session_id": "s-1"}
+
+Response (one per request, in completion order):
+    {"id": "1", "agent": "calculator", "session_id": "s-1", "response": "...", "usage": {...},
+     "latency_ms": 812.4, "queue_ms": 0.3, "error": null}
+
+Usage:
+    python -m shared.worker --agents weather,calculator --concurrency 8 < requests.jsonl > results.jsonl
+    python -m shared.worker --socket /tmp/agents.sock
+"""
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shared import logger
+from shared.registry import AGENTS, make_runner
+
+
+class Worker:
+    """Dispatches requests to warm agent runners on a bounded thread pool."""
+
+    def __init__(self, agents: list[str], concurrency: int = 4):
+        self.runners = {}
+        for name in agents:
+            start = time.perf_counter()
+            self.runners[name] = make_runner(name)
+            logger.info("Warmed agent '%s' in %.2fs", name, time.perf_counter() - start)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="agent-worker")
+        # Bound in-flight requests so a large input stream is not read into memory at once
+        self._slots = threading.BoundedSemaphore(concurrency * 2)
+        self._stats_lock = threading.Lock()
+        self.latencies_ms = []
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def submit(self, line: str, emit) -> None:
+        """Parse one JSONL request and schedule it; ``emit(dict)`` is called with the result."""
+        received = time.perf_counter()
+        request = None
+        try:
+            request = json.loads(line)
+            agent = request["agent"]
+            if agent not in self.runners:
+                raise ValueError(f"unknown agent {agent!r}")
+            runner = self.runners[agent]
+            query = request["query"]
+        except (ValueError, KeyError, TypeError) as e:
+            # Echo the id whenever the line parsed, so the client can match the error to its request
+            request_id = request.get("id") if isinstance(request, dict) else None
+            emit({"id": request_id, "error": f"Invalid request: {e!r}"})
+            return
+        self._slots.acquire()
+        self.executor.submit(self._run, runner, request, query, received, emit)
+
+    def _run(self, runner, request: dict, query: str, received: float, emit) -> None:
+        started = time.perf_counter()
+        result = {
+            "id": request.get("id"),
+            "agent": request["agent"],
+            "session_id": request.get("session_id"),
+            "response": None,
+            "usage": {},
+            "error": None,
+        }
+        try:
+            output = runner(query, session_id=request.get("session_id"))
+            result["response"] = output.response
+            result["usage"] = output.usage
+        except Exception as e:
+            logger.exception("Request %s failed", request.get("id"))
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            self._slots.release()
+        finished = time.perf_counter()
+        result["latency_ms"] = round((finished - started) * 1000, 1)
+        result["queue_ms"] = round((started - received) * 1000, 1)
+        with self._stats_lock:
+            self.latencies_ms.append(result["latency_ms"])
+            self.errors += result["error"] is not None
+        emit(result)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    def summary(self) -> dict:
+        with self._stats_lock:
+            latencies = sorted(self.latencies_ms)
+        elapsed = time.monotonic() - self.started
+        summary = {"requests": len(latencies), "errors": self.errors, "throughput_rps": len(latencies) / elapsed}
+        for p in (50, 95, 99):
+            summary[f"p{p}_ms"] = latencies[min(len(latencies) - 1, len(latencies) * p // 100)] if latencies else None
+        return summary
+
+
+def _line_writer(write, flush):
+    lock = threading.Lock()
+
+    def emit(result: dict) -> None:
+        line = json.dumps(result, default=str) + "\n"
+        with lock:
+            write(line)
+            flush()
+
+    return emit
+
+
+def serve_stdio(worker: Worker) -> None:
+    # Agents and CrewAI print progress to stdout; keep the real stdout for results only
+    results = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    emit = _line_writer(results.write, results.flush)
+    for line in sys.stdin:
+        if line.strip():
+            worker.submit(line, emit)
+    worker.shutdown()
+    results.close()
+
+
+def serve_socket(worker: Worker, path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            emit = _line_writer(lambda line: self.wfile.write(line.encode()), self.wfile.flush)
+            pending = []
+            for raw in self.rfile:
+                if raw.strip():
+                    done = threading.Event()
+                    pending.append(done)
+                    worker.submit(raw.decode(), lambda result, done=done: (emit(result), done.set()))
+            # Keep the connection open until every request on it has been answered
+            for done in pending:
+                done.wait()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        logger.info("Serving JSONL requests on %s", path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    worker.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve JSONL agent requests from warm, long-lived agents")
+    parser.add_argument(
+        "--agents",
+        default=",".join(AGENTS),
+        help=f"Comma-separated agents to keep warm (default: {','.join(AGENTS)})",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests processed in parallel (default: 4)")
+    parser.add_argument("--socket", help="Serve on this Unix socket instead of stdin/stdout")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    worker = Worker([name.strip() for name in args.agents.split(",") if name.strip()], args.concurrency)
+    if args.socket:
+        serve_socket(worker, args.socket)
+    else:
+        serve_stdio(worker)
+    logger.info("Worker summary: %s", json.dumps(worker.summary()))
+
+
+if __name__ == "__main__":
+    main()
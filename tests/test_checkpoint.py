@@ -0,0 +1,42 @@
+"""Latest-checkpoint cache and write buffering of the SQLite checkpoint saver."""
+import sqlite3
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from shared.checkpoint import SQLiteCheckpointSaver
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def test_reads_keep_latest_cache_bounded(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = SQLiteCheckpointSaver(path, cache_threads=1000)
+    for i in range(10):
+        saver.put(_config(f"t{i}"), empty_checkpoint(), {}, {})
+    saver.close()
+
+    reader = SQLiteCheckpointSaver(path, cache_threads=4)
+    for i in range(10):
+        assert reader.get_tuple(_config(f"t{i}")) is not None
+    assert list(reader._latest) == [(f"t{i}", "") for i in range(6, 10)]
+    reader.close()
+
+
+def test_failed_flush_keeps_rows_and_the_flusher_alive(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), flush_interval_s=0.01)
+    saver._conn.execute("CREATE TRIGGER fail BEFORE INSERT ON checkpoints BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+    saver.put(_config("t"), empty_checkpoint(), {}, {})
+    with pytest.raises(sqlite3.IntegrityError):
+        saver.flush()
+    assert not saver._conn.in_transaction
+    assert len(saver._pending_checkpoints) == 1
+
+    with saver._db_lock:
+        saver._conn.execute("DROP TRIGGER fail")
+    saver._closed.wait(0.1)
+    assert saver._flusher.is_alive()
+    assert saver.stats()["checkpoints"] == 1
+    saver.close()
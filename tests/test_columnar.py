@@ -0,0 +1,41 @@
+"""Typed columns of the Parquet export for the bundled (traceloop-instrumented) captures."""
+import glob
+import json
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from shared.columnar import convert, dataset  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def rows(tmp_path_factory):
+    output = str(tmp_path_factory.mktemp("parquet"))
+    convert(sorted(glob.glob(os.path.join(ROOT, "agents-*", "*", "otlp_trace"))), output, processes=1)
+    return dataset(output).to_table().to_pylist()
+
+
+def test_tool_spans_fill_tool_columns(rows):
+    tools = {row["name"]: row for row in rows if row["name"].endswith(".tool")}
+    assert {"convert_tool.tool", "retrieve_documents.tool", "weather_tool.tool"} <= tools.keys()
+    for name, row in tools.items():
+        assert row["tool.name"] == name.removesuffix(".tool")
+        assert row["gen_ai.operation.name"] == "tool"
+        assert row["input"] and row["output"]
+
+
+def test_only_tool_spans_take_their_tool_name_from_the_entity(rows):
+    assert all(row["tool.name"] is None for row in rows if row["name"].endswith((".workflow", ".task")))
+
+
+def test_llm_spans_collect_flattened_messages(rows):
+    chats = [row for row in rows if row["name"] in ("openai.chat", "ChatOpenAI.chat")]
+    assert chats
+    for row in chats:
+        assert row["gen_ai.operation.name"] == "chat"
+        assert json.loads(row["input"])[0]["role"] == "system"
+        assert "role" in json.loads(row["output"])[0]
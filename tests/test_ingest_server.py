@@ -0,0 +1,41 @@
+"""Body size limit of the local ingest server."""
+import threading
+from unittest import mock
+
+import httpx
+import pytest
+
+from shared import ingest_server
+
+
+@pytest.fixture
+def server():
+    server = ingest_server.create_server(port=0, max_body_bytes=1024)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_oversized_body_is_drained_in_chunks(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/otel/v1/traces"
+    reads = []
+    real_handle = ingest_server.IngestHandler.handle_one_request
+
+    def handle(handler):
+        original = handler.rfile.read
+
+        def read(size=-1):
+            reads.append(size)
+            return original(size)
+
+        handler.rfile.read = read
+        real_handle(handler)
+
+    body = b"x" * (ingest_server.DRAIN_CHUNK_BYTES * 3 + 1)
+    with mock.patch.object(ingest_server.IngestHandler, "handle_one_request", handle):
+        response = httpx.post(url, content=body, headers={"Galileo-API-Key": "k"})
+    assert response.status_code == 413
+    assert reads and max(reads) <= ingest_server.DRAIN_CHUNK_BYTES
+    assert sum(reads) >= len(body)
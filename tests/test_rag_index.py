@@ -0,0 +1,61 @@
+"""RAG index construction and ingestion on corpora too small for every index type."""
+import os
+import sys
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+# The agent directories are flat scripts importing their siblings (``tools``) by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents-langgraph", "rag"))
+
+import ingest  # noqa: E402
+import tools  # noqa: E402
+
+DOCUMENTS = [
+    {"id": f"doc{i}", "title": f"Doc {i}", "content": f"Document number {i} about topic {i % 3}."} for i in range(5)
+]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf", "ivfpq"])
+def test_index_types_build_on_tiny_corpus(index_type):
+    vectors = np.random.default_rng(0).random((5, 64), dtype=np.float32)
+    index = tools.make_index(index_type, 64, len(vectors))
+    tools.train_index(index, vectors)
+    index.add(vectors)
+    _, ids = index.search(vectors[:1], 1)
+    assert ids[0][0] == 0
+
+
+def test_ivfpq_falls_back_to_flat_below_pq_training_minimum():
+    import faiss
+
+    assert isinstance(tools.make_index("ivfpq", 64, 1_000_000, n_train=tools.PQ_MIN_TRAIN - 1), faiss.IndexFlatL2)
+    assert isinstance(tools.make_index("ivfpq", 64, 1_000_000, n_train=tools.PQ_MIN_TRAIN), faiss.IndexIVFPQ)
+
+
+@pytest.mark.parametrize("index_type", ["ivf", "ivfpq"])
+def test_ingest_tiny_corpus(index_type):
+    vector_store, stats = ingest.ingest(DOCUMENTS, DeterministicFakeEmbedding(size=64), index_type=index_type)
+    assert stats.chunks == len(DOCUMENTS)
+    assert len(vector_store.similarity_search("Document number 3", k=2)) == 2
+
+
+def test_ingest_append_skips_chunks_already_indexed():
+    embeddings = DeterministicFakeEmbedding(size=64)
+    vector_store, _ = ingest.ingest(DOCUMENTS[:3], embeddings, index_type="flat")
+    repeated = DOCUMENTS + [DOCUMENTS[4]]
+    vector_store, stats = ingest.ingest(repeated, embeddings, vector_store, index_type="flat")
+    assert stats.chunks == 2
+    assert stats.skipped == 4
+    assert vector_store.index.ntotal == len(DOCUMENTS)
+
+
+def test_ingest_ivf_training_sample_spans_batches():
+    documents = [{"id": f"d{i}", "title": "", "content": f"text {i}"} for i in range(700)]
+    vector_store, stats = ingest.ingest(
+        documents, DeterministicFakeEmbedding(size=32), batch_size=64, index_type="ivfpq", train_size=300
+    )
+    assert stats.chunks == 700
+    assert vector_store.index.ntotal == 700
+    assert vector_store.index.is_trained
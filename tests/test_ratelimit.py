@@ -0,0 +1,87 @@
+"""Concurrency slots and AIMD signals of the rate-limited httpx transports."""
+import asyncio
+
+import httpx
+import pytest
+
+from shared.ratelimit import AsyncRateLimitedTransport, RateLimitedTransport, RateLimiter
+
+CHAT = "https://api.openai.com/v1/chat/completions"
+
+
+class _Stream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    chunks = (b'data: {"choices": []}\n\n', b"data: [DONE]\n\n")
+
+    def __iter__(self):
+        yield from self.chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class _Upstream(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Like ``httpx.MockTransport``, but leaves streamed bodies unread as a network transport does."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if b'"stream": true' in request.content:
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=_Stream())
+        return httpx.Response(200, json={"usage": {"total_tokens": 10}})
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return self.handle_request(request)
+
+
+def test_json_response_releases_slot_on_arrival():
+    limiter = RateLimiter(max_concurrency=4)
+    with httpx.Client(transport=RateLimitedTransport(limiter, _Upstream())) as client:
+        client.post(CHAT, content=b'{"messages": []}')
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_streamed_response_holds_slot_until_closed():
+    limiter = RateLimiter(max_concurrency=4)
+    with httpx.Client(transport=RateLimitedTransport(limiter, _Upstream())) as client:
+        with client.stream("POST", CHAT, content=b'{"messages": [], "stream": true}') as response:
+            for _ in response.iter_bytes():
+                assert limiter.concurrency.in_flight == 1
+        assert limiter.concurrency.in_flight == 0
+        with client.stream("POST", CHAT, content=b'{"messages": [], "stream": true}'):
+            assert limiter.concurrency.in_flight == 1  # Closed without reading the body
+        assert limiter.concurrency.in_flight == 0
+    assert limiter.calls == 2
+
+
+def test_async_streamed_response_holds_slot_until_closed():
+    limiter = RateLimiter(max_concurrency=4)
+
+    async def run():
+        transport = AsyncRateLimitedTransport(limiter, _Upstream())
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("POST", CHAT, content=b'{"messages": [], "stream": true}') as response:
+                async for _ in response.aiter_bytes():
+                    assert limiter.concurrency.in_flight == 1
+            assert limiter.concurrency.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_failed_requests_back_off_like_throttling():
+    limiter = RateLimiter(max_concurrency=64)
+
+    def fail(request):
+        raise httpx.ConnectTimeout("timed out", request=request)
+
+    with httpx.Client(transport=RateLimitedTransport(limiter, httpx.MockTransport(fail))) as client:
+        before = limiter.concurrency.limit
+        with pytest.raises(httpx.ConnectTimeout):
+            client.post(CHAT, content=b'{"messages": []}')
+    assert limiter.concurrency.limit < before
+    assert limiter.concurrency.decreases == 1
+
+
+def test_server_errors_back_off():
+    limiter = RateLimiter(max_concurrency=64)
+    before = limiter.concurrency.limit
+    limiter.release(limiter.acquire(10), 500)
+    assert limiter.concurrency.limit < before
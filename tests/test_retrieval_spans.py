@@ -0,0 +1,77 @@
+"""Retriever spans report the passages the tools return, after dedupe and trimming."""
+import importlib.util
+import json
+import os
+
+import pytest
+from langchain_core.documents import Document
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from shared import context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARAGRAPH = "Returns are accepted within thirty days of delivery for a full refund to the original payment method."
+
+_exporter = InMemorySpanExporter()
+_provider = TracerProvider()
+_provider.add_span_processor(SimpleSpanProcessor(_exporter))
+trace.set_tracer_provider(_provider)
+
+
+def _load(name: str, path: str):
+    # Both agent directories have a flat ``tools`` module, so each is loaded under its own name
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def assembler(monkeypatch):
+    monkeypatch.setattr(context, "_assembler", context.ContextAssembler(max_tokens=1000))
+    _exporter.clear()
+
+
+def _documents(span) -> list[dict]:
+    return json.loads(span.attributes["gen_ai.output.messages"])[0]["content"]
+
+
+def test_research_retrieval_span_matches_returned_passages():
+    pytest.importorskip("crewai")
+    research = _load("research_tools", "agents-crewai/research/tools.py")
+    documents = [
+        {"id": "a", "title": "Returns", "content": PARAGRAPH + " Items must be unused."},
+        {"id": "b", "title": "Returns (copy)", "content": PARAGRAPH + " Items must be unused."},
+        {"id": "c", "title": "Shipping", "content": "Returns ship free with the prepaid label."},
+    ]
+    returned = research._search_documents("returns refund", "faq", documents)
+    (span,) = _exporter.get_finished_spans()
+    assert [r["id"] for r in returned] == ["a", "c"]
+    assert span.attributes["retrieval.num_results"] == 2
+    assert [d["metadata"]["id"] for d in _documents(span)] == ["a", "c"]
+    assert all("_score" not in r for r in returned)
+
+
+class _Retriever:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def invoke(self, query):
+        return self.docs
+
+
+def test_rag_retrieval_span_matches_packed_passages():
+    rag = _load("rag_tools", "agents-langgraph/rag/tools.py")
+    docs = [
+        Document(page_content=PARAGRAPH, metadata={"id": "x", "title": "Returns"}),
+        Document(page_content="Standard shipping takes five business days.", metadata={"id": "y", "title": "Ship"}),
+        Document(page_content=PARAGRAPH, metadata={"id": "z", "title": "Returns again"}),
+    ]
+    _, formatted = rag.search_documents("returns", _Retriever(docs))
+    (span,) = _exporter.get_finished_spans()
+    assert span.attributes["retrieval.num_results"] == 2
+    assert [d["metadata"]["id"] for d in _documents(span)] == ["x", "y"]
+    assert "Returns again" not in formatted
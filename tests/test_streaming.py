@@ -0,0 +1,43 @@
+"""Classification of streamed message chunks into answer tokens and intermediate text."""
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from shared.streaming import stream_graph
+
+
+class _Graph:
+    """Replays ``(namespace, mode, chunk)`` items the way ``graph.stream(..., subgraphs=True)`` yields them."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def stream(self, inputs, config=None, stream_mode=None, subgraphs=False):
+        yield from self.items
+
+
+def _chunk(content: str, message_id: str, tool: str | None = None) -> AIMessageChunk:
+    calls = [{"name": tool, "args": "{}", "id": "call_1", "index": 0}] if tool else []
+    return AIMessageChunk(content=content, id=message_id, tool_call_chunks=calls)
+
+
+def test_text_of_tool_calling_messages_is_not_streamed_as_answer():
+    answer = AIMessage(content="It is 21C.", id="m2")
+    graph = _Graph(
+        [
+            (("agent",), "messages", (_chunk("I'll look that up.", "m1", tool="weather_tool"), {})),
+            (("agent",), "messages", (_chunk(" One moment.", "m1"), {})),
+            (("agent",), "messages", (ToolMessage(content="21C", tool_call_id="c1", name="weather_tool", id="t1"), {})),
+            (("agent",), "messages", (_chunk("It is ", "m2"), {})),
+            (("agent",), "messages", (_chunk("21C.", "m2"), {})),
+            ((), "values", {"messages": [answer]}),
+        ]
+    )
+    events = [(event.type, event.content or event.name) for event in stream_graph(graph, {})]
+    assert events == [
+        ("thought", "I'll look that up."),
+        ("tool_call", "weather_tool"),
+        ("thought", " One moment."),
+        ("tool_result", "21C"),
+        ("token", "It is "),
+        ("token", "21C."),
+        ("final", "It is 21C."),
+    ]
@@ -0,0 +1,46 @@
+"""Span classification and validation of traceloop-instrumented spans."""
+import glob
+import os
+
+from opentelemetry.proto.trace.v1.trace_pb2 import Span
+
+from shared.otel import parse_trace
+from shared.validation import SpanValidator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _span(**attributes) -> Span:
+    span = Span(trace_id=b"\x01" * 16, span_id=b"\x02" * 8, name="span")
+    for key, value in attributes.items():
+        span.attributes.add(key=key).value.string_value = value
+    return span
+
+
+def test_traceloop_tool_span_is_held_to_tool_requirements():
+    validator = SpanValidator()
+    complete = {
+        "traceloop.span.kind": "tool",
+        "traceloop.entity.name": "convert_tool",
+        "traceloop.entity.input": '{"amount": 1}',
+        "traceloop.entity.output": '{"result": 2}',
+    }
+    assert validator.validate_span(_span(**complete)) is None
+    del complete["traceloop.entity.output"]
+    assert "'output'" in validator.validate_span(_span(**complete))
+
+
+def test_traceloop_framework_spans_are_not_typed():
+    validator = SpanValidator()
+    assert validator.validate_span(_span(**{"traceloop.span.kind": "workflow"})) is None
+    assert validator.validate_span(_span(**{"traceloop.span.kind": "task"})) is None
+
+
+def test_bundled_langgraph_captures_are_valid():
+    validator = SpanValidator()
+    files = glob.glob(os.path.join(ROOT, "agents-langgraph", "*", "otlp_trace", "*.bin"))
+    assert files
+    for path in files:
+        with open(path, "rb") as f:
+            report = validator.validate_request(parse_trace(f.read()))
+        assert not report.rejected, (path, report.reasons())
@@ -0,0 +1,30 @@
+"""Directory watcher bookkeeping for long-running (daemon) use."""
+import os
+
+from shared.watcher import DirectoryWatcher
+
+
+def _write(directory, name: str) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x")
+    os.utime(path, (0, 0))  # Settled long ago
+    return path
+
+
+def test_removed_files_are_forgotten(tmp_path):
+    watcher = DirectoryWatcher(str(tmp_path), use_inotify=False, settle_s=0)
+    for i in range(100):
+        path = _write(tmp_path, f"traces_{i:03d}.bin")
+        assert list(watcher._scan()) == [path]
+        os.remove(path)
+    list(watcher._scan())
+    assert not watcher._seen and not watcher._pending
+
+
+def test_existing_files_are_yielded_once(tmp_path):
+    watcher = DirectoryWatcher(str(tmp_path), use_inotify=False, settle_s=0)
+    path = _write(tmp_path, "traces_1.bin")
+    assert list(watcher._scan()) == [path]
+    assert list(watcher._scan()) == []
+    assert watcher._seen == {"traces_1.bin"}
@@ -0,0 +1,13 @@
+"""Error responses of the JSONL worker."""
+from shared.worker import Worker
+
+
+def test_invalid_requests_echo_their_id():
+    worker = Worker([], concurrency=1)
+    responses = []
+    worker.submit('{"id": "7", "agent": "nope", "query": "x"}', responses.append)
+    worker.submit('{"id": 8, "query": "x"}', responses.append)
+    worker.submit("not json", responses.append)
+    worker.shutdown()
+    assert [r["id"] for r in responses] == ["7", 8, None]
+    assert "unknown agent 'nope'" in responses[0]["error"]